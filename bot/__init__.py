@@ -104,7 +104,6 @@ multi_tags = set()
 task_dict_lock = Lock()
 queue_dict_lock = Lock()
 qb_listener_lock = Lock()
-cpu_eater_lock = Lock()
 same_directory_lock = Lock()
 nzb_listener_lock = Lock()
 jd_listener_lock = Lock()
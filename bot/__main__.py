@@ -62,6 +62,7 @@ async def set_commands():
 
 
 async def main():
+    from .core.loop_monitor import LoopMonitor
     from .core.startup import (
         load_configurations,
         save_settings,
@@ -73,6 +74,7 @@ async def main():
 
     await gather(TgClient.start_bot(), TgClient.start_user())
     await gather(load_configurations(), update_variables())
+    LoopMonitor.start()
     from .core.torrent_manager import TorrentManager
 
     await TorrentManager.initiate()
@@ -82,6 +84,7 @@ async def main():
         update_nzb_options(),
     )
     from .core.jdownloader_booter import jdownloader
+    from .core.metrics import Metrics
     from .helper.ext_utils.files_utils import clean_all
     from .helper.ext_utils.telegraph_helper import telegraph
     from .helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
@@ -103,6 +106,7 @@ async def main():
         restart_notification(),
         telegraph.create_account(),
         rclone_serve_booter(),
+        Metrics.start(),
     )
 
 
@@ -9,32 +9,49 @@ logging.basicConfig(level=logging.INFO)
 
 
 class Config:
+    ASYNCIO_DEBUG: bool = False
     AS_DOCUMENT: bool = False
     AUTHORIZED_CHATS: str = ""
     BASE_URL: str = ""
     BASE_URL_PORT: int = 80
     BOT_TOKEN: str = ""
+    BULK_CONCURRENCY: int = 5
+    CHAT_BURST: int = 3
     CMD_SUFFIX: str = ""
+    CPU_SLOTS: int = 0
     DATABASE_URL: str = ""
     DEFAULT_UPLOAD: str = "gd"
+    DIRECT_DOWNLOAD_WORKERS: int = 1
     EXCLUDED_EXTENSIONS: str = ""
     FFMPEG_CMDS: ClassVar[dict[str, list[str]]] = {}
+    FFMPEG_THREADS: int = 0
     FILELION_API: str = ""
     GDRIVE_ID: str = ""
+    GDRIVE_WORKERS: int = 1
+    GROUP_RATE: int = 20
     INCOMPLETE_TASK_NOTIFIER: bool = False
     INDEX_URL: str = ""
     JD_EMAIL: str = ""
     JD_PASS: str = ""
     IS_TEAM_DRIVE: bool = False
+    LEECH_CACHE: bool = False
+    LEECH_CACHE_DAYS: int = 30
+    LEECH_CACHE_SIZE: int = 0
     LEECH_DUMP_CHAT: ClassVar[list[str]] = []
     LEECH_FILENAME_PREFIX: str = ""
+    LEECH_LOOKAHEAD: int = 0
     LEECH_SPLIT_SIZE: int = 2097152000
+    LOOP_LAG_THRESHOLD: int = 500
     MEDIA_GROUP: bool = False
+    METRICS_TOKEN: str = ""
+    MIRROR_CACHE: bool = False
+    MIRROR_CACHE_URL_TTL: int = 24
     HYBRID_LEECH: bool = False
     HYDRA_IP: str = ""
     HYDRA_API_KEY: str = ""
     NAME_SUBSTITUTE: str = ""
     OWNER_ID: int = 0
+    QB_SYNC_LISTENER: bool = False
     QUEUE_ALL: int = 0
     QUEUE_DOWNLOAD: int = 0
     QUEUE_UPLOAD: int = 0
@@ -45,13 +62,19 @@ class Config:
     RCLONE_SERVE_PASS: str = ""
     RCLONE_SERVE_PORT: int = 8080
     RSS_CHAT: str = ""
+    RSS_CONCURRENCY: int = 10
     RSS_DELAY: int = 600
     RSS_SIZE_LIMIT: int = 0
+    STATUS_CACHE_TTL: int = 2
+    STATUS_PROGRESS_DELTA: int = 1
+    STATUS_UPDATE_INTERVAL: int = 3
     STOP_DUPLICATE: bool = False
     STREAMWISH_API: str = ""
     SUDO_USERS: str = ""
+    TASK_TRACE_FILE: str = ""
     TELEGRAM_API: int = 0
     TELEGRAM_HASH: str = ""
+    TG_DOWNLOAD_WORKERS: int = 1
     TG_PROXY: ClassVar[dict[str, str]] = {}
     THUMBNAIL_LAYOUT: str = ""
     TORRENT_TIMEOUT: int = 0
@@ -0,0 +1,115 @@
+from asyncio import CancelledError
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import ClassVar
+
+from bot import LOGGER, bot_loop, cpu_no, user_data
+from bot.core.config_manager import Config
+
+
+class CpuScheduler:
+    """Shares the CPU between ffmpeg based stages of all tasks.
+
+    The machine is split into `CPU_SLOTS` slots (one per core by default) and
+    every job holds as many slots as the threads it runs ffmpeg with, so
+    several jobs run side by side instead of one job machine-wide.
+
+    Waiting jobs are granted in order of priority (owner and sudo users
+    first), then the user holding the fewest slots, then arrival. A job that
+    doesn't fit blocks the ones behind it, so heavy jobs aren't starved by a
+    stream of light ones.
+    """
+
+    _used = 0
+    _waiting: ClassVar[list[dict]] = []
+    _running: ClassVar[dict[int, dict]] = {}
+    _seq = count()
+
+    @classmethod
+    def capacity(cls):
+        return Config.CPU_SLOTS or cpu_no
+
+    @classmethod
+    def threads(cls):
+        """Returns the thread count passed to every ffmpeg job."""
+        return min(Config.FFMPEG_THREADS or max(1, cpu_no // 2), cls.capacity())
+
+    @staticmethod
+    def _priority(listener):
+        user_id = listener.user_id
+        if user_id == Config.OWNER_ID or user_data.get(user_id, {}).get("SUDO"):
+            return 0
+        return 1
+
+    @classmethod
+    def _user_load(cls, user_id):
+        return sum(
+            job["weight"] for job in cls._running.values() if job["user"] == user_id
+        )
+
+    @classmethod
+    def _dispatch(cls):
+        while cls._waiting:
+            job = min(
+                cls._waiting,
+                key=lambda j: (j["priority"], cls._user_load(j["user"]), j["id"]),
+            )
+            if cls._used and cls._used + job["weight"] > cls.capacity():
+                return
+            cls._waiting.remove(job)
+            cls._used += job["weight"]
+            cls._running[job["id"]] = job
+            job["future"].set_result(job["id"])
+
+    @classmethod
+    async def acquire(cls, listener, weight=None):
+        """Waits for free slots and returns the id of the granted job.
+
+        Args:
+            listener: The task that owns the job.
+            weight: Slots to hold. Defaults to the ffmpeg thread count.
+        """
+        job = {
+            "id": next(cls._seq),
+            "user": listener.user_id,
+            "mid": listener.mid,
+            "weight": min(weight or cls.threads(), cls.capacity()),
+            "priority": cls._priority(listener),
+            "future": bot_loop.create_future(),
+        }
+        cls._waiting.append(job)
+        cls._dispatch()
+        try:
+            return await job["future"]
+        except CancelledError:
+            if job["id"] in cls._running:
+                cls.release(job["id"])
+            elif job in cls._waiting:
+                cls._waiting.remove(job)
+            raise
+
+    @classmethod
+    def release(cls, job_id):
+        if (job := cls._running.pop(job_id, None)) is None:
+            LOGGER.warning(f"Releasing unknown cpu job: {job_id}")
+            return
+        cls._used -= job["weight"]
+        cls._dispatch()
+
+    @classmethod
+    @asynccontextmanager
+    async def slot(cls, listener, weight=None):
+        job_id = await cls.acquire(listener, weight)
+        try:
+            yield job_id
+        finally:
+            cls.release(job_id)
+
+    @classmethod
+    def stats(cls):
+        return {
+            "used": cls._used,
+            "capacity": cls.capacity(),
+            "running": len(cls._running),
+            "queued": len(cls._waiting),
+        }
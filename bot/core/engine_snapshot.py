@@ -0,0 +1,252 @@
+from asyncio import Lock, gather
+from time import time
+from typing import ClassVar
+
+from bot import LOGGER, nzb_jobs, sabnzbd_client
+from bot.core.config_manager import Config
+from bot.core.torrent_manager import TorrentManager
+
+# Fields refreshed by the periodic tellActive. Everything else (files,
+# bittorrent info, dir) comes from the full tellStatus done once per gid
+# and on every aria2 notification.
+ARIA2_KEYS = [
+    "gid",
+    "status",
+    "totalLength",
+    "completedLength",
+    "uploadLength",
+    "downloadSpeed",
+    "uploadSpeed",
+    "connections",
+    "numSeeders",
+    "seeder",
+    "followedBy",
+    "errorMessage",
+]
+# Inactive aria2 entries untouched for this long are dropped from the mirror
+# and fetched again on their next read.
+ARIA2_EXPIRY = 600
+
+
+class EngineSnapshot:
+    """Keeps one bulk snapshot per download engine and serves it to every
+    status object, so a status refresh costs one RPC per engine instead of
+    one RPC per task.
+
+    Each engine snapshot is refreshed at most once per `STATUS_CACHE_TTL`
+    seconds. Concurrent readers wait on the engine lock and reuse the result
+    of the refresh that was already in flight.
+
+    Aria2 is kept as a mirror rather than a snapshot: its table is updated in
+    place by the aria2 notifications (see `refresh_aria2`) and by a single
+    `tellActive` limited to `ARIA2_KEYS` per refresh, so waiting and stopped
+    downloads cost no RPC until aria2 reports a change.
+    """
+
+    qbittorrent: ClassVar[dict] = {}
+    aria2: ClassVar[dict] = {}
+    nzb_queue: ClassVar[dict] = {}
+    nzb_history: ClassVar[dict] = {}
+    nzb_speed = 0
+    _nzb_marker = 0
+    _nzb_tracked: ClassVar[set[str]] = set()
+    _aria2_seen: ClassVar[dict[str, float]] = {}
+    _aria2_options: ClassVar[dict[str, dict]] = {}
+    _updated: ClassVar[dict[str, float]] = {
+        "qbittorrent": 0,
+        "aria2": 0,
+        "sabnzbd": 0,
+    }
+    _locks: ClassVar[dict[str, Lock]] = {
+        "qbittorrent": Lock(),
+        "aria2": Lock(),
+        "sabnzbd": Lock(),
+    }
+
+    @classmethod
+    def _is_fresh(cls, engine):
+        return time() - cls._updated[engine] < Config.STATUS_CACHE_TTL
+
+    @classmethod
+    def invalidate(cls, engine=None):
+        """Forces the next read of an engine (or all engines) to refresh.
+
+        Args:
+            engine: One of "qbittorrent", "aria2" or "sabnzbd". None for all.
+        """
+        for key in [engine] if engine else cls._updated:
+            cls._updated[key] = 0
+
+    @classmethod
+    async def _refresh(cls, engine, fetch):
+        if cls._is_fresh(engine):
+            return
+        async with cls._locks[engine]:
+            if cls._is_fresh(engine):
+                return
+            try:
+                await fetch()
+            except Exception as e:
+                LOGGER.error(f"{e}: while refreshing {engine} snapshot")
+            cls._updated[engine] = time()
+
+    @classmethod
+    async def _fetch_qbittorrent(cls):
+        torrents = await TorrentManager.qbittorrent.torrents.info()
+        snapshot = {}
+        for tor in torrents:
+            snapshot[tor.hash] = tor
+            if tor.tags:
+                snapshot[tor.tags[0]] = tor
+        cls.qbittorrent = snapshot
+
+    @classmethod
+    def _store_aria2(cls, download):
+        gid = download["gid"]
+        cls.aria2[gid] = download
+        cls._aria2_seen[gid] = time()
+        return download
+
+    @classmethod
+    async def _fetch_aria2(cls):
+        active = await TorrentManager.aria2.tellActive(keys=ARIA2_KEYS)
+        now = time()
+        missing = []
+        for download in active:
+            gid = download["gid"]
+            if gid in cls.aria2:
+                cls.aria2[gid].update(download)
+                cls._aria2_seen[gid] = now
+            else:
+                missing.append(gid)
+        if missing:
+            for download in await gather(
+                *(TorrentManager.aria2.tellStatus(gid) for gid in missing),
+            ):
+                cls._store_aria2(download)
+        for gid, seen in list(cls._aria2_seen.items()):
+            if now - seen > ARIA2_EXPIRY:
+                del cls._aria2_seen[gid]
+                cls.aria2.pop(gid, None)
+                cls._aria2_options.pop(gid, None)
+
+    @classmethod
+    async def _fetch_sabnzbd(cls):
+        if not nzb_jobs:
+            cls.nzb_queue, cls.nzb_history, cls.nzb_speed = {}, {}, 0
+            cls._nzb_marker, cls._nzb_tracked = 0, set()
+            return
+        nzo_ids = list(nzb_jobs)
+        # The marker is global to SABnzbd and post-processing progress
+        # doesn't always move it, so the full history of the tracked jobs is
+        # fetched whenever the tracked set changed or a job is still being
+        # verified, repaired or extracted.
+        marker = cls._nzb_marker
+        if set(nzo_ids) != cls._nzb_tracked or any(
+            slot["status"] not in ["Completed", "Failed"]
+            for slot in cls.nzb_history.values()
+        ):
+            marker = 0
+        queue, (slots, marker) = await gather(
+            sabnzbd_client.get_downloads(nzo_ids=nzo_ids),
+            sabnzbd_client.get_history_update(nzo_ids, marker),
+        )
+        cls.nzb_speed = int(float(queue["queue"].get("kbpersec", "0"))) * 1024
+        cls.nzb_queue = {slot["nzo_id"]: slot for slot in queue["queue"]["slots"]}
+        if slots is not None:
+            cls.nzb_history = {slot["nzo_id"]: slot for slot in slots}
+        cls._nzb_marker, cls._nzb_tracked = marker, set(nzo_ids)
+
+    @classmethod
+    async def get_qbittorrent(cls, tag):
+        """Returns the cached torrent info for a tag or hash.
+
+        Falls back to a single `torrents.info` call when the torrent was added
+        after the last bulk refresh.
+        """
+        await cls._refresh("qbittorrent", cls._fetch_qbittorrent)
+        if tor := cls.qbittorrent.get(tag):
+            return tor
+        res = await TorrentManager.qbittorrent.torrents.info(tag=tag)
+        if res:
+            cls.qbittorrent[tag] = res[0]
+            return res[0]
+        return None
+
+    @classmethod
+    async def get_aria2(cls, gid):
+        """Returns the mirrored aria2 download dict for a gid.
+
+        Falls back to a single `tellStatus` call when the gid isn't mirrored
+        yet, e.g. a gid that follows a metadata download.
+        """
+        await cls._refresh("aria2", cls._fetch_aria2)
+        if download := cls.aria2.get(gid):
+            return download
+        return await cls.refresh_aria2(gid)
+
+    @classmethod
+    async def refresh_aria2(cls, gid):
+        """Fetches the full status of a gid into the mirror and returns it.
+
+        Called by the aria2 notification handlers, so every state change
+        aria2 pushes costs one `tellStatus`.
+        """
+        return cls._store_aria2(await TorrentManager.aria2.tellStatus(gid))
+
+    @classmethod
+    async def get_aria2_option(cls, gid):
+        """Returns the options of a gid, fetched once per gid."""
+        if (options := cls._aria2_options.get(gid)) is None:
+            options = await TorrentManager.aria2.getOption(gid)
+            cls._aria2_options[gid] = options
+        return options
+
+    @classmethod
+    async def on_aria2_event(cls, _, data):
+        """Refreshes the gid of an aria2 notification no listener handles.
+
+        A gid aria2 no longer knows (its result was already removed) is
+        dropped from the mirror.
+        """
+        gid = data["params"][0]["gid"]
+        try:
+            await cls.refresh_aria2(gid)
+        except Exception:
+            cls.aria2.pop(gid, None)
+            cls._aria2_seen.pop(gid, None)
+            cls._aria2_options.pop(gid, None)
+
+    @classmethod
+    async def get_sabnzbd(cls, nzo_id):
+        """Returns a tuple of (queue_slot, history_slot) for a job.
+
+        Either item is None when the job is not in that list. Jobs that are not
+        tracked in the snapshot yet are fetched individually.
+        """
+        await cls._refresh("sabnzbd", cls._fetch_sabnzbd)
+        if nzo_id in cls.nzb_queue or nzo_id in cls.nzb_history:
+            return cls.nzb_queue.get(nzo_id), cls.nzb_history.get(nzo_id)
+        queue = await sabnzbd_client.get_downloads(nzo_ids=nzo_id)
+        if res := queue["queue"]["slots"]:
+            cls.nzb_queue[nzo_id] = res[0]
+            return res[0], None
+        history = await sabnzbd_client.get_history(nzo_ids=nzo_id)
+        if res := history["history"]["slots"]:
+            cls.nzb_history[nzo_id] = res[0]
+            return None, res[0]
+        return None, None
+
+    @classmethod
+    async def get_sabnzbd_jobs(cls):
+        """Returns a tuple of the (queue, history) slots of the tracked jobs,
+        keyed by nzo_id.
+        """
+        await cls._refresh("sabnzbd", cls._fetch_sabnzbd)
+        return cls.nzb_queue, cls.nzb_history
+
+    @classmethod
+    async def get_sabnzbd_speed(cls):
+        """Returns the overall SABnzbd download speed in bytes/sec."""
+        await cls._refresh("sabnzbd", cls._fetch_sabnzbd)
+        return cls.nzb_speed
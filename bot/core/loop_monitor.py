@@ -0,0 +1,75 @@
+import sys
+from threading import Thread, get_ident
+from time import monotonic, sleep
+from traceback import format_stack
+
+from bot import LOGGER, bot_loop
+from bot.core.config_manager import Config
+
+BEAT_INTERVAL = 0.25
+
+
+class LoopMonitor:
+    """Watches `bot_loop` for callbacks that block it.
+
+    A heartbeat scheduled on the loop every `BEAT_INTERVAL` measures how late
+    it runs, which is the scheduling delay every other callback sees. A
+    watchdog thread checks the heartbeat and, once it is `LOOP_LAG_THRESHOLD`
+    milliseconds overdue, logs the stack the loop thread is stuck in, once
+    per stall.
+
+    With `ASYNCIO_DEBUG`, asyncio debug mode is enabled as well and every
+    callback running longer than the threshold is reported by asyncio.
+    """
+
+    lag = 0.0
+    max_lag = 0.0
+    stalls = 0
+    _beat = 0.0
+    _loop_thread = None
+    _reported = 0.0
+
+    @classmethod
+    def _threshold(cls):
+        return Config.LOOP_LAG_THRESHOLD / 1000
+
+    @classmethod
+    def _heartbeat(cls, expected):
+        now = monotonic()
+        cls.lag = max(now - expected, 0)
+        cls.max_lag = max(cls.max_lag, cls.lag)
+        cls._beat = now
+        bot_loop.call_later(BEAT_INTERVAL, cls._heartbeat, now + BEAT_INTERVAL)
+
+    @classmethod
+    def _watchdog(cls):
+        while True:
+            sleep(BEAT_INTERVAL)
+            threshold = cls._threshold()
+            if not threshold:
+                continue
+            beat = cls._beat
+            stalled = monotonic() - beat - BEAT_INTERVAL
+            if stalled < threshold or beat == cls._reported:
+                continue
+            cls._reported = beat
+            cls.stalls += 1
+            frame = sys._current_frames().get(cls._loop_thread)
+            stack = "".join(format_stack(frame)) if frame else "unavailable\n"
+            LOGGER.warning(
+                f"Event loop blocked for {stalled:.2f}s, loop thread stack:\n"
+                f"{stack}",
+            )
+
+    @classmethod
+    def start(cls):
+        """Starts the heartbeat and the watchdog. Must run on the loop."""
+        if cls._loop_thread is not None:
+            return
+        cls._loop_thread = get_ident()
+        if Config.ASYNCIO_DEBUG:
+            bot_loop.set_debug(True)
+            bot_loop.slow_callback_duration = cls._threshold() or 0.1
+        cls._beat = now = monotonic()
+        bot_loop.call_later(BEAT_INTERVAL, cls._heartbeat, now + BEAT_INTERVAL)
+        Thread(target=cls._watchdog, name="loop-watchdog", daemon=True).start()
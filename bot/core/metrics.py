@@ -0,0 +1,185 @@
+from asyncio import gather, iscoroutinefunction
+from collections import defaultdict
+from typing import ClassVar
+
+from aiohttp import web
+
+from bot import (
+    LOGGER,
+    queued_dl,
+    queued_up,
+    sabnzbd_client,
+    task_dict,
+    task_dict_lock,
+)
+from bot.core.engine_snapshot import EngineSnapshot
+from bot.core.jdownloader_booter import jdownloader
+from bot.core.loop_monitor import LoopMonitor
+from bot.core.torrent_manager import TorrentManager
+from bot.helper.ext_utils.status_utils import MirrorStatus
+
+# The exporter only listens on localhost, the web server publishes it as
+# /metrics on BASE_URL_PORT when METRICS_TOKEN is set.
+METRICS_PORT = 8060
+
+# Tools whose speed isn't part of an engine total.
+TOOL_SPEEDS = ["telegram", "yt-dlp", "rclone", "gdriveAPI"]
+
+
+def labels(**labels):
+    """Returns Prometheus labels like `{key="value"}`, empty without any."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{key}="{str(value).replace(chr(34), "")}"' for key, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+async def _task_status(task):
+    if iscoroutinefunction(task.status):
+        return await task.status()
+    return task.status()
+
+
+class Metrics:
+    """Counters of the bot process in the Prometheus text format.
+
+    Counters are bumped from anywhere (including the Drive worker threads)
+    with plain classmethods. Gauges like task counts and engine speeds are
+    read only when `/metrics` is scraped, so an idle exporter costs nothing.
+    """
+
+    _counters: ClassVar[dict] = defaultdict(float)
+    _stages: ClassVar[dict[str, list[float]]] = defaultdict(lambda: [0, 0.0])
+    _gauges: ClassVar[list] = []
+    _runner = None
+
+    @classmethod
+    def inc(cls, name, value=1):
+        cls._counters[name] += value
+
+    @classmethod
+    def flood_wait(cls, seconds):
+        """Records a Telegram FloodWait and the seconds slept for it."""
+        cls._counters["floodwait_total"] += 1
+        cls._counters["floodwait_seconds_total"] += seconds
+
+    @classmethod
+    def observe_stage(cls, stage, seconds):
+        summary = cls._stages[stage]
+        summary[0] += 1
+        summary[1] += seconds
+
+    @staticmethod
+    async def _task_stats():
+        async with task_dict_lock:
+            tasks = list(task_dict.values())
+        statuses = await gather(
+            *(_task_status(task) for task in tasks),
+            return_exceptions=True,
+        )
+        counts = defaultdict(int)
+        speeds = defaultdict(float)
+        for task, status in zip(tasks, statuses, strict=True):
+            if isinstance(status, Exception):
+                continue
+            counts[status] += 1
+            if task.tool in TOOL_SPEEDS:
+                way = "up" if status == MirrorStatus.STATUS_UPLOAD else "down"
+                try:
+                    speeds[task.tool, way] += task.speed_raw()
+                except Exception:
+                    continue
+        return counts, speeds
+
+    @staticmethod
+    async def _engine_speeds():
+        speeds = {}
+        try:
+            qb, a2 = await gather(
+                TorrentManager.qbittorrent.transfer.info(),
+                TorrentManager.aria2.getGlobalStat(),
+            )
+            speeds["qbittorrent", "down"] = qb.dl_info_speed
+            speeds["qbittorrent", "up"] = qb.up_info_speed
+            speeds["aria2", "down"] = int(a2.get("downloadSpeed", "0"))
+            speeds["aria2", "up"] = int(a2.get("uploadSpeed", "0"))
+        except Exception as e:
+            LOGGER.error(f"{e}: while reading torrent engine speeds")
+        if sabnzbd_client.LOGGED_IN:
+            speeds["sabnzbd", "down"] = await EngineSnapshot.get_sabnzbd_speed()
+        if jdownloader.is_connected:
+            controller = jdownloader.device.downloadcontroller
+            try:
+                speeds["jdownloader", "down"] = await controller.get_speed_in_bytes()
+            except Exception as e:
+                LOGGER.error(f"{e}: while reading JDownloader speed")
+        return speeds
+
+    @classmethod
+    def add_gauges(cls, func):
+        """Registers a function returning extra lines to expose, for modules
+        this one can't import without an import cycle.
+        """
+        cls._gauges.append(func)
+
+    @classmethod
+    async def render(cls):
+        """Returns all metrics in the Prometheus text exposition format."""
+        (counts, tool_speeds), engine_speeds = await gather(
+            cls._task_stats(),
+            cls._engine_speeds(),
+        )
+        lines = ["# TYPE aeon_tasks gauge"]
+        lines.extend(
+            f"aeon_tasks{labels(status=status)} {count}"
+            for status, count in counts.items()
+        )
+        lines.append("# TYPE aeon_queue_depth gauge")
+        lines.append(f'aeon_queue_depth{{queue="download"}} {len(queued_dl)}')
+        lines.append(f'aeon_queue_depth{{queue="upload"}} {len(queued_up)}')
+        lines.append("# TYPE aeon_engine_speed_bytes gauge")
+        lines.extend(
+            f"aeon_engine_speed_bytes{labels(engine=engine, direction=way)} {speed}"
+            for (engine, way), speed in (engine_speeds | tool_speeds).items()
+        )
+        lines.append("# TYPE aeon_stage_duration_seconds summary")
+        for stage, (count, total) in list(cls._stages.items()):
+            stage_labels = labels(stage=stage)
+            lines.append(f"aeon_stage_duration_seconds_count{stage_labels} {count}")
+            lines.append(f"aeon_stage_duration_seconds_sum{stage_labels} {total}")
+        for name, value in list(cls._counters.items()):
+            lines.append(f"# TYPE aeon_{name} counter")
+            lines.append(f"aeon_{name} {value}")
+        lines.append("# TYPE aeon_loop_lag_seconds gauge")
+        lines.append(f"aeon_loop_lag_seconds {LoopMonitor.lag}")
+        lines.append("# TYPE aeon_loop_lag_max_seconds gauge")
+        lines.append(f"aeon_loop_lag_max_seconds {LoopMonitor.max_lag}")
+        lines.append("# TYPE aeon_loop_stalls_total counter")
+        lines.append(f"aeon_loop_stalls_total {LoopMonitor.stalls}")
+        for func in cls._gauges:
+            lines.extend(func())
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    async def _handle(cls, _):
+        return web.Response(
+            text=await cls.render(),
+            content_type="text/plain",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    @classmethod
+    async def start(cls):
+        """Starts the localhost exporter."""
+        if cls._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", cls._handle)
+        cls._runner = web.AppRunner(app, access_log=None)
+        await cls._runner.setup()
+        try:
+            await web.TCPSite(cls._runner, "127.0.0.1", METRICS_PORT).start()
+        except OSError as e:
+            LOGGER.error(f"Metrics exporter couldn't start: {e}")
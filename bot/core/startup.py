@@ -325,6 +325,7 @@ async def load_configurations():
     PORT = int(environ.get("PORT") or environ.get("BASE_URL_PORT") or "80")
     await create_subprocess_shell(
         f"gunicorn -k uvicorn.workers.UvicornWorker -w 1 web.wserver:app --bind 0.0.0.0:{PORT}",
+        env={**environ, "METRICS_TOKEN": Config.METRICS_TOKEN},
     )
 
     if await aiopath.exists("cfg.zip"):
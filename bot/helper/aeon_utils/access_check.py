@@ -15,6 +15,7 @@ from bot.helper.ext_utils.db_handler import database
 from bot.helper.ext_utils.help_messages import nsfw_keywords
 from bot.helper.ext_utils.status_utils import get_readable_time
 from bot.helper.telegram_helper.button_build import ButtonMaker
+from bot.helper.telegram_helper.rate_limiter import UPLOAD, RateLimiter
 
 
 async def error_check(message):
@@ -72,7 +73,11 @@ async def error_check(message):
             user_data.get(user_id, {}).get("SUDO"),
         }:
             try:
-                temp_msg = await message._client.send_message(
+                temp_msg = await RateLimiter.run(
+                    message._client,
+                    user_id,
+                    UPLOAD,
+                    message._client.send_message,
                     chat_id=user_id,
                     text="<b>Checking Access...</b>",
                 )
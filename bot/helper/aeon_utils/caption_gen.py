@@ -1,4 +1,3 @@
-import json
 import os
 from contextlib import suppress
 from hashlib import md5
@@ -7,7 +6,7 @@ from aiofiles.os import path as aiopath
 from langcodes import Language
 
 from bot import LOGGER
-from bot.helper.ext_utils.bot_utils import cmd_exec
+from bot.helper.ext_utils.media_utils import MediaProbe
 from bot.helper.ext_utils.status_utils import (
     get_readable_file_size,
     get_readable_time,
@@ -23,7 +22,7 @@ class DefaultDict(dict):
 
 async def generate_caption(filename, directory, caption_template):
     """
-    Generates a caption for a media file based on its MediaInfo
+    Generates a caption for a media file based on its cached ffprobe output
     and a provided template.
 
     Args:
@@ -32,41 +31,49 @@ async def generate_caption(filename, directory, caption_template):
         caption_template: A string template for the caption with placeholders.
 
     Returns:
-        A formatted caption string or the original filename if MediaInfo fails.
+        A formatted caption string or the original filename if probing fails.
     """
     file_path = os.path.join(directory, filename)
 
     try:
-        result = await cmd_exec(["mediainfo", "--Output=JSON", file_path])
-        if result[1]:
-            LOGGER.info(f"MediaInfo command output: {result[1]}")
-
-        mediainfo_data = json.loads(result[0])
+        probe_data, stderr, _ = await MediaProbe.get(file_path)
+        if stderr:
+            LOGGER.info(f"ffprobe output: {stderr}")
     except Exception as error:
         LOGGER.error(f"Failed to retrieve media info: {error}. File may not exist!")
         return filename
 
-    media_data = mediainfo_data.get("media", {})
-    track_data = media_data.get("track", [])
+    streams = probe_data.get("streams", [])
     video_metadata = next(
-        (track for track in track_data if track["@type"] == "Video"),
+        (
+            stream
+            for stream in streams
+            if stream.get("codec_type") == "video"
+            and not stream.get("disposition", {}).get("attached_pic")
+        ),
         {},
     )
-    audio_metadata = [track for track in track_data if track["@type"] == "Audio"]
-    subtitle_metadata = [track for track in track_data if track["@type"] == "Text"]
-
-    video_duration = round(float(video_metadata.get("Duration", 0)))
-    video_quality = get_video_quality(video_metadata.get("Height", None))
+    audio_metadata = [
+        stream for stream in streams if stream.get("codec_type") == "audio"
+    ]
+    subtitle_metadata = [
+        stream for stream in streams if stream.get("codec_type") == "subtitle"
+    ]
+
+    video_duration = round(
+        float(probe_data.get("format", {}).get("duration", 0)),
+    )
+    video_quality = get_video_quality(video_metadata.get("height", None))
 
     audio_languages = ", ".join(
         parse_audio_language("", audio)
         for audio in audio_metadata
-        if audio.get("Language")
+        if get_language(audio)
     )
     subtitle_languages = ", ".join(
         parse_subtitle_language("", subtitle)
         for subtitle in subtitle_metadata
-        if subtitle.get("Language")
+        if get_language(subtitle)
     )
 
     audio_languages = audio_languages if audio_languages else "Unknown"
@@ -113,6 +120,20 @@ def get_video_quality(height):
     return "Unknown"
 
 
+def get_language(stream):
+    """
+    Returns the language tag of an ffprobe stream, ignoring undefined ones.
+
+    Args:
+        stream: A dictionary representing a stream from ffprobe.
+
+    Returns:
+        The language code or None.
+    """
+    language = stream.get("tags", {}).get("language")
+    return language if language and language != "und" else None
+
+
 def parse_audio_language(existing_languages, audio_stream):
     """
     Parses the language from an audio stream and appends its display name
@@ -120,12 +141,12 @@ def parse_audio_language(existing_languages, audio_stream):
 
     Args:
         existing_languages: A string of already parsed audio languages.
-        audio_stream: A dictionary representing an audio stream from MediaInfo.
+        audio_stream: A dictionary representing an audio stream from ffprobe.
 
     Returns:
         An updated string of audio languages.
     """
-    language_code = audio_stream.get("Language")
+    language_code = get_language(audio_stream)
     if language_code:
         with suppress(Exception):
             language_name = Language.get(language_code).display_name()
@@ -142,12 +163,12 @@ def parse_subtitle_language(existing_subtitles, subtitle_stream):
 
     Args:
         existing_subtitles: A string of already parsed subtitle languages.
-        subtitle_stream: A dictionary representing a subtitle stream from MediaInfo.
+        subtitle_stream: A dictionary representing a subtitle stream from ffprobe.
 
     Returns:
         An updated string of subtitle languages.
     """
-    subtitle_code = subtitle_stream.get("Language")
+    subtitle_code = get_language(subtitle_stream)
     if subtitle_code:
         with suppress(Exception):
             subtitle_name = Language.get(subtitle_code).display_name()
@@ -1,13 +1,11 @@
-import json
-from asyncio import create_subprocess_exec
-from asyncio.subprocess import PIPE
-
-from bot import LOGGER, cpu_no
+from bot import LOGGER
+from bot.core.cpu_scheduler import CpuScheduler
+from bot.helper.ext_utils.media_utils import MediaProbe
 
 
 async def get_streams(file):
     """
-    Gets media stream information using ffprobe.
+    Gets media stream information from the shared ffprobe cache.
 
     Args:
         file: Path to the media file.
@@ -16,29 +14,20 @@ async def get_streams(file):
         A list of stream objects (dictionaries) or None if an error occurs
         or no streams are found.
     """
-    cmd = [
-        "ffprobe",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-print_format",
-        "json",
-        "-show_streams",
-        file,
-    ]
-    process = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-    stdout, stderr = await process.communicate()
+    try:
+        data, stderr, code = await MediaProbe.get(file)
+    except Exception as e:
+        LOGGER.error(f"Error getting stream info: {e}")
+        return None
 
-    if process.returncode != 0:
-        LOGGER.error(f"Error getting stream info: {stderr.decode().strip()}")
+    if code != 0:
+        LOGGER.error(f"Error getting stream info: {stderr.strip()}")
         return None
 
     try:
-        return json.loads(stdout)["streams"]
+        return data["streams"]
     except KeyError:
-        LOGGER.error(
-            f"No streams found in the ffprobe output: {stdout.decode().strip()}",
-        )
+        LOGGER.error(f"No streams found in the ffprobe output: {data}")
         return None
 
 
@@ -69,7 +58,7 @@ async def get_watermark_cmd(file, key):
         "-vf",
         f"drawtext=text='{key}':fontfile={font_path}:fontsize=20:fontcolor=white:x=10:y=10",
         "-threads",
-        f"{max(1, cpu_no // 2)}",
+        f"{CpuScheduler.threads()}",
         temp_file,
     ]
 
@@ -182,7 +171,7 @@ async def get_metadata_cmd(file_path, key):
         else:
             cmd.extend(["-map", f"0:{stream_index}"])
 
-    cmd.extend(["-threads", f"{max(1, cpu_no // 2)}", temp_file])
+    cmd.extend(["-threads", f"{CpuScheduler.threads()}", temp_file])
     return cmd, temp_file
 
 
@@ -224,7 +213,7 @@ async def get_embed_thumb_cmd(file, attachment_path):
         "-map",
         "0",
         "-threads",
-        f"{max(1, cpu_no // 2)}",
+        f"{CpuScheduler.threads()}",
         temp_file,
     ]
 
@@ -1,12 +1,10 @@
 import contextlib
 import os
-from asyncio import gather, sleep
+from asyncio import gather
 from collections import Counter
 from copy import deepcopy
 from os import path as ospath
-from os import walk
 from re import IGNORECASE, findall, sub
-from secrets import token_hex
 from shlex import split
 
 from aiofiles.os import listdir, makedirs, remove
@@ -17,28 +15,25 @@ from pyrogram.enums import ChatAction
 from bot import (
     DOWNLOAD_DIR,
     LOGGER,
-    cpu_eater_lock,
     excluded_extensions,
-    intervals,
-    multi_tags,
     task_dict,
     task_dict_lock,
     user_data,
 )
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
+from bot.core.cpu_scheduler import CpuScheduler
 from bot.helper.aeon_utils.command_gen import (
     get_embed_thumb_cmd,
     get_metadata_cmd,
     get_watermark_cmd,
 )
 
-from .ext_utils.bot_utils import get_size_bytes, new_task, sync_to_async
+from .ext_utils.bot_utils import get_size_bytes
 from .ext_utils.bulk_links import extract_bulk_links
 from .ext_utils.files_utils import (
     SevenZ,
     get_base_name,
-    get_path_size,
     is_archive,
     is_archive_split,
     is_first_archive_split,
@@ -57,6 +52,7 @@ from .ext_utils.media_utils import (
     is_mkv,
     take_ss,
 )
+from .ext_utils.task_manager import BulkQueue
 from .mirror_leech_utils.gdrive_utils.list import GoogleDriveList
 from .mirror_leech_utils.rclone_utils.list import RcloneList
 from .mirror_leech_utils.status_utils.ffmpeg_status import FFmpegStatus
@@ -64,7 +60,6 @@ from .mirror_leech_utils.status_utils.sevenz_status import SevenZStatus
 from .telegram_helper.message_utils import (
     get_tg_link_message,
     send_message,
-    send_status_message,
     temp_download,
 )
 
@@ -74,7 +69,9 @@ class TaskConfig:
 
     def __init__(self):
         """Initializes the TaskConfig object based on the incoming message."""
-        self.mid = self.message.id
+        # Items of a BulkQueue share one message and carry their own id.
+        self.mid = getattr(self.message, "task_id", None) or self.message.id
+        self.in_bulk = self.mid != self.message.id
         self.user = self.message.from_user or self.message.sender_chat
         self.user_id = self.user.id
         self.user_dict = user_data.get(self.user_id, {})
@@ -133,6 +130,7 @@ class TaskConfig:
         self.ffmpeg_cmds = None
         self.chat_thread_id = None
         self.subproc = None
+        self.manifest = None
         self.thumb = None
         self.excluded_extensions = []
         self.files_to_proceed = []
@@ -612,107 +610,51 @@ class TaskConfig:
             else:
                 self.tag = self.user.title
 
-    @new_task
     async def run_multi(self, input_list, obj):
-        await sleep(7)
-        if not self.multi_tag and self.multi > 1:
-            self.multi_tag = token_hex(2)
-            multi_tags.add(self.multi_tag)
-        elif self.multi <= 1:
-            if self.multi_tag in multi_tags:
-                multi_tags.discard(self.multi_tag)
+        """Queues the next `-i` messages after the replied one as items of a
+        BulkQueue; this listener handles the first one itself.
+        """
+        if self.in_bulk or self.multi <= 1 or not self.message.reply_to_message_id:
             return
-        if self.multi_tag and self.multi_tag not in multi_tags:
-            await send_message(
-                self.message,
-                f"{self.tag} Multi-task has been cancelled!",
+        msg = [s.strip() for s in input_list]
+        index = msg.index("-i")
+        first_id = self.message.reply_to_message_id + 1
+        message_ids = list(range(first_id, first_id + self.multi - 1))
+        replies = []
+        for i in range(0, len(message_ids), 200):
+            replies.extend(
+                await self.client.get_messages(
+                    chat_id=self.message.chat.id,
+                    message_ids=message_ids[i : i + 200],
+                ),
             )
-            await send_status_message(self.message)
-            async with task_dict_lock:
-                for fd_name in self.same_dir:
-                    self.same_dir[fd_name]["total"] -= self.multi
-            return
-        if len(self.bulk) != 0:
-            msg = input_list[:1]
-            msg.append(f"{self.bulk[0]} -i {self.multi - 1} {self.options}")
-            msgts = " ".join(msg)
-            if self.multi > 2:
-                msgts += f"\nCancel Multi: <code>/stop {self.multi_tag}</code>"
-            nextmsg = await send_message(self.message, msgts)
-        else:
-            msg = [s.strip() for s in input_list]
-            index = msg.index("-i")
-            msg[index + 1] = f"{self.multi - 1}"
-            nextmsg = await self.client.get_messages(
-                chat_id=self.message.chat.id,
-                message_ids=self.message.reply_to_message_id + 1,
-            )
-            msgts = " ".join(msg)
-            if self.multi > 2:
-                msgts += f"\nCancel Multi: <code>/stop {self.multi_tag}</code>"
-            nextmsg = await send_message(nextmsg, msgts)
-        nextmsg = await self.client.get_messages(
-            chat_id=self.message.chat.id,
-            message_ids=nextmsg.id,
-        )
-        if self.message.from_user:
-            nextmsg.from_user = self.user
-        else:
-            nextmsg.sender_chat = self.user
-        if intervals["stopAll"]:
-            return
-        await obj(
-            self.client,
-            nextmsg,
-            self.is_qbit,
-            self.is_leech,
-            self.is_jd,
-            self.is_nzb,
-            self.same_dir,
-            self.bulk,
-            self.multi_tag,
-            self.options,
-        ).new_event()
+        items = []
+        for i, reply_to in enumerate(replies, start=1):
+            msg[index + 1] = f"{self.multi - i}"
+            items.append((" ".join(msg), reply_to))
+        await BulkQueue(self, obj, items).run()
+
+    async def run_bulk(self, cmd, links, obj):
+        """Queues one item per link as a BulkQueue."""
+        items = [
+            (f"{cmd} {link} -i {len(links) - i} {self.options}", None)
+            for i, link in enumerate(links)
+        ]
+        await BulkQueue(self, obj, items).run()
 
     async def init_bulk(self, input_list, bulk_start, bulk_end, obj):
         try:
             self.bulk = await extract_bulk_links(self.message, bulk_start, bulk_end)
             if len(self.bulk) == 0:
                 raise ValueError("Bulk Empty!")
-            b_msg = input_list[:1]
             self.options = input_list[1:]
             index = self.options.index("-b")
             del self.options[index]
             if bulk_start or bulk_end:
                 del self.options[index + 1]
             self.options = " ".join(self.options)
-            b_msg.append(f"{self.bulk[0]} -i {len(self.bulk)} {self.options}")
-            msg = " ".join(b_msg)
-            if len(self.bulk) > 2:
-                self.multi_tag = token_hex(2)
-                multi_tags.add(self.multi_tag)
-                msg += f"\nCancel Multi: <code>/stop {self.multi_tag}</code>"
-            nextmsg = await send_message(self.message, msg)
-            nextmsg = await self.client.get_messages(
-                chat_id=self.message.chat.id,
-                message_ids=nextmsg.id,
-            )
-            if self.message.from_user:
-                nextmsg.from_user = self.user
-            else:
-                nextmsg.sender_chat = self.user
-            await obj(
-                self.client,
-                nextmsg,
-                self.is_qbit,
-                self.is_leech,
-                self.is_jd,
-                self.is_nzb,
-                self.same_dir,
-                self.bulk,
-                self.multi_tag,
-                self.options,
-            ).new_event()
+            await self.get_tag(self.message.text.split("\n"))
+            await self.run_bulk(input_list[0], self.bulk, obj)
         except Exception as e:
             await send_message(
                 self.message,
@@ -726,11 +668,7 @@ class TaskConfig:
         if self.is_file and is_archive(dl_path):
             self.files_to_proceed.append(dl_path)
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     if is_first_archive_split(file_) or (
                         is_archive(file_)
@@ -746,8 +684,8 @@ class TaskConfig:
         LOGGER.info(f"Extracting: {self.name}")
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Extract")
-        for dirpath, _, files in await sync_to_async(
-            walk,
+        extracted = set()
+        for dirpath, _, files in self.manifest.walk(
             self.up_dir or self.dir,
             topdown=False,
         ):
@@ -763,6 +701,7 @@ class TaskConfig:
                     if not self.is_file:
                         self.subname = file_
                     code = await sevenz.extract(f_path, t_path, pswd)
+                    extracted.add(t_path)
                 else:
                     code = 0
             if self.is_cancelled:
@@ -775,6 +714,10 @@ class TaskConfig:
                             await remove(del_path)
                         except Exception:
                             self.is_cancelled = True
+                        self.manifest.discard(del_path)
+        for t_dir in extracted:
+            if not any(t_dir.startswith(f"{d}/") for d in extracted):
+                await self.manifest.rescan(t_dir)
         if self.proceed_count == 0:
             LOGGER.info("No extractable files found!")
         return t_path if self.is_file and code == 0 else dl_path
@@ -799,7 +742,7 @@ class TaskConfig:
                     "-progress",
                     "pipe:1",
                     "-threads",
-                    "4",
+                    f"{CpuScheduler.threads()}",
                     *ffmpeg_cmd,
                 ]
                 if "-del" in cmd:
@@ -843,8 +786,8 @@ class TaskConfig:
                     await makedirs(new_folder, exist_ok=True)
                     file_path = f"{new_folder}/{name}"
                     await move(dl_path, file_path)
+                    self.manifest.discard(dl_path)
                     if not checked:
-                        checked = True
                         async with task_dict_lock:
                             task_dict[self.mid] = FFmpegStatus(
                                 self,
@@ -853,8 +796,9 @@ class TaskConfig:
                                 "FFmpeg",
                             )
                         self.progress = False
-                        await cpu_eater_lock.acquire()
+                        cpu_job = await CpuScheduler.acquire(self)
                         self.progress = True
+                        checked = True
                     LOGGER.info(f"Running FFmpeg command for: {file_path}")
                     for index in input_indexes:
                         if cmd[index + 1].startswith("mltb"):
@@ -886,9 +830,9 @@ class TaskConfig:
                     else:
                         await move(file_path, dl_path)
                         await rmtree(new_folder)
+                    await self.manifest.rescan(dl_path)
                 else:
-                    for dirpath, _, files in await sync_to_async(
-                        walk,
+                    for dirpath, _, files in self.manifest.walk(
                         dl_path,
                         topdown=False,
                     ):
@@ -915,7 +859,6 @@ class TaskConfig:
                             self.proceed_count += 1
                             var_cmd[index + 1] = f_path
                             if not checked:
-                                checked = True
                                 async with task_dict_lock:
                                     task_dict[self.mid] = FFmpegStatus(
                                         self,
@@ -924,26 +867,32 @@ class TaskConfig:
                                         "FFmpeg",
                                     )
                                 self.progress = False
-                                await cpu_eater_lock.acquire()
+                                cpu_job = await CpuScheduler.acquire(self)
                                 self.progress = True
+                                checked = True
                             LOGGER.info(f"Running FFmpeg command for: {f_path}")
-                            self.subsize = await get_path_size(f_path)
+                            self.subsize = self.manifest.size(f_path)
                             self.subname = file_
                             res = await ffmpeg.ffmpeg_cmds(var_cmd, f_path)
                             if res and delete_files:
                                 await remove(f_path)
+                                self.manifest.discard(f_path)
                                 if len(res) == 1:
                                     file_name = ospath.basename(res[0])
                                     if file_name.startswith("ffmpeg"):
                                         newname = file_name.split(".", 1)[-1]
                                         newres = ospath.join(dirpath, newname)
                                         await move(res[0], newres)
+                                        res = [newres]
+                            if res:
+                                for output in res:
+                                    await self.manifest.add(output)
                 for inp in inputs.values():
                     if "/temp/" in inp and aiopath.exists(inp):
                         await remove(inp)
         finally:
             if checked:
-                cpu_eater_lock.release()
+                CpuScheduler.release(cpu_job)
         return dl_path
 
     async def substitute(self, dl_path):
@@ -988,8 +937,9 @@ class TaskConfig:
             new_path = ospath.join(up_dir, new_name)
             with contextlib.suppress(Exception):
                 await move(dl_path, new_path)
+                self.manifest.move(dl_path, new_path)
             return new_path
-        for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
+        for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
             for file_ in files:
                 f_path = ospath.join(dirpath, file_)
                 new_name = perform_substitution(file_, self.name_sub)
@@ -997,6 +947,7 @@ class TaskConfig:
                     continue
                 with contextlib.suppress(Exception):
                     await move(f_path, ospath.join(dirpath, new_name))
+                    self.manifest.move(f_path, ospath.join(dirpath, new_name))
         return dl_path
 
     async def remove_www_prefix(self, dl_path):
@@ -1018,9 +969,10 @@ class TaskConfig:
             new_path = ospath.join(up_dir, new_name)
             with contextlib.suppress(Exception):
                 await move(dl_path, new_path)
+                self.manifest.move(dl_path, new_path)
             return new_path
 
-        for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
+        for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
             for file_ in files:
                 f_path = ospath.join(dirpath, file_)
                 new_name = clean_filename(file_)
@@ -1028,6 +980,7 @@ class TaskConfig:
                     continue
                 with contextlib.suppress(Exception):
                     await move(f_path, ospath.join(dirpath, new_name))
+                    self.manifest.move(f_path, ospath.join(dirpath, new_name))
 
         return dl_path
 
@@ -1046,18 +999,18 @@ class TaskConfig:
                         move(dl_path, f"{new_folder}/{name}"),
                         move(res, new_folder),
                     )
+                    self.manifest.discard(dl_path)
+                    await self.manifest.rescan(new_folder)
                     return new_folder
         else:
             LOGGER.info(f"Creating Screenshot for: {dl_path}")
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     f_path = ospath.join(dirpath, file_)
-                    if (await get_document_type(f_path))[0]:
-                        await take_ss(f_path, ss_nb)
+                    if (await get_document_type(f_path))[0] and (
+                        res := await take_ss(f_path, ss_nb)
+                    ):
+                        await self.manifest.rescan(res)
         return dl_path
 
     async def convert_media(self, dl_path, gid):
@@ -1103,11 +1056,7 @@ class TaskConfig:
         if self.is_file:
             all_files.append(dl_path)
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     f_path = ospath.join(dirpath, file_)
                     all_files.append(f_path)
@@ -1156,7 +1105,7 @@ class TaskConfig:
             async with task_dict_lock:
                 task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Convert")
             self.progress = False
-            async with cpu_eater_lock:
+            async with CpuScheduler.slot(self):
                 self.progress = True
                 for f_path, f_type in self.files_to_proceed.items():
                     self.proceed_count += 1
@@ -1164,7 +1113,7 @@ class TaskConfig:
                     if self.is_file:
                         self.subsize = self.size
                     else:
-                        self.subsize = await get_path_size(f_path)
+                        self.subsize = self.manifest.size(f_path)
                         self.subname = ospath.basename(f_path)
                     if f_type == "video":
                         res = await ffmpeg.convert_video(f_path, vext)
@@ -1176,6 +1125,8 @@ class TaskConfig:
                         except Exception:
                             self.is_cancelled = True
                             return False
+                        self.manifest.discard(f_path)
+                        await self.manifest.add(res)
                         if self.is_file:
                             return res
         return dl_path
@@ -1199,11 +1150,7 @@ class TaskConfig:
             file_ = ospath.basename(dl_path)
             self.files_to_proceed[dl_path] = file_
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     f_path = ospath.join(dirpath, file_)
                     if (await get_document_type(f_path))[0]:
@@ -1213,7 +1160,7 @@ class TaskConfig:
             async with task_dict_lock:
                 task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Sample Video")
             self.progress = False
-            async with cpu_eater_lock:
+            async with CpuScheduler.slot(self):
                 self.progress = True
                 LOGGER.info(f"Creating sample video for: {self.name}")
                 for f_path, file_ in self.files_to_proceed.items():
@@ -1221,7 +1168,7 @@ class TaskConfig:
                     if self.is_file:
                         self.subsize = self.size
                     else:
-                        self.subsize = await get_path_size(f_path)
+                        self.subsize = self.manifest.size(f_path)
                         self.subname = file_
                     res = await ffmpeg.sample_video(
                         f_path,
@@ -1235,7 +1182,11 @@ class TaskConfig:
                             move(f_path, f"{new_folder}/{file_}"),
                             move(res, f"{new_folder}/SAMPLE.{file_}"),
                         )
+                        self.manifest.discard(f_path)
+                        await self.manifest.rescan(new_folder)
                         return new_folder
+                    if res:
+                        await self.manifest.add(res)
         return dl_path
 
     async def proceed_compress(self, dl_path, gid):
@@ -1255,24 +1206,22 @@ class TaskConfig:
         sevenz = SevenZ(self)
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Zip")
-        return await sevenz.zip(dl_path, up_path, pswd)
+        res = await sevenz.zip(dl_path, up_path, pswd)
+        await self.manifest.rescan(ospath.dirname(up_path))
+        return res
 
     async def proceed_split(self, dl_path, gid):
         """Splits files larger than the specified split size."""
         self.files_to_proceed = {}
         if self.is_file:
-            f_size = await get_path_size(dl_path)
+            f_size = self.manifest.size(dl_path)
             if f_size > self.split_size:
                 self.files_to_proceed[dl_path] = [f_size, ospath.basename(dl_path)]
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     f_path = ospath.join(dirpath, file_)
-                    f_size = await get_path_size(f_path)
+                    f_size = self.manifest.size(f_path)
                     if f_size > self.split_size:
                         self.files_to_proceed[f_path] = [f_size, file_]
         if self.files_to_proceed:
@@ -1302,6 +1251,7 @@ class TaskConfig:
                         await remove(f_path)
                     except Exception:
                         self.is_cancelled = True
+                await self.manifest.refresh_dir(ospath.dirname(f_path))
             return None
         return None
 
@@ -1315,7 +1265,6 @@ class TaskConfig:
                 cmd, temp_file = await get_metadata_cmd(dl_path, key)
                 if cmd:
                     if not checked:
-                        checked = True
                         async with task_dict_lock:
                             task_dict[self.mid] = FFmpegStatus(
                                 self,
@@ -1324,31 +1273,29 @@ class TaskConfig:
                                 "Metadata",
                             )
                         self.progress = False
-                        await cpu_eater_lock.acquire()
+                        cpu_job = await CpuScheduler.acquire(self)
                         self.progress = True
+                        checked = True
                     self.subsize = self.size
                     res = await ffmpeg.metadata_watermark_cmds(cmd, dl_path)
                     if res:
                         os.replace(temp_file, dl_path)
+                        await self.manifest.add(dl_path)
                     elif await aiopath.exists(temp_file):
                         os.remove(temp_file)
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     file_path = ospath.join(dirpath, file_)
                     if self.is_cancelled:
-                        cpu_eater_lock.release()
+                        if checked:
+                            CpuScheduler.release(cpu_job)
                         return ""
                     self.proceed_count += 1
                     if is_mkv(file_path):
                         cmd, temp_file = await get_metadata_cmd(file_path, key)
                         if cmd:
                             if not checked:
-                                checked = True
                                 async with task_dict_lock:
                                     task_dict[self.mid] = FFmpegStatus(
                                         self,
@@ -1357,10 +1304,11 @@ class TaskConfig:
                                         "Metadata",
                                     )
                                 self.progress = False
-                                await cpu_eater_lock.acquire()
+                                cpu_job = await CpuScheduler.acquire(self)
                                 self.progress = True
+                                checked = True
                             LOGGER.info(f"Running metadata command for: {file_path}")
-                            self.subsize = await aiopath.getsize(file_path)
+                            self.subsize = self.manifest.size(file_path)
                             self.subname = file_
                             res = await ffmpeg.metadata_watermark_cmds(
                                 cmd,
@@ -1368,10 +1316,11 @@ class TaskConfig:
                             )
                             if res:
                                 os.replace(temp_file, file_path)
+                                await self.manifest.add(file_path)
                             elif await aiopath.exists(temp_file):
                                 os.remove(temp_file)
         if checked:
-            cpu_eater_lock.release()
+            CpuScheduler.release(cpu_job)
         return dl_path
 
     async def proceed_watermark(self, dl_path, gid):
@@ -1384,7 +1333,6 @@ class TaskConfig:
                 cmd, temp_file = await get_watermark_cmd(dl_path, key)
                 if cmd:
                     if not checked:
-                        checked = True
                         async with task_dict_lock:
                             task_dict[self.mid] = FFmpegStatus(
                                 self,
@@ -1393,30 +1341,28 @@ class TaskConfig:
                                 "Watermark",
                             )
                         self.progress = False
-                        await cpu_eater_lock.acquire()
+                        cpu_job = await CpuScheduler.acquire(self)
                         self.progress = True
+                        checked = True
                     self.subsize = self.size
                     res = await ffmpeg.metadata_watermark_cmds(cmd, dl_path)
                     if res:
                         os.replace(temp_file, dl_path)
+                        await self.manifest.add(dl_path)
                     elif await aiopath.exists(temp_file):
                         os.remove(temp_file)
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     file_path = ospath.join(dirpath, file_)
                     if self.is_cancelled:
-                        cpu_eater_lock.release()
+                        if checked:
+                            CpuScheduler.release(cpu_job)
                         return ""
                     if is_mkv(file_path):
                         cmd, temp_file = await get_watermark_cmd(file_path, key)
                         if cmd:
                             if not checked:
-                                checked = True
                                 async with task_dict_lock:
                                     task_dict[self.mid] = FFmpegStatus(
                                         self,
@@ -1425,12 +1371,13 @@ class TaskConfig:
                                         "Watermark",
                                     )
                                 self.progress = False
-                                await cpu_eater_lock.acquire()
+                                cpu_job = await CpuScheduler.acquire(self)
                                 self.progress = True
+                                checked = True
                             LOGGER.info(
                                 f"Running watermark command for: {file_path}"
                             )
-                            self.subsize = await aiopath.getsize(file_path)
+                            self.subsize = self.manifest.size(file_path)
                             self.subname = file_
                             res = await ffmpeg.metadata_watermark_cmds(
                                 cmd,
@@ -1438,10 +1385,11 @@ class TaskConfig:
                             )
                             if res:
                                 os.replace(temp_file, file_path)
+                                await self.manifest.add(file_path)
                             elif await aiopath.exists(temp_file):
                                 os.remove(temp_file)
         if checked:
-            cpu_eater_lock.release()
+            CpuScheduler.release(cpu_job)
         return dl_path
 
     async def proceed_embed_thumb(self, dl_path, gid):
@@ -1454,7 +1402,6 @@ class TaskConfig:
                 cmd, temp_file = await get_embed_thumb_cmd(dl_path, thumb)
                 if cmd:
                     if not checked:
-                        checked = True
                         async with task_dict_lock:
                             task_dict[self.mid] = FFmpegStatus(
                                 self,
@@ -1463,30 +1410,28 @@ class TaskConfig:
                                 "E_thumb",
                             )
                         self.progress = False
-                        await cpu_eater_lock.acquire()
+                        cpu_job = await CpuScheduler.acquire(self)
                         self.progress = True
+                        checked = True
                     self.subsize = self.size
                     res = await ffmpeg.metadata_watermark_cmds(cmd, dl_path)
                     if res:
                         os.replace(temp_file, dl_path)
+                        await self.manifest.add(dl_path)
                     elif await aiopath.exists(temp_file):
                         os.remove(temp_file)
         else:
-            for dirpath, _, files in await sync_to_async(
-                walk,
-                dl_path,
-                topdown=False,
-            ):
+            for dirpath, _, files in self.manifest.walk(dl_path, topdown=False):
                 for file_ in files:
                     file_path = ospath.join(dirpath, file_)
                     if self.is_cancelled:
-                        cpu_eater_lock.release()
+                        if checked:
+                            CpuScheduler.release(cpu_job)
                         return ""
                     if is_mkv(file_path):
                         cmd, temp_file = await get_embed_thumb_cmd(file_path, thumb)
                         if cmd:
                             if not checked:
-                                checked = True
                                 async with task_dict_lock:
                                     task_dict[self.mid] = FFmpegStatus(
                                         self,
@@ -1495,10 +1440,11 @@ class TaskConfig:
                                         "E_thumb",
                                     )
                                 self.progress = False
-                                await cpu_eater_lock.acquire()
+                                cpu_job = await CpuScheduler.acquire(self)
                                 self.progress = True
+                                checked = True
                             LOGGER.info(f"Running cmd for: {file_path}")
-                            self.subsize = await aiopath.getsize(file_path)
+                            self.subsize = self.manifest.size(file_path)
                             self.subname = file_
                             res = await ffmpeg.metadata_watermark_cmds(
                                 cmd,
@@ -1506,8 +1452,9 @@ class TaskConfig:
                             )
                             if res:
                                 os.replace(temp_file, file_path)
+                                await self.manifest.add(file_path)
                             elif await aiopath.exists(temp_file):
                                 os.remove(temp_file)
         if checked:
-            cpu_eater_lock.release()
+            CpuScheduler.release(cpu_job)
         return dl_path
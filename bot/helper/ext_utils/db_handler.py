@@ -1,4 +1,5 @@
 from importlib import import_module
+from time import time
 
 from aiofiles import open as aiopen
 from aiofiles.os import path as aiopath
@@ -309,6 +310,98 @@ class DbManager:
         await self.db.tasks[TgClient.ID].drop()
         return notifier_dict
 
+    async def get_leech_cache(self, key):
+        if self._return:
+            return None
+        return await self.db.leech_cache[TgClient.ID].find_one(
+            {"_id": key},
+            {"_id": 0},
+        )
+
+    async def set_leech_cache(self, key, entry):
+        if self._return:
+            return
+        await self.db.leech_cache[TgClient.ID].replace_one(
+            {"_id": key},
+            entry,
+            upsert=True,
+        )
+
+    async def touch_leech_cache(self, key, used):
+        if self._return:
+            return
+        await self.db.leech_cache[TgClient.ID].update_one(
+            {"_id": key},
+            {"$set": {"used": used}, "$inc": {"hits": 1}},
+        )
+
+    async def delete_leech_cache(self, key):
+        if self._return:
+            return
+        await self.db.leech_cache[TgClient.ID].delete_one({"_id": key})
+
+    async def evict_leech_cache(self, max_age, max_size):
+        """Deletes leech cache entries unused for `max_age` seconds, then the
+        least recently used ones until the cached files add up to at most
+        `max_size` bytes. Zero disables a limit.
+
+        Returns:
+            The number of deleted entries.
+        """
+        if self._return:
+            return 0
+        collection = self.db.leech_cache[TgClient.ID]
+        deleted = 0
+        if max_age:
+            res = await collection.delete_many({"used": {"$lt": time() - max_age}})
+            deleted += res.deleted_count
+        if max_size:
+            total = 0
+            async for row in await collection.aggregate(
+                [{"$group": {"_id": None, "size": {"$sum": "$size"}}}],
+            ):
+                total = row["size"]
+            ids = []
+            async for row in collection.find({}, {"size": 1}).sort("used", 1):
+                if total <= max_size:
+                    break
+                ids.append(row["_id"])
+                total -= row["size"]
+            if ids:
+                res = await collection.delete_many({"_id": {"$in": ids}})
+                deleted += res.deleted_count
+        return deleted
+
+    async def get_mirror_cache(self, key):
+        if self._return:
+            return None
+        return await self.db.mirror_cache[TgClient.ID].find_one({"_id": key})
+
+    async def add_mirror_cache(self, key, result):
+        """Stores the result of a mirror, replacing the previous result of
+        the same source in the same destination.
+        """
+        if self._return:
+            return
+        collection = self.db.mirror_cache[TgClient.ID]
+        await collection.update_one(
+            {"_id": key},
+            {"$pull": {"results": {"up_dest": result["up_dest"]}}},
+        )
+        await collection.update_one(
+            {"_id": key},
+            {"$push": {"results": {"$each": [result], "$slice": -10}}},
+            upsert=True,
+        )
+
+    async def delete_mirror_cache(self, key, up_dest):
+        if self._return:
+            return
+        await self.db.mirror_cache[TgClient.ID].update_one(
+            {"_id": key},
+            {"$pull": {"results": {"up_dest": up_dest}}},
+        )
+
     async def trunc_table(self, name):
         if self._return:
             return
@@ -12,3 +12,7 @@ class RssShutdownException(Exception):
 
 class TgLinkException(Exception):
     """Access denied for this chat."""
+
+
+class TgRateLimited(Exception):
+    """A non blocking Telegram request was skipped to stay under the rate limits."""
@@ -1,7 +1,8 @@
 from asyncio import create_subprocess_exec, sleep, wait_for
 from asyncio.subprocess import PIPE
+from contextlib import suppress
 from os import path as ospath
-from os import readlink, walk
+from os import readlink, scandir, walk
 from re import IGNORECASE, escape
 from re import search as re_search
 from re import split as re_split
@@ -18,9 +19,6 @@ from aiofiles.os import (
 from aiofiles.os import (
     path as aiopath,
 )
-from aiofiles.os import (
-    readlink as aioreadlink,
-)
 from aioshutil import rmtree as aiormtree
 from magic import Magic
 
@@ -165,22 +163,127 @@ async def clean_unwanted(opath: str):
             await rmdir(dirpath)
 
 
+def _scan_sizes(opath: str) -> dict[str, int]:
+    """Maps every file under a path to its size in a single walk.
+    Follows symbolic links for files.
+    """
+    if ospath.isfile(opath):
+        return {opath: ospath.getsize(opath)}
+    sizes = {}
+    for root, _, files in walk(opath):
+        for f in files:
+            abs_path = ospath.join(root, f)
+            try:
+                sizes[abs_path] = ospath.getsize(abs_path)
+            except OSError:
+                continue
+    return sizes
+
+
+def _scan_dir_sizes(dirpath: str) -> dict[str, int]:
+    sizes = {}
+    with suppress(OSError), scandir(dirpath) as entries:
+        for entry in entries:
+            with suppress(OSError):
+                if entry.is_file():
+                    sizes[entry.path] = entry.stat().st_size
+    return sizes
+
+
 async def get_path_size(opath: str) -> int:
     """Calculates the total size of a file or directory (recursively for directories).
     Follows symbolic links for files.
     """
-    total_size = 0
     if await aiopath.isfile(opath):
-        if await aiopath.islink(opath):
-            opath = await aioreadlink(opath)
         return await aiopath.getsize(opath)
-    for root, _, files in await sync_to_async(walk, opath):
-        for f in files:
-            abs_path = ospath.join(root, f)
-            if await aiopath.islink(abs_path):
-                abs_path = await aioreadlink(abs_path)
-            total_size += await aiopath.getsize(abs_path)
-    return total_size
+    return sum((await sync_to_async(_scan_sizes, opath)).values())
+
+
+class FileManifest:
+    """Sizes of every file under a task directory, built with one walk after
+    the download.
+
+    Post-processing stages keep it current as they add, remove or rename
+    files, so the task size and the file lists they iterate come from memory
+    instead of new walks of the disk.
+    """
+
+    def __init__(self, root: str):
+        self.root = root.rstrip("/")
+        self.files = {}
+
+    async def build(self):
+        self.files = await sync_to_async(_scan_sizes, self.root)
+        return self
+
+    @staticmethod
+    def _is_under(f_path, opath):
+        return f_path == opath or f_path.startswith(f"{opath}/")
+
+    async def rescan(self, opath: str):
+        """Re-reads a file or directory after a tool wrote unknown outputs."""
+        opath = opath.rstrip("/")
+        self.discard(opath)
+        if await aiopath.exists(opath):
+            self.files.update(await sync_to_async(_scan_sizes, opath))
+
+    async def refresh_dir(self, dirpath: str):
+        """Re-reads the files directly inside a directory, e.g. after a tool
+        wrote its outputs next to its input.
+        """
+        dirpath = dirpath.rstrip("/")
+        for f_path in [f for f in self.files if f.rsplit("/", 1)[0] == dirpath]:
+            del self.files[f_path]
+        self.files.update(await sync_to_async(_scan_dir_sizes, dirpath))
+
+    async def add(self, f_path: str):
+        """Adds a new file or refreshes the size of a modified one."""
+        try:
+            self.files[f_path] = await aiopath.getsize(f_path)
+        except OSError:
+            self.files.pop(f_path, None)
+
+    def discard(self, opath: str):
+        """Drops a file or everything under a directory."""
+        opath = opath.rstrip("/")
+        if self.files.pop(opath, None) is not None:
+            return
+        for f_path in [f for f in self.files if self._is_under(f, opath)]:
+            del self.files[f_path]
+
+    def move(self, src: str, dst: str):
+        """Mirrors a rename of a file or directory."""
+        src, dst = src.rstrip("/"), dst.rstrip("/")
+        for f_path in [f for f in self.files if self._is_under(f, src)]:
+            self.files[f"{dst}{f_path[len(src) :]}"] = self.files.pop(f_path)
+
+    def size(self, opath: str = "") -> int:
+        opath = opath.rstrip("/")
+        if not opath or opath == self.root:
+            return sum(self.files.values())
+        if (f_size := self.files.get(opath)) is not None:
+            return f_size
+        return sum(
+            f_size
+            for f_path, f_size in self.files.items()
+            if self._is_under(f_path, opath)
+        )
+
+    def walk(self, opath: str, topdown: bool = True) -> list:
+        """Same shape as a materialized `os.walk` over the tracked files:
+        a list of (dirpath, [], files) for every directory holding files.
+        """
+        opath = opath.rstrip("/")
+        tree = {}
+        for f_path in self.files:
+            if self._is_under(f_path, opath) and f_path != opath:
+                dirpath, name = f_path.rsplit("/", 1)
+                tree.setdefault(dirpath, []).append(name)
+        return sorted(
+            ((dirpath, [], files) for dirpath, files in tree.items()),
+            key=lambda item: item[0].count("/"),
+            reverse=not topdown,
+        )
 
 
 async def count_files_and_folders(opath: str) -> tuple[int, int]:
@@ -235,11 +338,17 @@ def get_mime_type(file_path: str) -> str:
     return mime_type or "text/plain"
 
 
-async def remove_excluded_files(fpath, ee):
-    for root, _, files in await sync_to_async(walk, fpath):
+async def remove_excluded_files(fpath, ee, manifest=None):
+    if manifest:
+        entries = manifest.walk(fpath)
+    else:
+        entries = await sync_to_async(walk, fpath)
+    for root, _, files in entries:
         for f in files:
             if f.strip().lower().endswith(tuple(ee)):
                 await remove(ospath.join(root, f))
+                if manifest:
+                    manifest.discard(ospath.join(root, f))
 
 
 async def join_files(opath):
@@ -0,0 +1,132 @@
+from hashlib import blake2b
+from os import path as ospath
+from time import time
+from typing import ClassVar
+
+from cachetools import LRUCache
+
+from bot import LOGGER
+from bot.core.config_manager import Config
+from bot.core.metrics import Metrics
+from bot.helper.ext_utils.bot_utils import sync_to_async
+from bot.helper.ext_utils.db_handler import database
+
+SAMPLE_SIZE = 1048576
+EVICT_INTERVAL = 3600
+
+
+def _fingerprint(f_path):
+    """Hashes the name, size and three 1MiB samples (head, middle and tail)
+    of a file, or the whole file when it is smaller than the samples.
+    """
+    size = ospath.getsize(f_path)
+    digest = blake2b(digest_size=20)
+    digest.update(f"{ospath.basename(f_path)}\0{size}\0".encode())
+    with open(f_path, "rb") as f:
+        if size <= SAMPLE_SIZE * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - SAMPLE_SIZE) // 2, size - SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(SAMPLE_SIZE))
+    return f"{size}-{digest.hexdigest()}"
+
+
+class LeechCache:
+    """Maps leeched files to the Telegram file_id they were uploaded as, so
+    the same content is sent again by file_id instead of being uploaded.
+
+    Files are keyed by a sampled fingerprint of their name, size and content,
+    plus the upload variant (document or media). Entries live in the
+    database with an LRU in front. They are dropped once unused for
+    `LEECH_CACHE_DAYS`, and the least recently used ones are dropped while
+    the cached files add up to more than `LEECH_CACHE_SIZE` GB.
+    """
+
+    _cache: ClassVar[LRUCache] = LRUCache(maxsize=4096)
+    _last_evict = 0.0
+    hits = 0
+    misses = 0
+    saved_bytes = 0
+
+    @staticmethod
+    def enabled():
+        return Config.LEECH_CACHE and database.db is not None
+
+    @staticmethod
+    async def key(f_path, variant):
+        return f"{await sync_to_async(_fingerprint, f_path)}-{variant}"
+
+    @classmethod
+    async def get(cls, key):
+        """Returns the cache entry of a key, or None on a miss."""
+        entry = cls._cache.get(key)
+        if entry is None:
+            entry = await database.get_leech_cache(key)
+            if entry is not None:
+                cls._cache[key] = entry
+        if entry is None:
+            cls.misses += 1
+            Metrics.inc("leech_cache_misses_total")
+            return None
+        cls.hits += 1
+        Metrics.inc("leech_cache_hits_total")
+        await database.touch_leech_cache(key, time())
+        return entry
+
+    @classmethod
+    def saved(cls, size):
+        """Records the bytes a hit didn't have to upload."""
+        cls.saved_bytes += size
+        Metrics.inc("leech_cache_saved_bytes_total", size)
+
+    @classmethod
+    async def put(cls, key, size, file_id, session, message):
+        """Stores the upload of a file.
+
+        Args:
+            session: "user" or "bot", the client the file_id belongs to.
+            message: The uploaded message, copied again if the file_id
+                can't be used any more.
+        """
+        now = time()
+        entry = {
+            "size": size,
+            "file_id": file_id,
+            "session": session,
+            "chat_id": message.chat.id,
+            "message_id": message.id,
+            "added": now,
+            "used": now,
+        }
+        cls._cache[key] = entry
+        await database.set_leech_cache(key, entry)
+        if now - cls._last_evict > EVICT_INTERVAL:
+            cls._last_evict = now
+            await cls.evict()
+
+    @classmethod
+    async def drop(cls, key):
+        cls._cache.pop(key, None)
+        await database.delete_leech_cache(key)
+
+    @classmethod
+    async def evict(cls):
+        max_age = Config.LEECH_CACHE_DAYS * 86400
+        max_size = Config.LEECH_CACHE_SIZE * 1073741824
+        if not (max_age or max_size):
+            return
+        try:
+            if await database.evict_leech_cache(max_age, max_size):
+                cls._cache.clear()
+        except Exception as e:
+            LOGGER.error(f"{e}: while evicting the leech cache")
+
+    @classmethod
+    def stats(cls):
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "saved": cls.saved_bytes,
+            "size": len(cls._cache),
+        }
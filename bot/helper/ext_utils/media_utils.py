@@ -1,17 +1,29 @@
 import contextlib
-from asyncio import create_subprocess_exec, gather, sleep, wait_for
+from asyncio import (
+    create_subprocess_exec,
+    create_task,
+    gather,
+    shield,
+    sleep,
+    wait_for,
+)
 from asyncio.subprocess import PIPE
+from json import loads
 from os import path as ospath
+from os import stat
 from re import escape
 from re import search as re_search
 from time import time
+from typing import ClassVar
 
 from aiofiles.os import makedirs, remove
 from aiofiles.os import path as aiopath
 from aioshutil import rmtree
+from cachetools import LRUCache
 from PIL import Image
 
-from bot import DOWNLOAD_DIR, LOGGER, cpu_no
+from bot import DOWNLOAD_DIR, LOGGER
+from bot.core.cpu_scheduler import CpuScheduler
 
 from .bot_utils import cmd_exec, sync_to_async
 from .files_utils import get_mime_type, is_archive, is_archive_split
@@ -32,9 +44,30 @@ async def create_thumb(msg, _id=""):
     return output
 
 
-async def get_media_info(path):
-    try:
-        result = await cmd_exec(
+class MediaProbe:
+    """Runs one combined `ffprobe -show_streams -show_format` per file and
+    caches the parsed output, so every stage of a task that inspects the same
+    file shares a single probe.
+
+    Results are keyed by (device, inode, size, mtime), so a file that gets
+    replaced or rewritten in place is probed again. Failed probes aren't
+    cached, since the file may still be written. Concurrent requests for the
+    same file wait on the probe already running.
+    """
+
+    _cache: ClassVar[LRUCache] = LRUCache(maxsize=1024)
+    _running: ClassVar[dict] = {}
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def _key(path):
+        st = stat(path)
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    @staticmethod
+    async def _run(path):
+        stdout, stderr, code = await cmd_exec(
             [
                 "ffprobe",
                 "-hide_banner",
@@ -42,17 +75,53 @@ async def get_media_info(path):
                 "error",
                 "-print_format",
                 "json",
+                "-show_streams",
                 "-show_format",
                 path,
             ],
         )
+        data = loads(stdout) if stdout and code == 0 else {}
+        return data, stderr, code
+
+    @classmethod
+    async def get(cls, path):
+        """Returns a tuple of (parsed ffprobe json, stderr, return code).
+
+        Raises:
+            OSError: If the file can't be accessed.
+        """
+        key = await sync_to_async(cls._key, path)
+        if (result := cls._cache.get(key)) is not None:
+            cls.hits += 1
+            return result
+        if task := cls._running.get(key):
+            cls.hits += 1
+            return await shield(task)
+        cls.misses += 1
+        task = cls._running[key] = create_task(cls._run(path))
+        try:
+            result = await shield(task)
+        finally:
+            cls._running.pop(key, None)
+        if result[2] == 0:
+            cls._cache[key] = result
+        return result
+
+    @classmethod
+    def stats(cls):
+        return {"hits": cls.hits, "misses": cls.misses, "size": len(cls._cache)}
+
+
+async def get_media_info(path):
+    try:
+        data, _, code = await MediaProbe.get(path)
     except Exception as e:
         LOGGER.error(f"Get Media Info: {e}. Mostly File not found! - File: {path}")
         return 0, None, None
-    if result[0] and result[2] == 0:
-        fields = eval(result[0]).get("format")
+    if data and code == 0:
+        fields = data.get("format")
         if fields is None:
-            LOGGER.error(f"get_media_info: {result}")
+            LOGGER.error(f"get_media_info: {data}")
             return 0, None, None
         duration = round(float(fields.get("duration", 0)))
         tags = fields.get("tags", {})
@@ -74,19 +143,8 @@ async def get_document_type(path):
     if mime_type.startswith("image"):
         return False, False, True
     try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_streams",
-                path,
-            ],
-        )
-        if result[1] and mime_type.startswith("video"):
+        data, stderr, code = await MediaProbe.get(path)
+        if stderr and mime_type.startswith("video"):
             is_video = True
     except Exception as e:
         LOGGER.error(
@@ -101,10 +159,10 @@ async def get_document_type(path):
         if mime_type.startswith("video"):
             is_video = True
         return is_video, is_audio, is_image
-    if result[0] and result[2] == 0:
-        fields = eval(result[0]).get("streams")
+    if data and code == 0:
+        fields = data.get("streams")
         if fields is None:
-            LOGGER.error(f"get_document_type: {result}")
+            LOGGER.error(f"get_document_type: {data}")
             return is_video, is_audio, is_image
         is_video = False
         for stream in fields:
@@ -143,7 +201,7 @@ async def take_ss(video_file, ss_nb) -> bool:
                 "-frames:v",
                 "1",
                 "-threads",
-                f"{max(1, cpu_no // 2)}",
+                f"{CpuScheduler.threads()}",
                 output,
             ]
             cap_time += interval
@@ -182,7 +240,7 @@ async def get_audio_thumbnail(audio_file):
         "-vcodec",
         "copy",
         "-threads",
-        f"{max(1, cpu_no // 2)}",
+        f"{CpuScheduler.threads()}",
         output,
     ]
     try:
@@ -271,7 +329,7 @@ async def get_multiple_frames_thumbnail(video_file, layout, keep_screenshots):
         "-f",
         "mjpeg",
         "-threads",
-        f"{max(1, cpu_no // 2)}",
+        f"{CpuScheduler.threads()}",
         output,
     ]
     try:
@@ -486,7 +544,7 @@ class FFMpeg:
                 "-c:a",
                 "aac",
                 "-threads",
-                f"{max(1, cpu_no // 2)}",
+                f"{CpuScheduler.threads()}",
                 output,
             ]
             if ext == "mp4":
@@ -510,7 +568,7 @@ class FFMpeg:
                 "-c",
                 "copy",
                 "-threads",
-                f"{max(1, cpu_no // 2)}",
+                f"{CpuScheduler.threads()}",
                 output,
             ]
         if self._listener.is_cancelled:
@@ -558,7 +616,7 @@ class FFMpeg:
             "-i",
             audio_file,
             "-threads",
-            f"{max(1, cpu_no // 2)}",
+            f"{CpuScheduler.threads()}",
             output,
         ]
         if self._listener.is_cancelled:
@@ -639,7 +697,7 @@ class FFMpeg:
             "-c:a",
             "aac",
             "-threads",
-            f"{max(1, cpu_no // 2)}",
+            f"{CpuScheduler.threads()}",
             output_file,
         ]
 
@@ -705,7 +763,7 @@ class FFMpeg:
                 "-c",
                 "copy",
                 "-threads",
-                f"{max(1, cpu_no // 2)}",
+                f"{CpuScheduler.threads()}",
                 out_path,
             ]
             if not multi_streams:
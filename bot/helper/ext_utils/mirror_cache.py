@@ -0,0 +1,224 @@
+from base64 import b32decode
+from hashlib import sha1
+from os import path as ospath
+from time import time
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+
+from aiofiles.os import path as aiopath
+
+from bot import LOGGER
+from bot.core.config_manager import Config
+from bot.helper.ext_utils.bot_utils import cmd_exec, sync_to_async
+from bot.helper.ext_utils.db_handler import database
+from bot.helper.ext_utils.links_utils import (
+    is_gdrive_id,
+    is_gdrive_link,
+    is_magnet,
+    is_rclone_path,
+    is_url,
+)
+from bot.helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
+
+
+def _bencode_end(data, start):
+    """Returns the offset right after the bencoded value at `start`."""
+    kind = data[start : start + 1]
+    if kind == b"i":
+        return data.index(b"e", start) + 1
+    if kind in (b"l", b"d"):
+        start += 1
+        while data[start : start + 1] != b"e":
+            start = _bencode_end(data, start)
+        return start + 1
+    colon = data.index(b":", start)
+    return colon + 1 + int(data[start:colon])
+
+
+def _info_hash(data):
+    """Returns the v1 info-hash of a torrent file, the same one magnets of
+    the torrent carry, or None if the file can't be parsed.
+    """
+    try:
+        offset = 1
+        while data[offset : offset + 1] != b"e":
+            key_end = _bencode_end(data, offset)
+            value_end = _bencode_end(data, key_end)
+            if data[offset:key_end] == b"4:info":
+                return sha1(data[key_end:value_end]).hexdigest()
+            offset = value_end
+    except (ValueError, IndexError, RecursionError):
+        pass
+    return None
+
+
+def _file_source(f_path):
+    with open(f_path, "rb") as f:
+        data = f.read()
+    if f_path.endswith(".torrent") and (info_hash := _info_hash(data)):
+        return f"bt:{info_hash}"
+    ext = ospath.splitext(f_path)[1].lstrip(".").lower() or "file"
+    return f"{ext}:{sha1(data).hexdigest()}"
+
+
+def _magnet_source(link):
+    for xt in parse_qs(urlsplit(link).query).get("xt", []):
+        if xt.startswith("urn:btih:"):
+            info_hash = xt[9:]
+            if len(info_hash) == 32:
+                info_hash = b32decode(info_hash.upper()).hex()
+            return f"bt:{info_hash.lower()}"
+        if xt.startswith("urn:btmh:"):
+            return f"bt:{xt[9:].lower()}"
+    return ""
+
+
+def _normalize_url(url):
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (
+            parts.scheme.lower() or "http",
+            parts.netloc.lower(),
+            parts.path.rstrip("/") or "/",
+            query,
+            "",
+        ),
+    )
+
+
+def _drive_exists(result):
+    drive = GoogleDriveHelper()
+    if result["up_dest"].startswith("sa:"):
+        drive.use_sa = True
+    elif result["up_dest"].startswith("tp:"):
+        drive.use_sa = False
+    try:
+        drive.service = drive.authorize()
+        drive.get_file_metadata(drive.get_id_from_url(result["link"]))
+    except Exception:
+        return False
+    return True
+
+
+class MirrorCache:
+    """Remembers where the sources of finished mirrors were uploaded.
+
+    A source is identified by what it points to rather than by its name: the
+    torrent info-hash, the Drive ID or rclone path, the hash of an uploaded
+    .nzb/.dlc file, the Telegram file_unique_id or the normalized URL. Each
+    source keeps the last results per upload destination (link, size and
+    file count), so mirroring it again is answered from the cache, or cloned
+    server side when it goes to another destination.
+
+    Only mirrors that upload the source unchanged are cached, i.e. without
+    extraction, compression, ffmpeg stages, file selection or private tokens.
+    Uploads to a user's own rclone config (mrcc:) or token.pickle (mtp:)
+    aren't cached, results are checked and cloned with the global
+    credentials. What a URL serves can change, so URL results are only used
+    for `MIRROR_CACHE_URL_TTL` hours.
+    """
+
+    @staticmethod
+    def enabled():
+        return Config.MIRROR_CACHE and database.db is not None
+
+    @staticmethod
+    def cacheable(listener):
+        return not (
+            listener.is_leech
+            or listener.select
+            or listener.folder_name
+            or listener.extract
+            or listener.compress
+            or listener.join
+            or listener.sample_video
+            or listener.screen_shots
+            or listener.convert_audio
+            or listener.convert_video
+            or listener.ffmpeg_cmds
+            or listener.name_sub
+            or listener.metadata
+            or listener.watermark
+            or listener.private_link
+            or not isinstance(listener.up_dest, str)
+            or listener.up_dest.startswith(("yt:", "mrcc:", "mtp:"))
+            or not (
+                is_gdrive_id(listener.up_dest) or is_rclone_path(listener.up_dest)
+            )
+        )
+
+    @staticmethod
+    async def source(link, file_=None):
+        """Returns the identity of a source, or an empty string if it has
+        none worth caching.
+        """
+        if file_ is not None:
+            return f"tg:{file_.file_unique_id}"
+        if not isinstance(link, str) or link.startswith(("mtp:", "mrcc:")):
+            return ""
+        if is_magnet(link):
+            return _magnet_source(link)
+        if is_gdrive_link(link) or is_gdrive_id(link):
+            try:
+                return f"gd:{GoogleDriveHelper().get_id_from_url(link)}"
+            except (KeyError, IndexError):
+                return ""
+        if is_rclone_path(link):
+            return f"rc:{link}"
+        if await aiopath.isfile(link):
+            return await sync_to_async(_file_source, link)
+        if is_url(link):
+            return f"url:{_normalize_url(link)}"
+        return ""
+
+    @classmethod
+    async def key(cls, listener, file_=None):
+        """Returns the cache key of a task: its source and the name it is
+        uploaded as.
+        """
+        if source := await cls.source(listener.link, file_):
+            return f"{source}|{listener.name}"
+        return ""
+
+    @staticmethod
+    async def get(key):
+        """Returns the cached results of a key, newest last."""
+        entry = await database.get_mirror_cache(key)
+        if not entry:
+            return []
+        if key.startswith("url:") and (ttl := Config.MIRROR_CACHE_URL_TTL):
+            oldest = time() - ttl * 3600
+            return [
+                result
+                for result in entry["results"]
+                if result.get("added", 0) >= oldest
+            ]
+        return entry["results"]
+
+    @staticmethod
+    async def put(key, up_dest, result):
+        result = {**result, "up_dest": up_dest, "added": time()}
+        try:
+            await database.add_mirror_cache(key, result)
+        except Exception as e:
+            LOGGER.error(f"{e}: while updating the mirror cache")
+
+    @staticmethod
+    async def drop(key, up_dest):
+        await database.delete_mirror_cache(key, up_dest)
+
+    @staticmethod
+    async def exists(result):
+        """Checks that a cached result wasn't deleted from its destination."""
+        if result["rclone_path"]:
+            cmd = [
+                "xone",
+                "lsjson",
+                "--stat",
+                "--no-modtime",
+                "--config",
+                "rclone.conf",
+                result["rclone_path"],
+            ]
+            return (await cmd_exec(cmd))[2] == 0
+        return await sync_to_async(_drive_exists, result)
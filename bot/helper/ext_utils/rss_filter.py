@@ -0,0 +1,96 @@
+from re import compile, escape
+
+
+def _compile(keywords):
+    """Compiles keywords into a single pattern that finds all of them.
+
+    The lookahead makes the search try every position of the text, and the
+    alternation is ordered longest first, so each match is the longest
+    keyword starting at that position. The keywords that are prefixes of it
+    match there too and are added from a precomputed table.
+
+    Returns:
+        A tuple of the pattern and the prefix table, or None if there are no
+        keywords.
+    """
+    keywords = sorted({k for k in keywords if k}, key=len, reverse=True)
+    if not keywords:
+        return None
+    pattern = compile(f"(?=({'|'.join(map(escape, keywords))}))")
+    prefixes = {
+        keyword: frozenset(k for k in keywords if keyword.startswith(k))
+        for keyword in keywords
+    }
+    return pattern, prefixes
+
+
+def _search(compiled, text):
+    # The empty keyword (e.g. from a trailing "|") is part of every title.
+    found = {""}
+    if compiled is not None:
+        pattern, prefixes = compiled
+        for match in pattern.finditer(text):
+            found.update(prefixes[match.group(1)])
+    return found
+
+
+class RssFilter:
+    """Include/exclude filters of one subscription, compiled once when the
+    subscription is created or edited.
+
+    `inf` and `exf` are lists of keyword groups ("|" separated groups of
+    " or " alternatives). An item passes when every inf group has a keyword
+    in its title and no exf group has one. With `sensitive`, keywords are
+    matched against the lowercased title.
+    """
+
+    __slots__ = ("exf", "inf", "keywords", "sensitive")
+
+    def __init__(self, inf, exf, sensitive=False):
+        fold = str.lower if sensitive else str
+        self.inf = tuple(frozenset(map(fold, group)) for group in inf)
+        self.exf = tuple(frozenset(map(fold, group)) for group in exf)
+        self.sensitive = bool(sensitive)
+        self.keywords = frozenset().union(*self.inf, *self.exf)
+
+    def check(self, found):
+        """Checks an item given the keywords found in its title.
+
+        Args:
+            found: Keywords found in the title, case folded as this filter
+                expects them.
+        """
+        return all(not group.isdisjoint(found) for group in self.inf) and all(
+            group.isdisjoint(found) for group in self.exf
+        )
+
+
+class FeedMatcher:
+    """Matches titles against the keywords of every filter of one feed.
+
+    Each title is searched once for the case sensitive keywords and once,
+    lowercased, for the folded ones; every subscriber then decides from the
+    found sets without touching the title again.
+    """
+
+    __slots__ = ("_folded", "_raw", "filters")
+
+    def __init__(self, filters):
+        self.filters = tuple(filters)
+        self._raw = _compile(
+            k for f in self.filters if not f.sensitive for k in f.keywords
+        )
+        self._folded = _compile(
+            k for f in self.filters if f.sensitive for k in f.keywords
+        )
+
+    def search(self, title):
+        """Returns a tuple of the (raw, folded) keywords found in a title."""
+        raw = _search(self._raw, title)
+        folded = _search(self._folded, title.lower()) if self._folded else {""}
+        return raw, folded
+
+    @staticmethod
+    def check(rss_filter, found):
+        """Checks a filter against the result of `search`."""
+        return rss_filter.check(found[1] if rss_filter.sensitive else found[0])
@@ -6,6 +6,7 @@ from time import time
 from psutil import cpu_percent, disk_usage, virtual_memory
 
 from bot import DOWNLOAD_DIR, bot_start_time, status_dict, task_dict, task_dict_lock
+from bot.core.cpu_scheduler import CpuScheduler
 from bot.helper.telegram_helper.button_build import ButtonMaker
 
 SIZE_UNITS = ["B", "KB", "MB", "GB", "TB", "PB"]
@@ -185,9 +186,101 @@ def source(self):
     )
 
 
-async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=1):
+async def _task_status(task, cache):
+    if (key := ("status", id(task))) in cache:
+        return cache[key]
+    if iscoroutinefunction(task.status):
+        status = await task.status()
+    else:
+        status = task.status()
+    cache[key] = status
+    return status
+
+
+def _task_fragment(task, tstatus):
+    """Returns the lines of a task on a status page, without its index."""
+    if task.listener.is_super_chat:
+        msg = f"<a href='{task.listener.message.link}'>{tstatus}</a>: </b>"
+    else:
+        msg = f"{tstatus}: </b>"
+    msg += f"<code>{escape(f'{task.name()}')}</code>"
+    if task.listener.subname:
+        msg += f"\n<i>{task.listener.subname}</i>"
+    msg += f"\nby: {source(task.listener)}"
+    progress = 0.0
+    if (
+        tstatus not in [MirrorStatus.STATUS_SEED, MirrorStatus.STATUS_QUEUEUP]
+        and task.listener.progress
+    ):
+        progress = task.progress_raw()
+        msg += f"\n{get_progress_bar_string(progress)} {task.progress()}"
+        if task.listener.subname:
+            subsize = f"/{get_readable_file_size(task.listener.subsize)}"
+            ac = len(task.listener.files_to_proceed)
+            count = f"{task.listener.proceed_count}/{ac or '?'}"
+        else:
+            subsize = ""
+            count = ""
+        msg += f"\n<b>Processed:</b> {task.processed_bytes()}{subsize}"
+        if count:
+            msg += f"\n<b>Count:</b> {count}"
+        msg += f"\n<b>Size:</b> {task.size()}"
+        msg += f"\n<b>Speed:</b> {task.speed()}"
+        msg += f"\n<b>Estimated:</b> {task.eta()}"
+        if (
+            tstatus == MirrorStatus.STATUS_DOWNLOAD and task.listener.is_torrent
+        ) or task.listener.is_qbit:
+            with contextlib.suppress(Exception):
+                msg += f"\n<b>Seeders:</b> {task.seeders_num()} | <b>Leechers:</b> {task.leechers_num()}"
+    elif tstatus == MirrorStatus.STATUS_SEED:
+        msg += f"\n<b>Size: </b>{task.size()}"
+        msg += f"\n<b>Speed: </b>{task.seed_speed()}"
+        msg += f"\n<b>Uploaded: </b>{task.uploaded_bytes()}"
+        msg += f"\n<b>Ratio: </b>{task.ratio()}"
+        msg += f" | <b>Time: </b>{task.seeding_time()}"
+    else:
+        msg += f"\n<b>Size: </b>{task.size()}"
+    msg += f"\n<b>Tool:</b> {task.tool}"
+    task_gid = task.gid()
+    short_gid = task_gid[-8:] if task_gid.startswith("SABnzbd") else task_gid[:8]
+    msg += f"\n/stop_{short_gid}\n\n"
+    return msg, task_gid, progress
+
+
+def _system_stats():
+    msg = f"<b>CPU:</b> {cpu_percent()}% | <b>FREE:</b> {get_readable_file_size(disk_usage(DOWNLOAD_DIR).free)}"
+    msg += f"\n<b>RAM:</b> {virtual_memory().percent}% | <b>UPTIME:</b> {get_readable_time(time() - bot_start_time)}"
+    cpu_jobs = CpuScheduler.stats()
+    if cpu_jobs["running"] or cpu_jobs["queued"]:
+        msg += f"\n<b>CPU Slots:</b> {cpu_jobs['used']}/{cpu_jobs['capacity']} | <b>Queued:</b> {cpu_jobs['queued']}"
+    return msg
+
+
+async def render_status(
+    sid,
+    is_user,
+    page_no=1,
+    status="All",
+    page_step=1,
+    cache=None,
+):
+    """Renders a status page.
+
+    Args:
+        cache: Dict shared by the pages rendered in the same refresh, so the
+            status and lines of each task and the system stats are built
+            once for all chats.
+
+    Returns:
+        The text and buttons of the page, and what the page shows: the task
+        count, the page number and the gid, status and progress of each
+        task on it.
+    """
+    if cache is None:
+        cache = {}
     msg = ""
     button = None
+    visible = []
 
     tasks = await get_specific_tasks(status, sid if is_user else None)
 
@@ -208,58 +301,17 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
     ):
         if status != "All":
             tstatus = status
-        elif iscoroutinefunction(task.status):
-            tstatus = await task.status()
         else:
-            tstatus = task.status()
-        if task.listener.is_super_chat:
-            msg += f"<b>{index + start_position}. <a href='{task.listener.message.link}'>{tstatus}</a>: </b>"
-        else:
-            msg += f"<b>{index + start_position}. {tstatus}: </b>"
-        msg += f"<code>{escape(f'{task.name()}')}</code>"
-        if task.listener.subname:
-            msg += f"\n<i>{task.listener.subname}</i>"
-        msg += f"\nby: {source(task.listener)}"
-        if (
-            tstatus not in [MirrorStatus.STATUS_SEED, MirrorStatus.STATUS_QUEUEUP]
-            and task.listener.progress
-        ):
-            progress = task.progress()
-            msg += f"\n{get_progress_bar_string(progress)} {progress}"
-            if task.listener.subname:
-                subsize = f"/{get_readable_file_size(task.listener.subsize)}"
-                ac = len(task.listener.files_to_proceed)
-                count = f"{task.listener.proceed_count}/{ac or '?'}"
-            else:
-                subsize = ""
-                count = ""
-            msg += f"\n<b>Processed:</b> {task.processed_bytes()}{subsize}"
-            if count:
-                msg += f"\n<b>Count:</b> {count}"
-            msg += f"\n<b>Size:</b> {task.size()}"
-            msg += f"\n<b>Speed:</b> {task.speed()}"
-            msg += f"\n<b>Estimated:</b> {task.eta()}"
-            if (
-                tstatus == MirrorStatus.STATUS_DOWNLOAD and task.listener.is_torrent
-            ) or task.listener.is_qbit:
-                with contextlib.suppress(Exception):
-                    msg += f"\n<b>Seeders:</b> {task.seeders_num()} | <b>Leechers:</b> {task.leechers_num()}"
-        elif tstatus == MirrorStatus.STATUS_SEED:
-            msg += f"\n<b>Size: </b>{task.size()}"
-            msg += f"\n<b>Speed: </b>{task.seed_speed()}"
-            msg += f"\n<b>Uploaded: </b>{task.uploaded_bytes()}"
-            msg += f"\n<b>Ratio: </b>{task.ratio()}"
-            msg += f" | <b>Time: </b>{task.seeding_time()}"
-        else:
-            msg += f"\n<b>Size: </b>{task.size()}"
-        msg += f"\n<b>Tool:</b> {task.tool}"
-        task_gid = task.gid()
-        short_gid = task_gid[-8:] if task_gid.startswith("SABnzbd") else task_gid[:8]
-        msg += f"\n/stop_{short_gid}\n\n"
+            tstatus = await _task_status(task, cache)
+        if (key := ("task", id(task), tstatus)) not in cache:
+            cache[key] = _task_fragment(task, tstatus)
+        fragment, task_gid, progress = cache[key]
+        msg += f"<b>{index + start_position}. {fragment}"
+        visible.append((task_gid, tstatus, progress))
 
     if len(msg) == 0:
         if status == "All":
-            return None, None
+            return None, None, None
         msg = f"No Active {status} Tasks!\n\n"
     buttons = ButtonMaker()
     if not is_user:
@@ -276,6 +328,12 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
             if status_value != status:
                 buttons.data_button(label, f"status {sid} st {status_value}")
     button = buttons.build_menu(8)
-    msg += f"<b>CPU:</b> {cpu_percent()}% | <b>FREE:</b> {get_readable_file_size(disk_usage(DOWNLOAD_DIR).free)}"
-    msg += f"\n<b>RAM:</b> {virtual_memory().percent}% | <b>UPTIME:</b> {get_readable_time(time() - bot_start_time)}"
+    if "system" not in cache:
+        cache["system"] = _system_stats()
+    msg += cache["system"]
+    return msg, button, (tasks_no, page_no, visible)
+
+
+async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=1):
+    msg, button, _ = await render_status(sid, is_user, page_no, status, page_step)
     return msg, button
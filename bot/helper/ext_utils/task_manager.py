@@ -1,17 +1,32 @@
-from asyncio import Event
+from asyncio import Event, Semaphore, sleep
+from copy import copy
+from itertools import count
+from secrets import token_hex
+from time import time
+from typing import ClassVar
 
 from bot import (
     LOGGER,
+    bot_loop,
+    intervals,
+    multi_tags,
     non_queued_dl,
     non_queued_up,
     queue_dict_lock,
     queued_dl,
     queued_up,
+    task_dict,
+    task_dict_lock,
 )
 from bot.core.config_manager import Config
 from bot.helper.mirror_leech_utils.gdrive_utils.search import GoogleDriveSearch
+from bot.helper.telegram_helper.message_utils import (
+    edit_message,
+    send_message,
+    send_status_message,
+)
 
-from .bot_utils import get_telegraph_list, sync_to_async
+from .bot_utils import get_telegraph_list, new_task, sync_to_async
 from .files_utils import get_base_name
 from .links_utils import is_gdrive_id
 
@@ -155,3 +170,160 @@ async def start_from_queued():
             if queued_dl:
                 for mid in list(queued_dl.keys()):
                     await start_dl_from_queued(mid)
+
+
+class BulkQueue:
+    """Runs the items of a bulk (-b) or multi (-i) command as in-memory jobs.
+
+    The links are parsed once by the listener that received the command. Each
+    item is then built from a copy of one progress message and started right
+    away, instead of sleeping, sending a message per link and fetching it
+    back. Items go through `check_running_tasks` like any other task, so the
+    download queue limits apply to them. On top of that at most
+    `BULK_CONCURRENCY` items of a queue run at once, the next one starts
+    when an earlier one left the task list.
+
+    Items of a queue share a real message to reply to, so every item gets its
+    own task id (`task_id` of its message) from a range message ids never
+    reach. With `-m` all items share one same_dir entry, counting every item
+    the queue will start. A reply to one of them can't find a task, so
+    `/cancel` replying to the progress message of a queue stops the items not
+    started yet, like `/stop` with its tag. Running items are cancelled by
+    their gid.
+    """
+
+    _ids = count(1 << 40)
+    _tags: ClassVar[dict[int, str]] = {}
+
+    def __init__(self, listener, obj, items):
+        """
+        Args:
+            listener: The listener of the command message.
+            obj: The listener class to build the items with.
+            items: List of (command text, reply_to message) tuples.
+        """
+        self.listener = listener
+        self.obj = obj
+        self.items = items
+        self.started = 0
+        self.message = None
+        self._edited = 0
+        self.multi_tag = listener.multi_tag or token_hex(2)
+        multi_tags.add(self.multi_tag)
+        self.same_dir = listener.same_dir
+        if listener.folder_name and listener.folder_name not in self.same_dir:
+            self.same_dir[listener.folder_name] = {
+                "total": len(items),
+                "tasks": set(),
+            }
+        self._tasks = set()
+        limit = Config.BULK_CONCURRENCY
+        self._slots = Semaphore(limit) if limit > 0 else None
+
+    @classmethod
+    def tag_of(cls, message_id):
+        """Returns the multi tag of the queue that sent `message_id`, if any."""
+        return cls._tags.get(message_id)
+
+    def _text(self, state="Running"):
+        msg = (
+            f"{self.listener.tag} <b>Multi-task {state}:</b> "
+            f"{self.started}/{len(self.items)} started"
+        )
+        if state == "Running":
+            msg += f"\nCancel Multi: <code>/stop {self.multi_tag}</code>"
+        return msg
+
+    async def _update(self, state="Running", force=False):
+        if not force and time() - self._edited < 5:
+            return
+        self._edited = time()
+        await edit_message(self.message, self._text(state))
+
+    def _item(self, text, reply_to):
+        message = copy(self.message)
+        message.text = text
+        message.reply_to_message = reply_to
+        message.reply_to_message_id = reply_to.id if reply_to else None
+        message.task_id = next(self._ids)
+        if self.listener.message.from_user:
+            message.from_user = self.listener.user
+        else:
+            message.sender_chat = self.listener.user
+        return message
+
+    async def _start(self, task, text):
+        try:
+            await task.new_event()
+            if self._slots:
+                await self._wait_done(task.mid)
+        except Exception as e:
+            LOGGER.error(f"{e}. Bulk item: {text}")
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    @staticmethod
+    async def _wait_done(mid):
+        # Downloads are added in the background after new_event returns
+        for _ in range(10):
+            if mid in task_dict or mid in queued_dl:
+                break
+            await sleep(1)
+        while True:
+            await sleep(2)
+            if mid not in task_dict and mid not in queued_dl:
+                break
+
+    @new_task
+    async def run(self):
+        listener = self.listener
+        self.message = await send_message(listener.message, self._text())
+        if isinstance(self.message, str):
+            multi_tags.discard(self.multi_tag)
+            return
+        self._tags[self.message.id] = self.multi_tag
+        state = "Finished"
+        try:
+            for index, (text, reply_to) in enumerate(self.items):
+                if self._slots:
+                    await self._slots.acquire()
+                if intervals["stopAll"]:
+                    state = "Stopped"
+                    break
+                if self.multi_tag not in multi_tags:
+                    state = "Cancelled"
+                    await send_message(
+                        listener.message,
+                        f"{listener.tag} Multi-task has been cancelled!",
+                    )
+                    await send_status_message(listener.message)
+                    async with task_dict_lock:
+                        for fd_name in self.same_dir:
+                            self.same_dir[fd_name]["total"] -= (
+                                len(self.items) - index
+                            )
+                    break
+                task = self.obj(
+                    listener.client,
+                    self._item(text, reply_to),
+                    listener.is_qbit,
+                    listener.is_leech,
+                    listener.is_jd,
+                    listener.is_nzb,
+                    self.same_dir,
+                    [],
+                    self.multi_tag,
+                    listener.options,
+                )
+                # Items aren't awaited, a clone or a format dialog of one
+                # mustn't hold back the others or the cancel check.
+                job = bot_loop.create_task(self._start(task, text))
+                self._tasks.add(job)
+                job.add_done_callback(self._tasks.discard)
+                self.started += 1
+                await self._update()
+        finally:
+            multi_tags.discard(self.multi_tag)
+            self._tags.pop(self.message.id, None)
+            await self._update(state, True)
@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+from json import dumps
+from resource import RUSAGE_CHILDREN, getrusage
+from time import monotonic, time
+
+from aiofiles import open as aiopen
+
+from bot import LOGGER
+from bot.core.config_manager import Config
+from bot.core.metrics import Metrics
+from bot.helper.ext_utils.status_utils import (
+    get_readable_file_size,
+    get_readable_time,
+)
+
+
+def _children_cpu():
+    usage = getrusage(RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class TaskTrace:
+    """Spans of the phases of one task: the engine download, every
+    post-processing stage and the upload.
+
+    Each span records its wall time, the CPU time of the child processes
+    reaped while it ran (ffmpeg, 7z, split...) and the bytes and file count
+    of the task before and after it, read from the task's file manifest.
+    The child CPU comes from `RUSAGE_CHILDREN` of the bot process, so it
+    also counts the children of tasks running side by side. That is why
+    the field is named `process_children_cpu`, it's only an upper bound for
+    the task.
+    """
+
+    def __init__(self, listener):
+        self._listener = listener
+        self._finished = False
+        self.spans = []
+
+    def _files(self):
+        if (manifest := getattr(self._listener, "manifest", None)) is None:
+            return 0, 0
+        return manifest.size(), len(manifest.files)
+
+    def _record(self, name, wall, cpu, before, extra):
+        bytes_out, files_out = self._files()
+        self.spans.append(
+            {
+                "name": name,
+                "wall": round(wall, 3),
+                "process_children_cpu": round(cpu, 3),
+                "bytes_in": before[0],
+                "bytes_out": bytes_out,
+                "files_in": before[1],
+                "files_out": files_out,
+                **extra,
+            },
+        )
+        Metrics.observe_stage(name, wall)
+
+    def add(self, name, wall, **extra):
+        """Records a phase that didn't run inside `span`, e.g. an engine
+        download timed from its start to its completion callback. Such a
+        phase doesn't change the files, so they count as its input and
+        output.
+        """
+        self._record(name, wall, 0.0, self._files(), extra)
+
+    @contextmanager
+    def span(self, name, **extra):
+        """Times the wrapped stage of the task."""
+        before = self._files()
+        cpu = _children_cpu()
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self._record(
+                name,
+                monotonic() - start,
+                _children_cpu() - cpu,
+                before,
+                extra,
+            )
+
+    def summary(self):
+        """Returns a one line summary of the spans for the completion
+        message.
+        """
+        return " | ".join(
+            f"{span['name']}: {get_readable_time(span['wall'], True) or '0s'}"
+            for span in self.spans
+        )
+
+    async def finish(self, error=None):
+        """Logs the spans and appends them to `TASK_TRACE_FILE` if set.
+
+        Args:
+            error: Why the task failed, None if it completed.
+        """
+        if self._finished or not self.spans:
+            return
+        self._finished = True
+        listener = self._listener
+        LOGGER.info(
+            f"Trace of {listener.name}{' (failed)' if error else ''}: "
+            + ", ".join(
+                f"{span['name']} {span['wall']}s/"
+                f"{span['process_children_cpu']}s children cpu "
+                f"{get_readable_file_size(span['bytes_out'])}"
+                for span in self.spans
+            ),
+        )
+        if not Config.TASK_TRACE_FILE:
+            return
+        record = {
+            "time": int(time()),
+            "mid": listener.mid,
+            "user_id": listener.user_id,
+            "name": listener.name,
+            "size": listener.size,
+            "is_leech": listener.is_leech,
+            "error": str(error) if error else None,
+            "spans": self.spans,
+        }
+        try:
+            async with aiopen(Config.TASK_TRACE_FILE, "a") as f:
+                await f.write(f"{dumps(record)}\n")
+        except Exception as e:
+            LOGGER.error(f"{e}: while writing the task trace")
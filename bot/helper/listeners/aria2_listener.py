@@ -8,11 +8,13 @@ from aiohttp.client_exceptions import ClientError
 
 from bot import LOGGER, intervals, task_dict, task_dict_lock
 from bot.core.config_manager import Config
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.core.torrent_manager import TorrentManager, aria2_name, is_metadata
 from bot.helper.ext_utils.bot_utils import bt_selection_buttons
 from bot.helper.ext_utils.files_utils import clean_unwanted
 from bot.helper.ext_utils.status_utils import get_task_by_gid
 from bot.helper.ext_utils.task_manager import stop_duplicate_check
+from bot.helper.listeners.direct_listener import DirectListener
 from bot.helper.mirror_leech_utils.status_utils.aria2_status import Aria2Status
 from bot.helper.telegram_helper.message_utils import (
     delete_message,
@@ -21,10 +23,10 @@ from bot.helper.telegram_helper.message_utils import (
 )
 
 
-async def _on_download_started(api, data):
+async def _on_download_started(_, data):
     gid = data["params"][0]["gid"]
-    download = await api.tellStatus(gid)
-    options = await api.getOption(gid)
+    download = await EngineSnapshot.refresh_aria2(gid)
+    options = await EngineSnapshot.get_aria2_option(gid)
     if options.get("follow-torrent", "") == "false":
         return
     if is_metadata(download):
@@ -43,14 +45,12 @@ async def _on_download_started(api, data):
                     ):
                         await delete_message(meta)
                         break
-                    download = await api.tellStatus(gid)
+                    download = await EngineSnapshot.get_aria2(gid)
         return
     LOGGER.info(f"onDownloadStarted: {aria2_name(download)} - Gid: {gid}")
-    await sleep(1)
-
-    await sleep(2)
+    await sleep(3)
     if task := await get_task_by_gid(gid):
-        download = await api.tellStatus(gid)
+        download = await EngineSnapshot.refresh_aria2(gid)
         task.listener.name = aria2_name(download)
         msg, button = await stop_duplicate_check(task.listener)
         if msg:
@@ -61,8 +61,8 @@ async def _on_download_started(api, data):
 async def _on_download_complete(api, data):
     try:
         gid = data["params"][0]["gid"]
-        download = await api.tellStatus(gid)
-        options = await api.getOption(gid)
+        download = await EngineSnapshot.refresh_aria2(gid)
+        options = await EngineSnapshot.get_aria2_option(gid)
     except (TimeoutError, ClientError, Exception) as e:
         LOGGER.error(f"onDownloadComplete: {e}")
         return
@@ -102,7 +102,7 @@ async def _on_download_complete(api, data):
 async def _on_bt_download_complete(api, data):
     gid = data["params"][0]["gid"]
     await sleep(1)
-    download = await api.tellStatus(gid)
+    download = await EngineSnapshot.refresh_aria2(gid)
     LOGGER.info(f"onBtDownloadComplete: {aria2_name(download)} - Gid: {gid}")
     if task := await get_task_by_gid(gid):
         task.listener.is_torrent = True
@@ -131,7 +131,7 @@ async def _on_bt_download_complete(api, data):
         await task.listener.on_download_complete()
         if intervals["stopAll"]:
             return
-        download = await api.tellStatus(gid)
+        download = await EngineSnapshot.refresh_aria2(gid)
         if (
             task.listener.seed
             and download.get("status", "") == "complete"
@@ -168,14 +168,15 @@ async def _on_download_stopped(_, data):
         await task.listener.on_download_error("Dead torrent!")
 
 
-async def _on_download_error(api, data):
+async def _on_download_error(_, data):
     gid = data["params"][0]["gid"]
     await sleep(1)
     LOGGER.info(f"onDownloadError: {gid}")
     error = "None"
+    options = {}
     with contextlib.suppress(TimeoutError, ClientError, Exception):
-        download = await api.tellStatus(gid)
-        options = await api.getOption(gid)
+        download = await EngineSnapshot.refresh_aria2(gid)
+        options = await EngineSnapshot.get_aria2_option(gid)
         error = download.get("errorMessage", "")
         LOGGER.info(f"Download Error: {error}")
     if options.get("follow-torrent", "") == "false":
@@ -190,3 +191,10 @@ def add_aria2_callbacks():
     TorrentManager.aria2.onDownloadError(_on_download_error)
     TorrentManager.aria2.onDownloadStart(_on_download_started)
     TorrentManager.aria2.onDownloadStop(_on_download_stopped)
+    TorrentManager.aria2.onDownloadStop(EngineSnapshot.on_aria2_event)
+    TorrentManager.aria2.onDownloadPause(EngineSnapshot.on_aria2_event)
+    for event in ["Complete", "Error", "Stop"]:
+        TorrentManager.aria2.register(
+            DirectListener.on_event,
+            f"aria2.onDownload{event}",
+        )
@@ -1,80 +1,140 @@
-from asyncio import sleep
+from asyncio import gather, shield, wait_for
+from contextlib import suppress
+from typing import ClassVar
 
 from aiohttp.client_exceptions import ClientError
 
-from bot import LOGGER
+from bot import LOGGER, bot_loop
+from bot.core.config_manager import Config
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.core.torrent_manager import TorrentManager, aria2_name
 
+# Files are refreshed at this interval in case an aria2 notification was
+# missed, e.g. while the websocket reconnected.
+FALLBACK_POLL = 30
+
 
 class DirectListener:
+    """Downloads the files of a direct link through aria2.
+
+    Up to `DIRECT_DOWNLOAD_WORKERS` files are in aria2 at the same time. The
+    end of each file is reported by the aria2 websocket notifications, and
+    the progress of the files in flight is read from the shared aria2
+    snapshot when the status is rendered.
+    """
+
+    _waiters: ClassVar[dict] = {}
+
     def __init__(self, path, listener, a2c_opt):
         self.listener = listener
         self._path = path
         self._a2c_opt = a2c_opt
         self._proc_bytes = 0
         self._failed = 0
-        self.download_task = None
+        self._downloads = {}
         self.name = self.listener.name
 
+    @classmethod
+    async def on_event(cls, _, data):
+        """Wakes up the file waiting for the gid of an aria2 notification."""
+        gid = data["params"][0]["gid"]
+        if (future := cls._waiters.get(gid)) and not future.done():
+            future.set_result(data.get("method"))
+
     @property
     def processed_bytes(self):
-        if self.download_task:
-            return self._proc_bytes + int(
-                self.download_task.get("completedLength", "0"),
-            )
-        return self._proc_bytes
+        return self._proc_bytes + sum(
+            int(download.get("completedLength", "0"))
+            for download in self._downloads.values()
+        )
 
     @property
     def speed(self):
-        return (
-            int(self.download_task.get("downloadSpeed", "0"))
-            if self.download_task
-            else 0
+        return sum(
+            int(download.get("downloadSpeed", "0"))
+            for download in self._downloads.values()
         )
 
-    async def download(self, contents):
-        self.is_downloading = True
-        for content in contents:
-            if self.listener.is_cancelled:
-                break
-            if content.path:
-                self._a2c_opt["dir"] = f"{self._path}/{content.path}"
-            else:
-                self._a2c_opt["dir"] = self._path
-            filename = content.filename
-            self._a2c_opt["out"] = filename
+    @property
+    def is_waiting(self):
+        return bool(self._downloads) and all(
+            download.get("status", "") == "waiting"
+            for download in self._downloads.values()
+        )
+
+    async def update(self):
+        """Refreshes the files in flight from the aria2 snapshot."""
+        for gid in list(self._downloads):
             try:
-                gid = await TorrentManager.aria2.addUri(
-                    uris=[content.url],
-                    options=self._a2c_opt,
-                    position=0,
-                )
-            except (TimeoutError, ClientError, Exception) as e:
-                self._failed += 1
-                LOGGER.error(f"Unable to download {filename} due to: {e}")
+                download = await EngineSnapshot.get_aria2(gid)
+            except Exception:
                 continue
-            self.download_task = await TorrentManager.aria2.tellStatus(gid)
-            while True:
-                if self.listener.is_cancelled:
-                    if self.download_task:
-                        await TorrentManager.aria2_remove(self.download_task)
+            if gid in self._downloads and download:
+                self._downloads[gid] = download
+
+    async def _download_file(self, content):
+        options = self._a2c_opt.copy()
+        if content.path:
+            options["dir"] = f"{self._path}/{content.path}"
+        else:
+            options["dir"] = self._path
+        filename = content.filename
+        options["out"] = filename
+        try:
+            gid = await TorrentManager.aria2.addUri(
+                uris=[content.url],
+                options=options,
+                position=0,
+            )
+        except (TimeoutError, ClientError, Exception) as e:
+            self._failed += 1
+            LOGGER.error(f"Unable to download {filename} due to: {e}")
+            return
+        future = bot_loop.create_future()
+        self._waiters[gid] = future
+        self._downloads[gid] = {"gid": gid, "status": "waiting"}
+        try:
+            while not self.listener.is_cancelled:
+                # A notification sent before the waiter was registered is
+                # lost, so the status is read before the first wait.
+                if future.done():
+                    future = bot_loop.create_future()
+                    self._waiters[gid] = future
+                download = await EngineSnapshot.refresh_aria2(gid)
+                self._downloads[gid] = download
+                status = download.get("status", "")
+                if status == "complete":
+                    self._proc_bytes += int(download.get("totalLength", "0"))
+                    await TorrentManager.aria2_remove(download)
                     break
-                self.download_task = await TorrentManager.aria2.tellStatus(gid)
-                if error_message := self.download_task.get("errorMessage"):
+                if status in ["error", "removed"]:
                     self._failed += 1
+                    error_message = download.get("errorMessage", status)
                     LOGGER.error(
-                        f"Unable to download {aria2_name(self.download_task)} due to: {error_message}",
+                        f"Unable to download {aria2_name(download)} due to: {error_message}",
                     )
-                    await TorrentManager.aria2_remove(self.download_task)
+                    await TorrentManager.aria2_remove(download)
                     break
-                if self.download_task.get("status", "") == "complete":
-                    self._proc_bytes += int(
-                        self.download_task.get("totalLength", "0"),
-                    )
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                await sleep(1)
-            self.download_task = None
+                with suppress(TimeoutError):
+                    await wait_for(shield(future), FALLBACK_POLL)
+        except (TimeoutError, ClientError, Exception) as e:
+            self._failed += 1
+            LOGGER.error(f"Unable to download {filename} due to: {e}")
+        finally:
+            self._waiters.pop(gid, None)
+            self._downloads.pop(gid, None)
+
+    async def _worker(self, contents):
+        for content in contents:
+            if self.listener.is_cancelled:
+                break
+            await self._download_file(content)
+
+    async def download(self, contents):
+        self.is_downloading = True
+        files = iter(contents)
+        workers = max(1, min(Config.DIRECT_DOWNLOAD_WORKERS, len(contents)))
+        await gather(*(self._worker(files) for _ in range(workers)))
         if self.listener.is_cancelled:
             return
         if self._failed == len(contents):
@@ -89,5 +149,5 @@ class DirectListener:
         self.listener.is_cancelled = True
         LOGGER.info(f"Cancelling Download: {self.listener.name}")
         await self.listener.on_download_error("Download Cancelled by User!")
-        if self.download_task:
-            await TorrentManager.aria2_remove(self.download_task)
+        for download in list(self._downloads.values()):
+            await TorrentManager.aria2_remove(download)
@@ -1,6 +1,7 @@
 from asyncio import gather, sleep
 
 from bot import LOGGER, intervals, nzb_jobs, nzb_listener_lock, sabnzbd_client
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.helper.ext_utils.bot_utils import new_task
 from bot.helper.ext_utils.status_utils import get_task_by_gid
 from bot.helper.ext_utils.task_manager import stop_duplicate_check
@@ -52,11 +53,12 @@ async def _nzb_listener():
     while not intervals["stopAll"]:
         async with nzb_listener_lock:
             try:
-                jobs = (await sabnzbd_client.get_history())["history"]["slots"]
-                downloads = (await sabnzbd_client.get_downloads())["queue"]["slots"]
                 if len(nzb_jobs) == 0:
                     intervals["nzb"] = ""
                     break
+                queue, history = await EngineSnapshot.get_sabnzbd_jobs()
+                jobs = list(history.values())
+                downloads = list(queue.values())
                 for job in jobs:
                     nzo_id = job["nzo_id"]
                     if nzo_id not in nzb_jobs:
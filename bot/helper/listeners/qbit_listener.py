@@ -24,6 +24,10 @@ from bot.helper.ext_utils.task_manager import stop_duplicate_check
 from bot.helper.mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
 from bot.helper.telegram_helper.message_utils import update_status_message
 
+TIMED_STATES = ["metaDL", "stalledDL"]
+
+_maindata = {"rid": 0, "torrents": {}}
+
 
 async def _remove_torrent(hash_, tag):
     await TorrentManager.qbittorrent.torrents.delete([hash_], True)
@@ -112,6 +116,78 @@ async def _on_download_complete(tor):
         await _remove_torrent(ext_hash, tag)
 
 
+async def _process_torrent(tor_info):
+    tag = tor_info.tags[0]
+    if tag not in qb_torrents:
+        return
+    state = tor_info.state
+    qb_torrents[tag]["state"] = state
+    if state == "metaDL":
+        qb_torrents[tag]["stalled_time"] = time()
+        if (
+            Config.TORRENT_TIMEOUT
+            and time() - qb_torrents[tag]["start_time"] >= Config.TORRENT_TIMEOUT
+        ):
+            await _on_download_error("Dead Torrent!", tor_info)
+        else:
+            await TorrentManager.qbittorrent.torrents.reannounce(
+                [tor_info.hash],
+            )
+    elif state == "downloading":
+        qb_torrents[tag]["stalled_time"] = time()
+        if not qb_torrents[tag]["stop_dup_check"]:
+            qb_torrents[tag]["stop_dup_check"] = True
+            await _stop_duplicate(tor_info)
+    elif state == "stalledDL":
+        if (
+            not qb_torrents[tag]["rechecked"]
+            and 0.99989999999999999 < tor_info.progress < 1
+        ):
+            msg = f"Force recheck - Name: {tor_info.name} Hash: "
+            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
+            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
+            LOGGER.warning(msg)
+            await TorrentManager.qbittorrent.torrents.recheck(
+                [tor_info.hash],
+            )
+            qb_torrents[tag]["rechecked"] = True
+        elif (
+            Config.TORRENT_TIMEOUT
+            and time() - qb_torrents[tag]["stalled_time"] >= Config.TORRENT_TIMEOUT
+        ):
+            await _on_download_error("Dead Torrent!", tor_info)
+        else:
+            await TorrentManager.qbittorrent.torrents.reannounce(
+                [tor_info.hash],
+            )
+    elif state == "missingFiles":
+        await TorrentManager.qbittorrent.torrents.recheck(
+            [tor_info.hash],
+        )
+    elif state == "error":
+        await _on_download_error(
+            "No enough space for this torrent on device",
+            tor_info,
+        )
+    elif (
+        int(tor_info.completion_on.timestamp()) != -1
+        and not qb_torrents[tag]["uploaded"]
+        and state
+        in [
+            "queuedUP",
+            "stalledUP",
+            "uploading",
+            "forcedUP",
+        ]
+    ):
+        qb_torrents[tag]["uploaded"] = True
+        await _on_download_complete(tor_info)
+    elif state in ["stoppedUP", "stoppedDL"] and qb_torrents[tag]["seeding"]:
+        qb_torrents[tag]["seeding"] = False
+        await _on_seed_finish(tor_info)
+        await sleep(0.5)
+
+
 @new_task
 async def _qb_listener():
     while True:
@@ -122,80 +198,64 @@ async def _qb_listener():
                     intervals["qb"] = ""
                     break
                 for tor_info in torrents:
-                    tag = tor_info.tags[0]
-                    if tag not in qb_torrents:
-                        continue
-                    state = tor_info.state
-                    if state == "metaDL":
-                        qb_torrents[tag]["stalled_time"] = time()
-                        if (
-                            Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["start_time"]
-                            >= Config.TORRENT_TIMEOUT
-                        ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash],
-                            )
-                    elif state == "downloading":
-                        qb_torrents[tag]["stalled_time"] = time()
-                        if not qb_torrents[tag]["stop_dup_check"]:
-                            qb_torrents[tag]["stop_dup_check"] = True
-                            await _stop_duplicate(tor_info)
-                    elif state == "stalledDL":
-                        if (
-                            not qb_torrents[tag]["rechecked"]
-                            and 0.99989999999999999 < tor_info.progress < 1
-                        ):
-                            msg = f"Force recheck - Name: {tor_info.name} Hash: "
-                            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
-                            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
-                            LOGGER.warning(msg)
-                            await TorrentManager.qbittorrent.torrents.recheck(
-                                [tor_info.hash],
-                            )
-                            qb_torrents[tag]["rechecked"] = True
-                        elif (
-                            Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["stalled_time"]
-                            >= Config.TORRENT_TIMEOUT
-                        ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash],
-                            )
-                    elif state == "missingFiles":
-                        await TorrentManager.qbittorrent.torrents.recheck(
-                            [tor_info.hash],
-                        )
-                    elif state == "error":
-                        await _on_download_error(
-                            "No enough space for this torrent on device",
-                            tor_info,
-                        )
-                    elif (
-                        int(tor_info.completion_on.timestamp()) != -1
-                        and not qb_torrents[tag]["uploaded"]
-                        and state
-                        in [
-                            "queuedUP",
-                            "stalledUP",
-                            "uploading",
-                            "forcedUP",
-                        ]
-                    ):
-                        qb_torrents[tag]["uploaded"] = True
-                        await _on_download_complete(tor_info)
-                    elif (
-                        state in ["stoppedUP", "stoppedDL"]
-                        and qb_torrents[tag]["seeding"]
-                    ):
-                        qb_torrents[tag]["seeding"] = False
-                        await _on_seed_finish(tor_info)
-                        await sleep(0.5)
+                    await _process_torrent(tor_info)
+            except (ClientError, TimeoutError, Exception, AQError) as e:
+                LOGGER.error(str(e))
+        await sleep(3)
+
+
+def _apply_maindata(data):
+    torrents = _maindata["torrents"]
+    if data.full_update:
+        torrents.clear()
+    for hash_ in data.torrents_removed:
+        torrents.pop(hash_, None)
+    for hash_, delta in data.torrents.items():
+        torrents.setdefault(hash_, {}).update(delta)
+    _maindata["rid"] = data.rid
+
+
+def _pending_hashes():
+    """Returns hashes of tracked torrents that need processing this tick.
+
+    A torrent needs processing when its state differs from the last state the
+    listener handled, or when it sits in a state that is checked on a timer
+    (metadata download, stalled download).
+    """
+    hashes = []
+    for hash_, tor in _maindata["torrents"].items():
+        tag = tor.get("tags", "").split(",", 1)[0].strip()
+        if tag not in qb_torrents:
+            continue
+        state = tor.get("state")
+        if state == "downloading" and qb_torrents[tag]["state"] == state:
+            qb_torrents[tag]["stalled_time"] = time()
+        elif state in TIMED_STATES or qb_torrents[tag]["state"] != state:
+            hashes.append(hash_)
+    return hashes
+
+
+@new_task
+async def _qb_sync_listener():
+    while True:
+        async with qb_listener_lock:
+            try:
+                data = await TorrentManager.qbittorrent.sync.maindata(
+                    _maindata["rid"],
+                )
+                _apply_maindata(data)
+                if len(_maindata["torrents"]) == 0:
+                    _maindata["rid"] = 0
+                    intervals["qb"] = ""
+                    break
+                if hashes := _pending_hashes():
+                    torrents = await TorrentManager.qbittorrent.torrents.info(
+                        hashes=hashes,
+                    )
+                    for tor_info in torrents:
+                        await _process_torrent(tor_info)
             except (ClientError, TimeoutError, Exception, AQError) as e:
+                _maindata["rid"] = 0
                 LOGGER.error(str(e))
         await sleep(3)
 
@@ -209,6 +269,10 @@ async def on_download_start(tag):
             "rechecked": False,
             "uploaded": False,
             "seeding": False,
+            "state": None,
         }
         if not intervals["qb"]:
-            intervals["qb"] = await _qb_listener()
+            if Config.QB_SYNC_LISTENER:
+                intervals["qb"] = await _qb_sync_listener()
+            else:
+                intervals["qb"] = await _qb_listener()
@@ -1,6 +1,8 @@
 # ruff: noqa: RUF006
 from asyncio import create_task, gather, sleep
 from html import escape
+from secrets import token_hex
+from time import monotonic
 
 from aiofiles.os import listdir, makedirs, remove
 from aiofiles.os import path as aiopath
@@ -21,21 +23,25 @@ from bot import (
     task_dict_lock,
 )
 from bot.core.config_manager import Config
+from bot.core.metrics import Metrics
 from bot.core.torrent_manager import TorrentManager
 from bot.helper.common import TaskConfig
 from bot.helper.ext_utils.bot_utils import sync_to_async
 from bot.helper.ext_utils.db_handler import database
 from bot.helper.ext_utils.files_utils import (
+    FileManifest,
     clean_download,
     clean_target,
     create_recursive_symlink,
-    get_path_size,
     join_files,
     remove_excluded_files,
 )
-from bot.helper.ext_utils.links_utils import is_gdrive_id
+from bot.helper.ext_utils.links_utils import is_gdrive_id, is_rclone_path
+from bot.helper.ext_utils.mirror_cache import MirrorCache
 from bot.helper.ext_utils.status_utils import get_readable_file_size
 from bot.helper.ext_utils.task_manager import check_running_tasks, start_from_queued
+from bot.helper.ext_utils.task_trace import TaskTrace
+from bot.helper.mirror_leech_utils.gdrive_utils.clone import GoogleDriveClone
 from bot.helper.mirror_leech_utils.gdrive_utils.upload import GoogleDriveUpload
 from bot.helper.mirror_leech_utils.rclone_utils.transfer import RcloneTransferHelper
 from bot.helper.mirror_leech_utils.status_utils.gdrive_status import (
@@ -53,6 +59,7 @@ from bot.helper.telegram_helper.message_utils import (
     delete_message,
     delete_status,
     send_message,
+    send_status_message,
     update_status_message,
 )
 
@@ -60,6 +67,12 @@ from bot.helper.telegram_helper.message_utils import (
 class TaskListener(TaskConfig):
     def __init__(self):
         super().__init__()
+        self.trace = TaskTrace(self)
+        self.download_start = 0
+        self.upload_start = 0
+        self.cache_key = ""
+        self.cache_dest = ""
+        self._cache_clone_error = None
 
     async def clean(self):
         try:
@@ -89,6 +102,7 @@ class TaskListener(TaskConfig):
                 self.same_dir[self.folder_name]["total"] -= 1
 
     async def on_download_start(self):
+        self.download_start = monotonic()
         if (
             self.is_super_chat
             and Config.INCOMPLETE_TASK_NOTIFIER
@@ -100,6 +114,140 @@ class TaskListener(TaskConfig):
                 self.tag,
             )
 
+    async def use_mirror_cache(self, file_=None):
+        """Finishes a mirror from the mirror cache if its source was mirrored
+        before: the earlier result is sent again when it went to the same
+        destination, otherwise it is cloned server side into the new one.
+
+        Returns:
+            True if the task was handled from the cache.
+        """
+        if not MirrorCache.enabled() or not MirrorCache.cacheable(self):
+            return False
+        self.cache_key = await MirrorCache.key(self, file_)
+        if not self.cache_key:
+            return False
+        self.cache_dest = self.up_dest
+        results = await MirrorCache.get(self.cache_key)
+        for result in results:
+            if result["up_dest"] != self.up_dest:
+                continue
+            if not await MirrorCache.exists(result):
+                await MirrorCache.drop(self.cache_key, result["up_dest"])
+                break
+            LOGGER.info(f"Mirror cache hit: {self.cache_key}")
+            Metrics.inc("mirror_cache_hits_total")
+            self.name = result["name"]
+            self.size = result["size"]
+            self.cache_key = ""
+            await self.on_upload_complete(
+                result["link"],
+                result["files"],
+                result["folders"],
+                result["mime_type"],
+                rclone_path=result["rclone_path"],
+                dir_id=result["dir_id"],
+            )
+            return True
+        for result in reversed(results):
+            if (result["rclone_path"] and is_rclone_path(self.up_dest)) or (
+                not result["rclone_path"] and is_gdrive_id(self.up_dest)
+            ):
+                LOGGER.info(f"Mirror cache clone: {self.cache_key}")
+                Metrics.inc("mirror_cache_clones_total")
+                if await self._clone_cached(result):
+                    return True
+                break
+        Metrics.inc("mirror_cache_misses_total")
+        return False
+
+    async def _clone_cached(self, result):
+        """Clones a cached result into the destination of this task.
+
+        Upload errors raised while cloning don't fail the task, they are kept
+        in `_cache_clone_error` instead so the task can download the source.
+
+        Returns:
+            False if the clone failed and the task should download instead.
+        """
+        state = (self.name, self.size, self.up_dest, self.link)
+        self.name = result["name"]
+        self.size = result["size"]
+        self._cache_clone_error = ""
+        try:
+            await self.on_download_start()
+            if await self._clone_cached_result(result) or self.is_cancelled:
+                return True
+        finally:
+            error = self._cache_clone_error
+            self._cache_clone_error = None
+        LOGGER.warning(
+            f"Mirror cache clone failed: {error or 'unknown error'}. "
+            f"Downloading {self.cache_key} instead",
+        )
+        Metrics.inc("mirror_cache_clone_failures_total")
+        self.name, self.size, self.up_dest, self.link = state
+        async with task_dict_lock:
+            task_dict.pop(self.mid, None)
+        if (
+            self.is_super_chat
+            and Config.INCOMPLETE_TASK_NOTIFIER
+            and Config.DATABASE_URL
+        ):
+            await database.rm_complete_task(self.message.link)
+        if not await MirrorCache.exists(result):
+            await MirrorCache.drop(self.cache_key, result["up_dest"])
+        return False
+
+    async def _clone_cached_result(self, result):
+        gid = token_hex(4)
+        if result["rclone_path"]:
+            remote, src_path = result["rclone_path"].split(":", 1)
+            if result["mime_type"] == "Folder":
+                self.up_dest += (
+                    self.name if self.up_dest.endswith(":") else f"/{self.name}"
+                )
+            transfer = RcloneTransferHelper(self)
+            async with task_dict_lock:
+                task_dict[self.mid] = RcloneStatus(self, transfer, gid, "cl")
+            if self.multi <= 1:
+                await send_status_message(self.message)
+            link, destination = await transfer.clone(
+                "rclone.conf",
+                remote,
+                src_path,
+                result["mime_type"],
+                "copy",
+            ) or (None, None)
+            if not destination:
+                return False
+            await self.on_upload_complete(
+                link,
+                result["files"],
+                result["folders"],
+                result["mime_type"],
+                rclone_path=destination,
+            )
+            return True
+        self.link = result["link"]
+        drive = GoogleDriveClone(self)
+        async with task_dict_lock:
+            task_dict[self.mid] = GoogleDriveStatus(self, drive, gid, "cl")
+        if self.multi <= 1:
+            await send_status_message(self.message)
+        link, mime_type, files, folders, dir_id = await sync_to_async(drive.clone)
+        if mime_type is None:
+            self._cache_clone_error = self._cache_clone_error or link
+            return False
+        await self.on_upload_complete(
+            link,
+            files,
+            folders,
+            mime_type,
+            dir_id=dir_id,
+        )
+        return True
+
     async def on_download_complete(self):
         await sleep(2)
         if self.is_cancelled:
@@ -158,6 +306,7 @@ class TaskListener(TaskConfig):
                 download = task_dict[self.mid]
                 self.name = download.name()
                 gid = download.gid()
+                tool = download.tool
             else:
                 return
         LOGGER.info(f"Download completed: {self.name}")
@@ -186,7 +335,6 @@ class TaskListener(TaskConfig):
                 return
 
         dl_path = f"{self.dir}/{self.name}"
-        self.size = await get_path_size(dl_path)
         self.is_file = await aiopath.isfile(dl_path)
         if self.seed:
             up_dir = self.up_dir = f"{self.dir}10000"
@@ -196,9 +344,18 @@ class TaskListener(TaskConfig):
         else:
             up_dir = self.dir
             up_path = dl_path
+        self.manifest = await FileManifest(up_dir).build()
+        self.size = self.manifest.size(up_path)
+        if self.download_start:
+            self.trace.add(
+                "download",
+                monotonic() - self.download_start,
+                engine=tool,
+            )
         await remove_excluded_files(
-            self.up_dir or self.dir,
+            up_dir,
             self.excluded_extensions,
+            self.manifest,
         )
         if not Config.QUEUE_ALL:
             async with queue_dict_lock:
@@ -207,56 +364,67 @@ class TaskListener(TaskConfig):
             await start_from_queued()
 
         if self.join and not self.is_file:
-            await join_files(up_path)
+            with self.trace.span("join"):
+                await join_files(up_path)
+                await self.manifest.rescan(up_path)
 
         if self.extract and not self.is_nzb:
-            up_path = await self.proceed_extract(up_path, gid)
+            with self.trace.span("extract"):
+                up_path = await self.proceed_extract(up_path, gid)
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
             self.clear()
-            await remove_excluded_files(up_dir, self.excluded_extensions)
+            await remove_excluded_files(
+                up_dir,
+                self.excluded_extensions,
+                self.manifest,
+            )
+            self.size = self.manifest.size()
 
         if self.watermark:
-            up_path = await self.proceed_watermark(
-                up_path,
-                gid,
-            )
+            with self.trace.span("watermark"):
+                up_path = await self.proceed_watermark(
+                    up_path,
+                    gid,
+                )
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size()
             self.clear()
 
         if self.metadata:
-            up_path = await self.proceed_metadata(
-                up_path,
-                gid,
-            )
+            with self.trace.span("metadata"):
+                up_path = await self.proceed_metadata(
+                    up_path,
+                    gid,
+                )
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size()
             self.clear()
 
         if self.ffmpeg_cmds:
-            up_path = await self.proceed_ffmpeg(
-                up_path,
-                gid,
-            )
+            with self.trace.span("ffmpeg_cmds"):
+                up_path = await self.proceed_ffmpeg(
+                    up_path,
+                    gid,
+                )
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size()
             self.clear()
 
         if self.name_sub:
-            up_path = await self.substitute(up_path)
+            with self.trace.span("name_sub"):
+                up_path = await self.substitute(up_path)
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
@@ -267,55 +435,60 @@ class TaskListener(TaskConfig):
         self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
 
         if self.screen_shots:
-            up_path = await self.generate_screenshots(up_path)
+            with self.trace.span("screenshots"):
+                up_path = await self.generate_screenshots(up_path)
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size()
 
         if self.convert_audio or self.convert_video:
-            up_path = await self.convert_media(
-                up_path,
-                gid,
-            )
+            with self.trace.span("convert"):
+                up_path = await self.convert_media(
+                    up_path,
+                    gid,
+                )
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size()
             self.clear()
 
         if self.sample_video:
-            up_path = await self.generate_sample_video(
-                up_path,
-                gid,
-            )
+            with self.trace.span("sample_video"):
+                up_path = await self.generate_sample_video(
+                    up_path,
+                    gid,
+                )
             if self.is_cancelled:
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = self.manifest.size()
             self.clear()
 
         if self.compress:
-            up_path = await self.proceed_compress(
-                up_path,
-                gid,
-            )
+            with self.trace.span("compress"):
+                up_path = await self.proceed_compress(
+                    up_path,
+                    gid,
+                )
             self.is_file = await aiopath.isfile(up_path)
             if self.is_cancelled:
                 return
             self.clear()
 
         self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-        self.size = await get_path_size(up_dir)
+        self.size = self.manifest.size()
 
         if self.is_leech and not self.compress:
-            await self.proceed_split(
-                up_path,
-                gid,
-            )
+            with self.trace.span("split"):
+                await self.proceed_split(
+                    up_path,
+                    gid,
+                )
             if self.is_cancelled:
                 return
             self.clear()
@@ -328,12 +501,14 @@ class TaskListener(TaskConfig):
             LOGGER.info(f"Added to Queue/Upload: {self.name}")
             async with task_dict_lock:
                 task_dict[self.mid] = QueueStatus(self, gid, "Up")
-            await event.wait()
+            with self.trace.span("queue_up"):
+                await event.wait()
             if self.is_cancelled:
                 return
             LOGGER.info(f"Start from Queued/Upload: {self.name}")
 
-        self.size = await get_path_size(up_dir)
+        self.size = self.manifest.size()
+        self.upload_start = monotonic()
 
         upload_service = ""
 
@@ -428,6 +603,25 @@ class TaskListener(TaskConfig):
             and Config.DATABASE_URL
         ):
             await database.rm_complete_task(self.message.link)
+        if self.upload_start:
+            self.trace.add("upload", monotonic() - self.upload_start)
+        await self.trace.finish()
+        if self.cache_key:
+            await MirrorCache.put(
+                self.cache_key,
+                self.cache_dest,
+                {
+                    "name": self.name,
+                    "size": self.size,
+                    "link": link,
+                    "mime_type": mime_type,
+                    "files": files,
+                    "folders": folders,
+                    "rclone_path": rclone_path,
+                    "dir_id": dir_id,
+                },
+            )
+        trace = self.trace.summary()
         msg = f"<b>Name: </b><code>{escape(self.name)}</code>\n\n<b>Size: </b>{get_readable_file_size(self.size)}"
         done_msg = f"{self.tag}\nYour task is complete\nPlease check your inbox."
         LOGGER.info(f"Task Done: {self.name}")
@@ -445,6 +639,8 @@ class TaskListener(TaskConfig):
             msg += f"\n<b>Total Files: </b>{folders}"
             if mime_type != 0:
                 msg += f"\n<b>Corrupted Files: </b>{mime_type}"
+            if trace:
+                msg += f"\n<b>Stages: </b>{trace}"
             msg += f"\n<b>cc: </b>{self.tag}\n\n"
             if not files:
                 await send_message(self.message, msg)
@@ -601,6 +797,8 @@ class TaskListener(TaskConfig):
             if mime_type == "Folder":
                 msg += f"\n<b>SubFolders: </b>{folders}"
                 msg += f"\n<b>Files: </b>{files}"
+            if trace:
+                msg += f"\n<b>Stages: </b>{trace}"
             if link or (
                 rclone_path and Config.RCLONE_SERVE_URL and not self.private_link
             ):
@@ -663,6 +861,7 @@ class TaskListener(TaskConfig):
         await start_from_queued()
 
     async def on_download_error(self, error, button=None):
+        await self.trace.finish(error)
         async with task_dict_lock:
             if self.mid in task_dict:
                 del task_dict[self.mid]
@@ -704,6 +903,12 @@ class TaskListener(TaskConfig):
             await remove(self.thumb)
 
     async def on_upload_error(self, error):
+        if self._cache_clone_error is not None and not self.is_cancelled:
+            self._cache_clone_error = str(error)
+            return
+        if self.upload_start:
+            self.trace.add("upload", monotonic() - self.upload_start)
+        await self.trace.finish(error)
         async with task_dict_lock:
             if self.mid in task_dict:
                 del task_dict[self.mid]
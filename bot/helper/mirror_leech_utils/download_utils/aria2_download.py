@@ -7,6 +7,7 @@ from aiohttp.client_exceptions import ClientError
 
 from bot import LOGGER, task_dict, task_dict_lock
 from bot.core.config_manager import Config
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.core.torrent_manager import TorrentManager, aria2_name, is_metadata
 from bot.helper.ext_utils.bot_utils import bt_selection_buttons
 from bot.helper.ext_utils.task_manager import check_running_tasks
@@ -54,7 +55,7 @@ async def add_aria2_download(listener, dpath, header, ratio, seed_time):
         LOGGER.info(f"Aria2c Download Error: {e}")
         await listener.on_download_error(f"{e}")
         return
-    download = await TorrentManager.aria2.tellStatus(gid)
+    download = await EngineSnapshot.refresh_aria2(gid)
     if download.get("errorMessage"):
         error = str(download["errorMessage"]).replace("<", " ").replace(">", " ")
         LOGGER.info(f"Aria2c Download Error: {error}")
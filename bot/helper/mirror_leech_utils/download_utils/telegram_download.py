@@ -1,11 +1,17 @@
-from asyncio import Lock, sleep
+import os
+from asyncio import Lock, Queue, gather, sleep
+from mimetypes import guess_extension
 from secrets import token_hex
 from time import time
 
+from aiofiles.os import makedirs
 from pyrogram.errors import FloodPremiumWait, FloodWait
 
 from bot import LOGGER, task_dict, task_dict_lock
 from bot.core.aeon_client import TgClient
+from bot.core.config_manager import Config
+from bot.core.metrics import Metrics
+from bot.helper.ext_utils.bot_utils import sync_to_async
 from bot.helper.ext_utils.task_manager import (
     check_running_tasks,
     stop_duplicate_check,
@@ -17,6 +23,36 @@ from bot.helper.telegram_helper.message_utils import send_status_message
 global_lock = Lock()
 GLOBAL_GID = set()
 
+# pyrogram streams files in parts of 1 MiB, a segment is a run of parts
+# fetched by one worker with a single stream_media call.
+CHUNK_SIZE = 1024 * 1024
+SEGMENT_CHUNKS = 8
+SEGMENT_RETRIES = 3
+
+
+def get_media(message):
+    return (
+        message.document
+        or message.photo
+        or message.video
+        or message.audio
+        or message.voice
+        or message.video_note
+        or message.sticker
+        or message.animation
+        or None
+    )
+
+
+def get_media_name(message, media):
+    if name := getattr(media, "file_name", None):
+        return name.rsplit("/", 1)[-1]
+    if message.photo:
+        ext = ".jpg"
+    else:
+        ext = guess_extension(getattr(media, "mime_type", None) or "") or ""
+    return f"{message.media.value}_{message.id}{ext}"
+
 
 class TelegramDownloadHelper:
     def __init__(self, listener):
@@ -25,6 +61,7 @@ class TelegramDownloadHelper:
         self._listener = listener
         self._id = ""
         self.session = ""
+        self._error = ""
 
     @property
     def speed(self):
@@ -80,6 +117,7 @@ class TelegramDownloadHelper:
                 return
         except (FloodWait, FloodPremiumWait) as f:
             LOGGER.warning(str(f))
+            Metrics.flood_wait(f.value)
             await sleep(f.value)
             await self._download(message, path)
             return
@@ -100,17 +138,7 @@ class TelegramDownloadHelper:
                 message_ids=message.id,
             )
 
-        media = (
-            message.document
-            or message.photo
-            or message.video
-            or message.audio
-            or message.voice
-            or message.video_note
-            or message.sticker
-            or message.animation
-            or None
-        )
+        media = get_media(message)
 
         if media is not None:
             async with global_lock:
@@ -156,7 +184,12 @@ class TelegramDownloadHelper:
 
                 self._start_time = time()
                 await self._on_download_start(gid, add_to_queue)
-                await self._download(message, path)
+                if path.endswith("/") and self._listener.name != "None":
+                    path = path + self._listener.name
+                if Config.TG_DOWNLOAD_WORKERS > 1 and not path.endswith("/"):
+                    await self._parallel_download([(message, media, path)])
+                else:
+                    await self._download(message, path)
             else:
                 await self._on_download_error("File already being downloaded!")
         else:
@@ -164,6 +197,187 @@ class TelegramDownloadHelper:
                 "No document in the replied message! Use SuperGroup incase you are trying to download with User session!",
             )
 
+    async def _sources(self, messages):
+        """Returns the (client, message) pairs every file can be fetched from.
+
+        The user session gets its own copy of the messages since file
+        references are bound to the client that fetched them.
+        """
+        sources = {message.id: [(self.session, message)] for message in messages}
+        if self.session != TgClient.bot or not TgClient.user:
+            return sources
+        try:
+            user_messages = await TgClient.user.get_messages(
+                chat_id=messages[0].chat.id,
+                message_ids=[message.id for message in messages],
+            )
+        except Exception as e:
+            LOGGER.debug(f"User session can't access this chat: {e}")
+            return sources
+        for user_message in user_messages:
+            if (
+                user_message.empty
+                or (media := get_media(user_message)) is None
+                or user_message.id not in sources
+            ):
+                continue
+            if (
+                get_media(sources[user_message.id][0][1]).file_unique_id
+                == media.file_unique_id
+            ):
+                sources[user_message.id].append((TgClient.user, user_message))
+        return sources
+
+    async def _parallel_download(self, files):
+        """Downloads files by fetching their segments concurrently.
+
+        Every file is preallocated and split into segments of SEGMENT_CHUNKS
+        parts. TG_DOWNLOAD_WORKERS workers pull segments from one queue, so a
+        single large file and a range of small files both keep all workers
+        busy. Workers alternate between the bot and user sessions when both
+        can access the chat.
+
+        Args:
+            files: List of (message, media, path) tuples.
+        """
+        sources = await self._sources([message for message, _, _ in files])
+        queue = Queue()
+        fds = []
+        try:
+            for message, media, path in files:
+                await makedirs(os.path.dirname(path), exist_ok=True)
+                fd = await sync_to_async(self._preallocate, path, media.file_size)
+                fds.append(fd)
+                chunks = -(-media.file_size // CHUNK_SIZE)
+                for offset in range(0, chunks, SEGMENT_CHUNKS):
+                    queue.put_nowait(
+                        (
+                            sources[message.id],
+                            fd,
+                            offset,
+                            min(SEGMENT_CHUNKS, chunks - offset),
+                        ),
+                    )
+            workers = min(Config.TG_DOWNLOAD_WORKERS, queue.qsize()) or 1
+            await gather(*(self._segment_worker(queue, i) for i in range(workers)))
+        except Exception as e:
+            LOGGER.error(str(e))
+            self._error = self._error or str(e)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        if self._listener.is_cancelled:
+            return
+        if self._error:
+            await self._on_download_error(self._error)
+        else:
+            await self._on_download_complete()
+
+    @staticmethod
+    def _preallocate(path, size):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if size:
+                os.posix_fallocate(fd, 0, size)
+        except OSError:
+            os.ftruncate(fd, size)
+        return fd
+
+    async def _segment_worker(self, queue, index):
+        while not queue.empty():
+            if self._listener.is_cancelled or self._error:
+                return
+            sources, fd, offset, limit = queue.get_nowait()
+            client, message = sources[index % len(sources)]
+            for attempt in range(SEGMENT_RETRIES):
+                written = 0
+                try:
+                    async for chunk in client.stream_media(
+                        message,
+                        limit=limit,
+                        offset=offset,
+                    ):
+                        if self._listener.is_cancelled:
+                            return
+                        await sync_to_async(
+                            os.pwrite,
+                            fd,
+                            chunk,
+                            (offset * CHUNK_SIZE) + written,
+                        )
+                        written += len(chunk)
+                        self._processed_bytes += len(chunk)
+                    break
+                except (FloodWait, FloodPremiumWait) as f:
+                    LOGGER.warning(str(f))
+                    self._processed_bytes -= written
+                    Metrics.flood_wait(f.value)
+                    await sleep(f.value)
+                    queue.put_nowait((sources, fd, offset, limit))
+                    break
+                except Exception as e:
+                    self._processed_bytes -= written
+                    if attempt == SEGMENT_RETRIES - 1:
+                        LOGGER.error(str(e))
+                        self._error = self._error or str(e)
+                        return
+                    await sleep(1)
+
+    async def add_download_range(self, messages, path, session):
+        """Downloads the media of a message range under one task.
+
+        All files land in `path`, named after their file names, and their
+        segments share one worker pool so TelegramStatus reports the
+        progress of the whole range.
+        """
+        self.session = session
+        files = []
+        names = set()
+        for message in messages:
+            if (media := get_media(message)) is None:
+                LOGGER.info(f"Skipping message without media: {message.link}")
+                continue
+            name = get_media_name(message, media)
+            if name in names:
+                name = f"{message.id}-{name}"
+            names.add(name)
+            files.append((message, media, f"{path}{name}"))
+        if not files:
+            await self._on_download_error("No media found in this message range!")
+            return
+
+        if not self._listener.name:
+            self._listener.name = self._listener.folder_name.strip("/").split(
+                "/",
+                1,
+            )[0]
+        self._listener.size = sum(media.file_size for _, media, _ in files)
+        gid = token_hex(4)
+
+        msg, button = await stop_duplicate_check(self._listener)
+        if msg:
+            await self._listener.on_download_error(msg, button)
+            return
+
+        add_to_queue, event = await check_running_tasks(self._listener)
+        if add_to_queue:
+            LOGGER.info(f"Added to Queue/Download: {self._listener.name}")
+            async with task_dict_lock:
+                task_dict[self._listener.mid] = QueueStatus(
+                    self._listener,
+                    gid,
+                    "dl",
+                )
+            await self._listener.on_download_start()
+            await send_status_message(self._listener.message)
+            await event.wait()
+            if self._listener.is_cancelled:
+                return
+
+        self._start_time = time()
+        await self._on_download_start(gid, add_to_queue)
+        await self._parallel_download(files)
+
     async def cancel_task(self):
         self._listener.is_cancelled = True
         LOGGER.info(
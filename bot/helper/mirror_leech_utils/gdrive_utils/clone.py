@@ -11,11 +11,19 @@ from tenacity import (
     wait_exponential,
 )
 
+from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import async_to_sync
-from bot.helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
+from bot.helper.mirror_leech_utils.gdrive_utils.helper import (
+    GoogleDriveHelper,
+    get_error_reason,
+)
 
 LOGGER = getLogger(__name__)
 
+# Drive accepts up to 100 calls in one batch request, but copies in large
+# batches hit the per-user rate limit quickly.
+COPY_BATCH_SIZE = 50
+
 
 class GoogleDriveClone(GoogleDriveHelper):
     def __init__(self, listener):
@@ -65,7 +73,14 @@ class GoogleDriveClone(GoogleDriveHelper):
                     meta.get("name"),
                     self.listener.up_dest,
                 )
-                self._clone_folder(meta.get("name"), meta.get("id"), dir_id)
+                if Config.GDRIVE_WORKERS > 1:
+                    self._clone_folder_concurrent(
+                        meta.get("name"),
+                        meta.get("id"),
+                        dir_id,
+                    )
+                else:
+                    self._clone_folder(meta.get("name"), meta.get("id"), dir_id)
                 durl = self.G_DRIVE_DIR_BASE_DOWNLOAD_URL.format(dir_id)
                 if self.listener.is_cancelled:
                     LOGGER.info("Deleting cloned data from Drive...")
@@ -134,6 +149,112 @@ class GoogleDriveClone(GoogleDriveHelper):
                 break
         return None
 
+    def _clone_folder_concurrent(self, folder_name, folder_id, dest_id):
+        """Clones a folder tree on the Drive worker pool.
+
+        A folder job lists the source folder, creates the destination
+        sub-folders and queues them as new folder jobs, so a folder always
+        exists before its children are copied. Files are queued in groups
+        that are copied with one batch request.
+        """
+        self.run_workers(
+            [("folder", folder_id, dest_id, folder_name)],
+            self._clone_job,
+        )
+
+    def _clone_job(self, worker, kind, *args):
+        if kind == "folder":
+            self._clone_folder_job(worker, *args)
+        else:
+            self._copy_batch(worker, *args)
+
+    def _clone_folder_job(self, worker, folder_id, dest_id, folder_name):
+        LOGGER.info(f"Syncing: {folder_name}")
+        files = self.get_files_by_folder_id(folder_id, service=worker["service"])
+        batch = []
+        for file in files:
+            if self.listener.is_cancelled:
+                return
+            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
+                current_dir_id = self.create_directory(
+                    file.get("name"),
+                    dest_id,
+                    worker["service"],
+                )
+                with self.lock:
+                    self.total_folders += 1
+                self.jobs.put(
+                    (
+                        "folder",
+                        file.get("id"),
+                        current_dir_id,
+                        ospath.join(folder_name, file.get("name")),
+                    ),
+                )
+            elif (
+                not file.get("name")
+                .strip()
+                .lower()
+                .endswith(tuple(self.listener.excluded_extensions))
+            ):
+                batch.append(
+                    {
+                        "id": file.get("id"),
+                        "dest": dest_id,
+                        "size": int(file.get("size", 0)),
+                        "attempts": 0,
+                    },
+                )
+                if len(batch) == COPY_BATCH_SIZE:
+                    self.jobs.put(("files", batch))
+                    batch = []
+        if batch:
+            self.jobs.put(("files", batch))
+
+    def _copy_batch(self, worker, files):
+        if self.listener.is_cancelled:
+            return
+        service = worker["service"]
+        results = self.execute_batch(
+            [
+                service.files().copy(
+                    fileId=file["id"],
+                    body={"parents": [file["dest"]]},
+                    supportsAllDrives=True,
+                    fields="id",
+                )
+                for file in files
+            ],
+            service,
+        )
+        retry_files = []
+        rate_limited = None
+        for file, (_, err) in zip(files, results, strict=True):
+            if err is None:
+                with self.lock:
+                    self.total_files += 1
+                    self.proc_bytes += file["size"]
+                    self.total_time = int(time() - self._start_time)
+                continue
+            reason = get_error_reason(err)
+            if reason == "cannotCopyFile":
+                LOGGER.error(err)
+            elif reason in ["userRateLimitExceeded", "dailyLimitExceeded"]:
+                if not self.use_sa:
+                    LOGGER.error(f"Got: {reason}")
+                    raise err
+                rate_limited = err
+                retry_files.append(file)
+            elif file["attempts"] < 2:
+                file["attempts"] += 1
+                retry_files.append(file)
+            else:
+                raise err
+        if rate_limited is not None:
+            self.switch_worker_account(worker, rate_limited)
+        if retry_files:
+            self.jobs.put(("files", retry_files))
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
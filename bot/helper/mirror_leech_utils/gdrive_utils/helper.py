@@ -1,14 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+from json import loads
 from logging import ERROR, getLogger
 from os import listdir
 from os import path as ospath
 from pickle import load as pload
+from queue import Empty, Queue
 from random import randrange
 from re import search as re_search
+from threading import Event, Lock
+from time import sleep
 from urllib.parse import parse_qs, urlparse
 
 from google.oauth2 import service_account
 from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import build_http
 from tenacity import (
     retry,
@@ -18,12 +24,33 @@ from tenacity import (
 )
 
 from bot.core.config_manager import Config
+from bot.core.metrics import Metrics
 from bot.helper.ext_utils.links_utils import is_gdrive_id
 
 LOGGER = getLogger(__name__)
 getLogger("googleapiclient.discovery").setLevel(ERROR)
 
 
+# Maximum number of calls Drive accepts in one batch request.
+BATCH_LIMIT = 100
+
+
+class CountingHttp(AuthorizedHttp):
+    """Counts every Drive API request for the metrics exporter."""
+
+    def request(self, *args, **kwargs):
+        Metrics.inc("drive_api_calls_total")
+        return super().request(*args, **kwargs)
+
+
+def get_error_reason(err):
+    if isinstance(err, HttpError) and err.resp.get("content-type", "").startswith(
+        "application/json",
+    ):
+        return loads(err.content).get("error").get("errors")[0].get("reason")
+    return ""
+
+
 class GoogleDriveHelper:
     def __init__(self):
         self._OAUTH_SCOPE = ["https://www.googleapis.com/auth/drive"]
@@ -51,6 +78,11 @@ class GoogleDriveHelper:
         self.status = None
         self.update_interval = 3
         self.use_sa = Config.USE_SERVICE_ACCOUNTS
+        self.lock = Lock()
+        self.jobs = None
+        self.workers = []
+        self._workers_stop = None
+        self._workers_error = None
 
     @property
     def speed(self):
@@ -75,17 +107,19 @@ class GoogleDriveHelper:
             self.proc_bytes += chunk_size
             self.total_time += self.update_interval
 
-    def authorize(self):
+    def authorize(self, sa_index=None):
         credentials = None
         if self.use_sa:
             json_files = listdir("accounts")
             self.sa_number = len(json_files)
-            self.sa_index = randrange(self.sa_number)
+            if sa_index is None:
+                self.sa_index = randrange(self.sa_number)
+                sa_index = self.sa_index
             LOGGER.info(
-                f"Authorizing with {json_files[self.sa_index]} service account",
+                f"Authorizing with {json_files[sa_index]} service account",
             )
             credentials = service_account.Credentials.from_service_account_file(
-                f"accounts/{json_files[self.sa_index]}",
+                f"accounts/{json_files[sa_index]}",
                 scopes=self._OAUTH_SCOPE,
             )
         elif ospath.exists(self.token_path):
@@ -94,7 +128,7 @@ class GoogleDriveHelper:
                 credentials = pload(f)
         else:
             LOGGER.error("token.pickle not found!")
-        authorized_http = AuthorizedHttp(credentials, http=build_http())
+        authorized_http = CountingHttp(credentials, http=build_http())
         authorized_http.http.disable_ssl_certificate_validation = True
         return build("drive", "v3", http=authorized_http, cache_discovery=False)
 
@@ -104,9 +138,100 @@ class GoogleDriveHelper:
         else:
             self.sa_index += 1
         self.sa_count += 1
+        Metrics.inc("drive_account_switches_total")
         LOGGER.info(f"Switching to {self.sa_index} index")
         self.service = self.authorize()
 
+    def next_sa_index(self):
+        with self.lock:
+            self.sa_index = (self.sa_index + 1) % self.sa_number
+            return self.sa_index
+
+    def switch_worker_account(self, worker, err):
+        with self.lock:
+            if self.sa_count >= self.sa_number:
+                LOGGER.info(
+                    f"Reached maximum number of service accounts switching, which is {self.sa_count}",
+                )
+                raise err
+            self.sa_count += 1
+        Metrics.inc("drive_account_switches_total")
+        worker["sa_index"] = self.next_sa_index()
+        LOGGER.info(f"Switching to {worker['sa_index']} index")
+        worker["service"] = self.authorize(worker["sa_index"])
+
+    def run_workers(self, jobs, handler):
+        """Runs `handler(worker, *job)` for every job on GDRIVE_WORKERS threads.
+
+        Every worker owns its own authorized service, and with service
+        accounts its own account, since Drive services are not thread-safe.
+        Handlers may queue more jobs with `self.jobs.put`. The first error
+        raised by a handler stops all workers and is raised again here.
+        """
+        self.jobs = Queue()
+        self.workers = []
+        self._workers_stop = Event()
+        self._workers_error = None
+        for job in jobs:
+            self.jobs.put(job)
+        with ThreadPoolExecutor(max_workers=Config.GDRIVE_WORKERS) as pool:
+            for _ in range(Config.GDRIVE_WORKERS):
+                pool.submit(self._worker_loop, handler)
+            while (
+                self.jobs.unfinished_tasks
+                and self._workers_error is None
+                and not self.listener.is_cancelled
+            ):
+                sleep(0.5)
+            self._workers_stop.set()
+        if self._workers_error is not None:
+            raise self._workers_error
+
+    def _worker_loop(self, handler):
+        try:
+            worker = {"sa_index": self.next_sa_index(), "done": 0, "current": 0}
+            worker["service"] = self.authorize(worker["sa_index"])
+            self.workers.append(worker)
+            while not self._workers_stop.is_set():
+                try:
+                    job = self.jobs.get(timeout=0.5)
+                except Empty:
+                    continue
+                try:
+                    handler(worker, *job)
+                finally:
+                    self.jobs.task_done()
+        except Exception as e:
+            with self.lock:
+                if self._workers_error is None:
+                    self._workers_error = e
+
+    def execute_batch(self, requests, service=None):
+        """Executes requests through the Drive batch endpoint.
+
+        Returns:
+            A list of (response, exception) tuples in the order of requests.
+        """
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+
+        service = service or self.service
+        for start in range(0, len(requests), BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=callback)
+            for index, request in enumerate(
+                requests[start : start + BATCH_LIMIT],
+                start=start,
+            ):
+                batch.add(request, request_id=str(index))
+            try:
+                batch.execute()
+            except Exception as e:
+                for index in range(start, min(start + BATCH_LIMIT, len(requests))):
+                    results.setdefault(str(index), (None, e))
+        return [results[str(index)] for index in range(len(requests))]
+
     def get_id_from_url(self, link, user_id=""):
         if user_id and link.startswith("mtp:"):
             self.use_sa = False
@@ -129,12 +254,7 @@ class GoogleDriveHelper:
         parsed = urlparse(link)
         return parse_qs(parsed.query)["id"][0]
 
-    @retry(
-        wait=wait_exponential(multiplier=2, min=3, max=6),
-        stop=stop_after_attempt(3),
-        retry=retry_if_exception_type(Exception),
-    )
-    def set_permission(self, file_id):
+    def permission_request(self, file_id, service=None):
         permissions = {
             "role": "reader",
             "type": "anyone",
@@ -142,11 +262,19 @@ class GoogleDriveHelper:
             "withLink": True,
         }
         return (
-            self.service.permissions()
+            (service or self.service)
+            .permissions()
             .create(fileId=file_id, body=permissions, supportsAllDrives=True)
-            .execute()
         )
 
+    @retry(
+        wait=wait_exponential(multiplier=2, min=3, max=6),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    def set_permission(self, file_id, service=None):
+        return self.permission_request(file_id, service).execute()
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
@@ -168,7 +296,7 @@ class GoogleDriveHelper:
         stop=stop_after_attempt(3),
         retry=retry_if_exception_type(Exception),
     )
-    def get_files_by_folder_id(self, folder_id, item_type=""):
+    def get_files_by_folder_id(self, folder_id, item_type="", service=None):
         page_token = None
         files = []
         if not item_type:
@@ -179,7 +307,8 @@ class GoogleDriveHelper:
             q = f"'{folder_id}' in parents and mimeType != '{self.G_DRIVE_DIR_MIME_TYPE}' and trashed = false"
         while True:
             response = (
-                self.service.files()
+                (service or self.service)
+                .files()
                 .list(
                     supportsAllDrives=True,
                     includeItemsFromAllDrives=True,
@@ -203,27 +332,32 @@ class GoogleDriveHelper:
         stop=stop_after_attempt(3),
         retry=retry_if_exception_type(Exception),
     )
-    def create_directory(self, directory_name, dest_id):
-        file_metadata = {
-            "name": directory_name,
-            "description": "Uploaded by Mirror-leech-telegram-bot",
-            "mimeType": self.G_DRIVE_DIR_MIME_TYPE,
-        }
-        if dest_id is not None:
-            file_metadata["parents"] = [dest_id]
+    def create_directory(self, directory_name, dest_id, service=None):
+        file_metadata = self.directory_metadata(directory_name, dest_id)
         file = (
-            self.service.files()
+            (service or self.service)
+            .files()
             .create(body=file_metadata, supportsAllDrives=True)
             .execute()
         )
         file_id = file.get("id")
         if not Config.IS_TEAM_DRIVE:
-            self.set_permission(file_id)
+            self.set_permission(file_id, service)
         LOGGER.info(
             f"Created G-Drive Folder:\nName: {file.get('name')}\nID: {file_id}",
         )
         return file_id
 
+    def directory_metadata(self, directory_name, dest_id):
+        file_metadata = {
+            "name": directory_name,
+            "description": "Uploaded by Mirror-leech-telegram-bot",
+            "mimeType": self.G_DRIVE_DIR_MIME_TYPE,
+        }
+        if dest_id is not None:
+            file_metadata["parents"] = [dest_id]
+        return file_metadata
+
     def escapes(self, estr):
         chars = ["\\", "'", '"', r"\a", r"\b", r"\f", r"\n", r"\r", r"\t"]
         for char in chars:
@@ -2,6 +2,7 @@ import contextlib
 from logging import getLogger
 from os import listdir, remove
 from os import path as ospath
+from time import sleep, time
 
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
@@ -16,10 +17,35 @@ from tenacity import (
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import SetInterval, async_to_sync
 from bot.helper.ext_utils.files_utils import get_mime_type
-from bot.helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
+from bot.helper.mirror_leech_utils.gdrive_utils.helper import (
+    GoogleDriveHelper,
+    get_error_reason,
+)
 
 LOGGER = getLogger(__name__)
 
+# Files up to this size are sent with one multipart request.
+SIMPLE_UPLOAD_SIZE = 5 * 1024 * 1024
+MIN_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 100 * 1024 * 1024
+# Resumable chunks are sized to take about this long at the measured speed.
+CHUNK_SECONDS = 10
+
+
+def get_chunk_size(file_size, speed):
+    """Returns a resumable chunk size in multiples of 256 KiB, as Drive requires.
+
+    Args:
+        file_size: Size of the file in bytes.
+        speed: Last upload speed measured by the worker, in bytes/sec.
+    """
+    chunk = min(
+        max(speed * CHUNK_SECONDS, MIN_CHUNK_SIZE),
+        MAX_CHUNK_SIZE,
+        file_size,
+    )
+    return -(-int(chunk) // 262144) * 262144
+
 
 class GoogleDriveUpload(GoogleDriveHelper):
     def __init__(self, listener, path):
@@ -27,6 +53,7 @@ class GoogleDriveUpload(GoogleDriveHelper):
         self._updater = None
         self._path = path
         self._is_errored = False
+        self._tree = None
         super().__init__()
         self.is_uploading = True
 
@@ -67,14 +94,19 @@ class GoogleDriveUpload(GoogleDriveHelper):
                 LOGGER.info(f"Uploaded To G-Drive: {self._path}")
             else:
                 mime_type = "Folder"
+                if self.listener.manifest:
+                    self._build_tree()
                 dir_id = self.create_directory(
                     ospath.basename(ospath.abspath(self.listener.name)),
                     self.listener.up_dest,
                 )
-                result = self._upload_dir(
-                    self._path,
-                    dir_id,
-                )
+                if Config.GDRIVE_WORKERS > 1:
+                    result = self._upload_dir_concurrent(self._path, dir_id)
+                else:
+                    result = self._upload_dir(
+                        self._path,
+                        dir_id,
+                    )
                 if result is None:
                     raise ValueError("Upload has been manually cancelled!")
                 link = self.G_DRIVE_DIR_BASE_DOWNLOAD_URL.format(dir_id)
@@ -112,14 +144,52 @@ class GoogleDriveUpload(GoogleDriveHelper):
         )
         return
 
+    async def progress(self):
+        if self.workers:
+            self.proc_bytes = sum(
+                worker["done"] + worker["current"] for worker in self.workers
+            )
+            self.total_time += self.update_interval
+        else:
+            await super().progress()
+
+    def _build_tree(self):
+        """Indexes the files of the task manifest by directory, with every
+        directory leading to them, so folders are listed without touching
+        the disk.
+        """
+        root = self._path.rstrip("/")
+        self._tree = {root: (set(), [])}
+        for dirpath, _, files in self.listener.manifest.walk(root):
+            self._tree.setdefault(dirpath, (set(), []))[1].extend(files)
+            while dirpath != root:
+                parent, name = dirpath.rsplit("/", 1)
+                self._tree.setdefault(parent, (set(), []))[0].add(name)
+                dirpath = parent
+
+    def _listdir(self, path):
+        """Returns the sub directories and files of a directory, from the
+        manifest when the task has one.
+        """
+        if self._tree is None:
+            dirs, files = [], []
+            for item in listdir(path):
+                if ospath.isdir(ospath.join(path, item)):
+                    dirs.append(item)
+                else:
+                    files.append(item)
+            return dirs, files
+        dirs, files = self._tree.get(path.rstrip("/"), ((), ()))
+        return sorted(dirs), list(files)
+
     def _upload_dir(self, input_directory, dest_id):
-        list_dirs = listdir(input_directory)
-        if len(list_dirs) == 0:
+        dirs, files = self._listdir(input_directory)
+        if not dirs and not files:
             return dest_id
         new_id = None
-        for item in list_dirs:
+        for item in dirs + files:
             current_file_name = ospath.join(input_directory, item)
-            if ospath.isdir(current_file_name):
+            if item in dirs:
                 current_dir_id = self.create_directory(item, dest_id)
                 new_id = self._upload_dir(
                     current_file_name,
@@ -141,6 +211,157 @@ class GoogleDriveUpload(GoogleDriveHelper):
                 break
         return new_id
 
+    def _upload_dir_concurrent(self, input_directory, dest_id):
+        """Uploads a directory on the Drive worker pool.
+
+        The whole folder hierarchy is created first, one batch request per
+        depth level, then all files are uploaded by GDRIVE_WORKERS workers.
+        Each worker only writes its own byte counters, which `progress` sums.
+        """
+        jobs = []
+        level = [(input_directory, dest_id)]
+        while level and not self.listener.is_cancelled:
+            folders = []
+            for path, parent_id in level:
+                dirs, files = self._listdir(path)
+                folders.extend(
+                    (ospath.join(path, item), item, parent_id) for item in dirs
+                )
+                jobs.extend(
+                    (ospath.join(path, item), item, parent_id) for item in files
+                )
+            ids = self._create_directories(
+                [(name, parent_id) for _, name, parent_id in folders],
+            )
+            self.total_folders += len(folders)
+            level = [
+                (path, folder_id)
+                for (path, _, _), folder_id in zip(folders, ids, strict=True)
+            ]
+        if not self.listener.is_cancelled:
+            self.run_workers(jobs, self._upload_job)
+        if self.listener.is_cancelled:
+            return None
+        return dest_id
+
+    def _create_directories(self, folders):
+        """Creates (name, parent_id) folders with batch requests.
+
+        Folders that fail in the batch are created again one by one.
+
+        Returns:
+            The ids of the created folders in the same order.
+        """
+        if not folders:
+            return []
+        results = self.execute_batch(
+            [
+                self.service.files().create(
+                    body=self.directory_metadata(name, parent_id),
+                    supportsAllDrives=True,
+                    fields="id",
+                )
+                for name, parent_id in folders
+            ],
+        )
+        ids = []
+        created = []
+        for (name, parent_id), (response, err) in zip(folders, results, strict=True):
+            if err is None:
+                ids.append(response["id"])
+                created.append(response["id"])
+            else:
+                ids.append(self.create_directory(name, parent_id))
+        if created and not Config.IS_TEAM_DRIVE:
+            results = self.execute_batch(
+                [self.permission_request(file_id) for file_id in created],
+            )
+            for file_id, (_, err) in zip(created, results, strict=True):
+                if err is not None:
+                    self.set_permission(file_id)
+        LOGGER.info(f"Created {len(folders)} G-Drive Folders")
+        return ids
+
+    @retry(
+        wait=wait_exponential(multiplier=2, min=3, max=6),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    def _upload_job(self, worker, file_path, file_name, dest_id):
+        if self.listener.is_cancelled:
+            return None
+        service = worker["service"]
+        mime_type = get_mime_type(file_path)
+        file_size = ospath.getsize(file_path)
+        file_metadata = {
+            "name": file_name,
+            "description": "Uploaded by Mirror-leech-telegram-bot",
+            "mimeType": mime_type,
+            "parents": [dest_id],
+        }
+        worker["current"] = 0
+        start_time = time()
+        if file_size <= SIMPLE_UPLOAD_SIZE:
+            response = (
+                service.files()
+                .create(
+                    body=file_metadata,
+                    media_body=MediaFileUpload(
+                        file_path,
+                        mimetype=mime_type,
+                        resumable=False,
+                    ),
+                    supportsAllDrives=True,
+                    fields="id",
+                )
+                .execute()
+            )
+        else:
+            drive_file = service.files().create(
+                body=file_metadata,
+                media_body=MediaFileUpload(
+                    file_path,
+                    mimetype=mime_type,
+                    resumable=True,
+                    chunksize=get_chunk_size(file_size, worker.get("speed", 0)),
+                ),
+                supportsAllDrives=True,
+                fields="id",
+            )
+            response = None
+            retries = 0
+            while response is None:
+                if self.listener.is_cancelled:
+                    return None
+                try:
+                    status, response = drive_file.next_chunk()
+                except HttpError as err:
+                    if err.resp.status in [500, 502, 503, 504, 429] and retries < 10:
+                        retries += 1
+                        sleep(min(2**retries, 60))
+                        continue
+                    reason = get_error_reason(err)
+                    if reason not in ["userRateLimitExceeded", "dailyLimitExceeded"]:
+                        raise err
+                    if not self.use_sa:
+                        LOGGER.error(f"Got: {reason}")
+                        raise err
+                    self.switch_worker_account(worker, err)
+                    LOGGER.info(f"Got: {reason}, Trying Again...")
+                    return self._upload_job(worker, file_path, file_name, dest_id)
+                if status is not None:
+                    worker["current"] = status.resumable_progress
+            worker["speed"] = file_size / max(time() - start_time, 1)
+        worker["current"] = 0
+        worker["done"] += file_size
+        with self.lock:
+            self.total_files += 1
+        with contextlib.suppress(Exception):
+            remove(file_path)
+        if not Config.IS_TEAM_DRIVE:
+            self.set_permission(response["id"], service)
+        return None
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
@@ -14,9 +14,19 @@ from aiofiles.os import path as aiopath
 from bot.core.config_manager import Config
 from bot.helper.ext_utils.bot_utils import cmd_exec, sync_to_async
 from bot.helper.ext_utils.files_utils import count_files_and_folders, get_mime_type
+from bot.helper.ext_utils.status_utils import speed_string_to_bytes
 
 LOGGER = getLogger(__name__)
 
+RCLONE_TIME_UNITS = {"y": 31536000, "w": 604800, "d": 86400, "h": 3600, "m": 60}
+
+
+def _eta_to_seconds(eta):
+    return sum(
+        int(value) * RCLONE_TIME_UNITS.get(unit, 1)
+        for value, unit in re_findall(r"(\d+)([ywdhms])", eta)
+    )
+
 
 class RcloneTransferHelper:
     def __init__(self, listener):
@@ -27,6 +37,7 @@ class RcloneTransferHelper:
         self._percentage = "0%"
         self._speed = "0 B/s"
         self._size = "0 B"
+        self._raw = (0, 0, 0, 0, 0)
         self._is_download = False
         self._is_upload = False
         self._sa_count = 1
@@ -55,6 +66,13 @@ class RcloneTransferHelper:
     def size(self):
         return self._size
 
+    @property
+    def raw(self):
+        """Returns a tuple of the (processed bytes, size, percentage, speed in
+        bytes/sec, eta in seconds) of the last stats line.
+        """
+        return self._raw
+
     async def _progress(self):
         while not (
             self._proc.returncode is not None
@@ -79,6 +97,13 @@ class RcloneTransferHelper:
                     self._speed,
                     self._eta,
                 ) = data[0]
+                self._raw = (
+                    speed_string_to_bytes(self._transferred_size),
+                    speed_string_to_bytes(self._size),
+                    float(self._percentage.strip("%")),
+                    speed_string_to_bytes(self._speed),
+                    _eta_to_seconds(self._eta),
+                )
             await sleep(0.5)
 
     def _switch_service_account(self):
@@ -373,7 +398,7 @@ class RcloneTransferHelper:
             files,
             folders,
             mime_type,
-            destination,
+            rclone_path=destination,
         )
         return
 
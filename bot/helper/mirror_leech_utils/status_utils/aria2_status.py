@@ -1,6 +1,7 @@
 from time import time
 
 from bot import LOGGER
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.core.torrent_manager import TorrentManager, aria2_name
 from bot.helper.ext_utils.status_utils import (
     MirrorStatus,
@@ -11,7 +12,7 @@ from bot.helper.ext_utils.status_utils import (
 
 async def get_download(gid, old_info=None):
     try:
-        res = await TorrentManager.aria2.tellStatus(gid)
+        res = await EngineSnapshot.get_aria2(gid)
         return res or old_info
     except Exception as e:
         LOGGER.error(f"{e}: Aria2c, Error while getting torrent info")
@@ -34,37 +35,44 @@ class Aria2Status:
             self._gid = self._download["followedBy"][0]
             self._download = await get_download(self._gid)
 
-    def progress(self):
+    def processed_raw(self):
+        return int(self._download.get("completedLength", "0"))
+
+    def size_raw(self):
+        return int(self._download.get("totalLength", "0"))
+
+    def speed_raw(self):
+        return int(self._download.get("downloadSpeed", "0"))
+
+    def eta_raw(self):
+        try:
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
+        except Exception:
+            return 0
+
+    def progress_raw(self):
         try:
-            return f"{round(int(self._download.get('completedLength', '0')) / int(self._download.get('totalLength', '0')) * 100, 2)}%"
+            return self.processed_raw() / self.size_raw() * 100
         except Exception:
-            return "0%"
+            return 0
+
+    def progress(self):
+        return f"{round(self.progress_raw(), 2)}%"
 
     def processed_bytes(self):
-        return get_readable_file_size(
-            int(self._download.get("completedLength", "0")),
-        )
+        return get_readable_file_size(self.processed_raw())
 
     def speed(self):
-        return f"{get_readable_file_size(int(self._download.get('downloadSpeed', '0')))}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def name(self):
         return aria2_name(self._download)
 
     def size(self):
-        return get_readable_file_size(int(self._download.get("totalLength", "0")))
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        try:
-            return get_readable_time(
-                (
-                    int(self._download.get("totalLength", "0"))
-                    - int(self._download.get("completedLength", "0"))
-                )
-                / int(self._download.get("downloadSpeed", "0")),
-            )
-        except Exception:
-            return "-"
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
     async def status(self):
         await self.update()
@@ -15,9 +15,24 @@ class DirectStatus:
     def gid(self):
         return self._gid
 
+    def processed_raw(self):
+        return self._obj.processed_bytes
+
+    def size_raw(self):
+        return self.listener.size
+
+    def speed_raw(self):
+        return self._obj.speed
+
+    def eta_raw(self):
+        try:
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
+        except Exception:
+            return 0
+
     def progress_raw(self):
         try:
-            return self._obj.processed_bytes / self.listener.size * 100
+            return self.processed_raw() / self.size_raw() * 100
         except Exception:
             return 0
 
@@ -25,33 +40,25 @@ class DirectStatus:
         return f"{round(self.progress_raw(), 2)}%"
 
     def speed(self):
-        return f"{get_readable_file_size(self._obj.speed)}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def name(self):
         return self.listener.name
 
     def size(self):
-        return get_readable_file_size(self.listener.size)
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        try:
-            seconds = (
-                self.listener.size - self._obj.processed_bytes
-            ) / self._obj.speed
-            return get_readable_time(seconds)
-        except Exception:
-            return "-"
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
-    def status(self):
-        if (
-            self._obj.download_task
-            and self._obj.download_task.get("status", "") == "waiting"
-        ):
+    async def status(self):
+        await self._obj.update()
+        if self._obj.is_waiting:
             return MirrorStatus.STATUS_QUEUEDL
         return MirrorStatus.STATUS_DOWNLOAD
 
     def processed_bytes(self):
-        return get_readable_file_size(self._obj.processed_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def task(self):
         return self._obj
@@ -16,14 +16,29 @@ class FFmpegStatus:
         self._cstatus = status
         self.tool = "ffmpeg"
 
+    def processed_raw(self):
+        return self._obj.processed_bytes
+
+    def size_raw(self):
+        return self.listener.size
+
+    def speed_raw(self):
+        return self._obj.speed_raw
+
+    def eta_raw(self):
+        return self._obj.eta_raw
+
+    def progress_raw(self):
+        return self._obj.progress_raw
+
     def speed(self):
-        return f"{get_readable_file_size(self._obj.speed_raw)}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def processed_bytes(self):
-        return get_readable_file_size(self._obj.processed_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def progress(self):
-        return f"{round(self._obj.progress_raw, 2)}%"
+        return f"{round(self.progress_raw(), 2)}%"
 
     def gid(self):
         return self._gid
@@ -32,10 +47,10 @@ class FFmpegStatus:
         return self.listener.name
 
     def size(self):
-        return get_readable_file_size(self.listener.size)
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        return get_readable_time(self._obj.eta_raw) if self._obj.eta_raw else "-"
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
     def status(self):
         if self._cstatus == "Convert":
@@ -77,17 +77,32 @@ class JDownloaderStatus:
     async def _update(self):
         self._info = await get_download(self._gid, self._info)
 
-    def progress(self):
+    def processed_raw(self):
+        return self._info.get("bytesLoaded", 0)
+
+    def size_raw(self):
+        return self._info.get("bytesTotal", 0)
+
+    def speed_raw(self):
+        return self._info.get("speed", 0)
+
+    def eta_raw(self):
+        return self._info.get("eta", 0)
+
+    def progress_raw(self):
         try:
-            return f"{round((self._info.get('bytesLoaded', 0) / self._info.get('bytesTotal', 0)) * 100, 2)}%"
+            return self.processed_raw() / self.size_raw() * 100
         except Exception:
-            return "0%"
+            return 0
+
+    def progress(self):
+        return f"{round(self.progress_raw(), 2)}%"
 
     def processed_bytes(self):
-        return get_readable_file_size(self._info.get("bytesLoaded", 0))
+        return get_readable_file_size(self.processed_raw())
 
     def speed(self):
-        return f"{get_readable_file_size(self._info.get('speed', 0))}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def name(self):
         return (
@@ -97,12 +112,10 @@ class JDownloaderStatus:
         )
 
     def size(self):
-        return get_readable_file_size(self._info.get("bytesTotal", 0))
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        return (
-            get_readable_time(eta) if (eta := self._info.get("eta", False)) else "-"
-        )
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
     async def status(self):
         await self._update()
@@ -1,6 +1,7 @@
 from asyncio import gather
 
 from bot import LOGGER, nzb_jobs, nzb_listener_lock, sabnzbd_client
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.helper.ext_utils.status_utils import (
     MirrorStatus,
     get_readable_file_size,
@@ -11,15 +12,12 @@ from bot.helper.ext_utils.status_utils import (
 
 async def get_download(nzo_id, old_info=None):
     try:
-        queue = await sabnzbd_client.get_downloads(nzo_ids=nzo_id)
-        if res := queue["queue"]["slots"]:
-            slot = res[0]
+        queue_slot, history_slot = await EngineSnapshot.get_sabnzbd(nzo_id)
+        if slot := queue_slot:
             if msg := slot["labels"]:
                 LOGGER.warning(" | ".join(msg))
             return slot
-        history = await sabnzbd_client.get_history(nzo_ids=nzo_id)
-        if res := history["history"]["slots"]:
-            slot = res[0]
+        if slot := history_slot:
             if slot["status"] == "Verifying":
                 percentage = slot["action_line"].split("Verifying: ")[-1].split("/")
                 percentage = round(
@@ -62,12 +60,18 @@ class SabnzbdStatus:
     async def update(self):
         self._info = await get_download(self._gid, self._info)
 
+    def progress_raw(self):
+        return float(self._info["percentage"])
+
     def progress(self):
         return f"{self._info['percentage']}%"
 
     def processed_raw(self):
         return (float(self._info["mb"]) - float(self._info["mbleft"])) * 1048576
 
+    def size_raw(self):
+        return float(self._info["mb"]) * 1048576
+
     def processed_bytes(self):
         return get_readable_file_size(self.processed_raw())
 
@@ -1,6 +1,7 @@
 from asyncio import gather, sleep
 
 from bot import LOGGER, qb_listener_lock, qb_torrents
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.core.torrent_manager import TorrentManager
 from bot.helper.ext_utils.status_utils import (
     MirrorStatus,
@@ -11,7 +12,7 @@ from bot.helper.ext_utils.status_utils import (
 
 async def get_download(tag, old_info=None):
     try:
-        res = (await TorrentManager.qbittorrent.torrents.info(tag=tag))[0]
+        res = await EngineSnapshot.get_qbittorrent(tag)
         return res or old_info
     except Exception as e:
         LOGGER.error(f"{e}: Qbittorrent, while getting torrent info. Tag: {tag}")
@@ -29,14 +30,29 @@ class QbittorrentStatus:
     async def update(self):
         self._info = await get_download(f"{self.listener.mid}", self._info)
 
+    def processed_raw(self):
+        return self._info.downloaded
+
+    def size_raw(self):
+        return self._info.size
+
+    def speed_raw(self):
+        return self._info.dlspeed
+
+    def eta_raw(self):
+        return self._info.eta.total_seconds()
+
+    def progress_raw(self):
+        return self._info.progress * 100
+
     def progress(self):
-        return f"{round(self._info.progress * 100, 2)}%"
+        return f"{round(self.progress_raw(), 2)}%"
 
     def processed_bytes(self):
-        return get_readable_file_size(self._info.downloaded)
+        return get_readable_file_size(self.processed_raw())
 
     def speed(self):
-        return f"{get_readable_file_size(self._info.dlspeed)}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def name(self):
         if self._info.state in ["metaDL", "checkingResumeData"]:
@@ -44,10 +60,10 @@ class QbittorrentStatus:
         return self.listener.name
 
     def size(self):
-        return get_readable_file_size(self._info.size)
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        return get_readable_time(self._info.eta.total_seconds())
+        return get_readable_time(self.eta_raw())
 
     async def status(self):
         await self.update()
@@ -24,6 +24,21 @@ class QueueStatus:
             return MirrorStatus.STATUS_QUEUEDL
         return MirrorStatus.STATUS_QUEUEUP
 
+    def processed_raw(self):
+        return 0
+
+    def size_raw(self):
+        return self._size
+
+    def speed_raw(self):
+        return 0
+
+    def eta_raw(self):
+        return 0
+
+    def progress_raw(self):
+        return 0
+
     def processed_bytes(self):
         return 0
 
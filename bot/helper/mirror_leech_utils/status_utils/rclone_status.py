@@ -12,6 +12,21 @@ class RcloneStatus:
     def gid(self):
         return self._gid
 
+    def processed_raw(self):
+        return self._obj.raw[0]
+
+    def size_raw(self):
+        return self._obj.raw[1]
+
+    def progress_raw(self):
+        return self._obj.raw[2]
+
+    def speed_raw(self):
+        return self._obj.raw[3]
+
+    def eta_raw(self):
+        return self._obj.raw[4]
+
     def progress(self):
         return self._obj.percentage
 
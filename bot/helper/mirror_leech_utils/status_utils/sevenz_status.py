@@ -21,32 +21,46 @@ class SevenZStatus:
     def gid(self):
         return self._gid
 
-    def _speed_raw(self):
+    def processed_raw(self):
+        return self._obj.processed_bytes
+
+    def size_raw(self):
+        return self.listener.size
+
+    def speed_raw(self):
         return self._obj.processed_bytes / (time() - self._start_time)
 
+    def eta_raw(self):
+        try:
+            return (
+                self.listener.subsize - self._obj.processed_bytes
+            ) / self.speed_raw()
+        except Exception:
+            return 0
+
+    def progress_raw(self):
+        try:
+            return self._obj.processed_bytes / self.listener.subsize * 100
+        except Exception:
+            return 0
+
     def progress(self):
         return self._obj.progress
 
     def speed(self):
-        return f"{get_readable_file_size(self._speed_raw())}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def processed_bytes(self):
-        return get_readable_file_size(self._obj.processed_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def name(self):
         return self.listener.name
 
     def size(self):
-        return get_readable_file_size(self.listener.size)
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        try:
-            seconds = (
-                self.listener.subsize - self._obj.processed_bytes
-            ) / self._speed_raw()
-            return get_readable_time(seconds)
-        except Exception:
-            return "-"
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
     def status(self):
         if self._cstatus == "Extract":
@@ -14,8 +14,29 @@ class TelegramStatus:
         self._status = status
         self.tool = "telegram"
 
+    def processed_raw(self):
+        return self._obj.processed_bytes
+
+    def size_raw(self):
+        return self._size
+
+    def speed_raw(self):
+        return self._obj.speed
+
+    def eta_raw(self):
+        try:
+            return (self._size - self._obj.processed_bytes) / self._obj.speed
+        except Exception:
+            return 0
+
+    def progress_raw(self):
+        try:
+            return self._obj.processed_bytes / self._size * 100
+        except Exception:
+            return 0
+
     def processed_bytes(self):
-        return get_readable_file_size(self._obj.processed_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def size(self):
         return get_readable_file_size(self._size)
@@ -29,21 +50,13 @@ class TelegramStatus:
         return self.listener.name
 
     def progress(self):
-        try:
-            progress_raw = self._obj.processed_bytes / self._size * 100
-        except Exception:
-            progress_raw = 0
-        return f"{round(progress_raw, 2)}%"
+        return f"{round(self.progress_raw(), 2)}%"
 
     def speed(self):
-        return f"{get_readable_file_size(self._obj.speed)}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def eta(self):
-        try:
-            seconds = (self._size - self._obj.processed_bytes) / self._obj.speed
-            return get_readable_time(seconds)
-        except Exception:
-            return "-"
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
     def gid(self):
         return self._gid
@@ -15,11 +15,33 @@ class YtDlpStatus:
     def gid(self):
         return self._gid
 
+    def processed_raw(self):
+        return self._obj.downloaded_bytes
+
+    def size_raw(self):
+        return self._obj.size
+
+    def speed_raw(self):
+        return self._obj.download_speed
+
+    def eta_raw(self):
+        if self._obj.eta != "-":
+            return self._obj.eta
+        try:
+            return (
+                self._obj.size - self._obj.downloaded_bytes
+            ) / self._obj.download_speed
+        except Exception:
+            return 0
+
+    def progress_raw(self):
+        return self._obj.progress
+
     def processed_bytes(self):
-        return get_readable_file_size(self._obj.downloaded_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def size(self):
-        return get_readable_file_size(self._obj.size)
+        return get_readable_file_size(self.size_raw())
 
     def status(self):
         return MirrorStatus.STATUS_DOWNLOAD
@@ -28,21 +50,13 @@ class YtDlpStatus:
         return self.listener.name
 
     def progress(self):
-        return f"{round(self._obj.progress, 2)}%"
+        return f"{round(self.progress_raw(), 2)}%"
 
     def speed(self):
-        return f"{get_readable_file_size(self._obj.download_speed)}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def eta(self):
-        if self._obj.eta != "-":
-            return get_readable_time(self._obj.eta)
-        try:
-            seconds = (
-                self._obj.size - self._obj.downloaded_bytes
-            ) / self._obj.download_speed
-            return get_readable_time(seconds)
-        except Exception:
-            return "-"
+        return get_readable_time(eta) if (eta := self.eta_raw()) else "-"
 
     def task(self):
         return self._obj
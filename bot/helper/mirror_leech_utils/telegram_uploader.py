@@ -1,5 +1,5 @@
 import contextlib
-from asyncio import sleep
+from asyncio import Queue, create_task
 from logging import getLogger
 from os import path as ospath
 from os import walk
@@ -17,7 +17,7 @@ from aiofiles.os import (
 from aioshutil import rmtree
 from natsort import natsorted
 from PIL import Image
-from pyrogram.errors import BadRequest, FloodPremiumWait, FloodWait, RPCError
+from pyrogram.errors import BadRequest, RPCError
 from pyrogram.types import (
     InputMediaDocument,
     InputMediaPhoto,
@@ -39,6 +39,7 @@ from bot.helper.ext_utils.files_utils import (
     get_base_name,
     is_archive,
 )
+from bot.helper.ext_utils.leech_cache import LeechCache
 from bot.helper.ext_utils.media_utils import (
     get_audio_thumbnail,
     get_document_type,
@@ -46,7 +47,9 @@ from bot.helper.ext_utils.media_utils import (
     get_multiple_frames_thumbnail,
     get_video_thumbnail,
 )
+from bot.helper.telegram_helper.fan_out import FanOut
 from bot.helper.telegram_helper.message_utils import delete_message
+from bot.helper.telegram_helper.rate_limiter import UPLOAD, RateLimiter
 
 LOGGER = getLogger(__name__)
 
@@ -76,6 +79,11 @@ class TelegramUploader:
         self.log_msg = None
         self._user_session = self._listener.user_transmission
         self._error = ""
+        self._lookahead = Config.LEECH_LOOKAHEAD
+        self._prepared = {}
+        self._cache_key = None
+        self._fan_out = None
+        self._deleting = set()
 
     async def _upload_progress(self, current, _):
         if self._listener.is_cancelled:
@@ -87,6 +95,18 @@ class TelegramUploader:
         self._last_uploaded = current
         self._processed_bytes += chunk_size
 
+    async def _reply(self, func, /, *args, cost=1, **kwargs):
+        """Calls a reply method of `_sent_msg` through the rate limiter."""
+        return await RateLimiter.run(
+            self._sent_msg._client,
+            self._sent_msg.chat.id,
+            UPLOAD,
+            func,
+            *args,
+            cost=cost,
+            **kwargs,
+        )
+
     async def _user_settings(self):
         self._media_group = self._listener.user_dict.get("MEDIA_GROUP") or (
             Config.MEDIA_GROUP
@@ -106,13 +126,28 @@ class TelegramUploader:
         )
         if self._thumb != "none" and not await aiopath.exists(self._thumb):
             self._thumb = None
+        # TODO if self.dm_mode:
+        targets = [self._user_id]
+        if self._user_dump:
+            with contextlib.suppress(ValueError):
+                targets.append(int(self._user_dump))
+        if (
+            isinstance(Config.LEECH_DUMP_CHAT, list)
+            and len(Config.LEECH_DUMP_CHAT) > 1
+        ):
+            targets.extend(Config.LEECH_DUMP_CHAT[1:])
+        self._fan_out = FanOut(TgClient.bot, targets)
 
     async def _msg_to_reply(self):
         if self._listener.up_dest:
             msg = self._listener.message.text.lstrip("/")
             try:
                 if self._user_session:
-                    self._sent_msg = await TgClient.user.send_message(
+                    self._sent_msg = await RateLimiter.run(
+                        TgClient.user,
+                        self._listener.up_dest,
+                        UPLOAD,
+                        TgClient.user.send_message,
                         chat_id=self._listener.up_dest,
                         text=msg,
                         disable_web_page_preview=True,
@@ -120,7 +155,11 @@ class TelegramUploader:
                         disable_notification=True,
                     )
                 else:
-                    self._sent_msg = await self._listener.client.send_message(
+                    self._sent_msg = await RateLimiter.run(
+                        self._listener.client,
+                        self._listener.up_dest,
+                        UPLOAD,
+                        self._listener.client.send_message,
                         chat_id=self._listener.up_dest,
                         text=msg,
                         disable_web_page_preview=True,
@@ -138,7 +177,11 @@ class TelegramUploader:
                 message_ids=self._listener.mid,
             )
             if self._sent_msg is None:
-                self._sent_msg = await TgClient.user.send_message(
+                self._sent_msg = await RateLimiter.run(
+                    TgClient.user,
+                    self._listener.message.chat.id,
+                    UPLOAD,
+                    TgClient.user.send_message,
                     chat_id=self._listener.message.chat.id,
                     text="Deleted Cmd Message! Don't delete the cmd message again!",
                     disable_web_page_preview=True,
@@ -148,7 +191,7 @@ class TelegramUploader:
             self._sent_msg = self._listener.message
         return True
 
-    async def _prepare_file(self, file_, dirpath):
+    async def _prepare_file(self, file_, dirpath, up_path):
         if self._lcaption:
             cap_mono = await generate_caption(file_, dirpath, self._lcaption)
         if self._lprefix:
@@ -156,10 +199,10 @@ class TelegramUploader:
                 cap_mono = f"{self._lprefix} {file_}"
             self._lprefix = re_sub("<.*?>", "", self._lprefix)
             new_path = ospath.join(dirpath, f"{self._lprefix} {file_}")
-            LOGGER.info(self._up_path)
-            await rename(self._up_path, new_path)
-            self._up_path = new_path
-            LOGGER.info(self._up_path)
+            LOGGER.info(up_path)
+            await rename(up_path, new_path)
+            up_path = new_path
+            LOGGER.info(up_path)
         if not self._lcaption and not self._lprefix:
             cap_mono = f"<code>{file_}</code>"
         if len(file_) > 60:
@@ -182,9 +225,9 @@ class TelegramUploader:
             remain = 60 - extn
             name = name[:remain]
             new_path = ospath.join(dirpath, f"{name}{ext}")
-            await rename(self._up_path, new_path)
-            self._up_path = new_path
-        return cap_mono
+            await rename(up_path, new_path)
+            up_path = new_path
+        return cap_mono, up_path
 
     def _get_input_media(self, subkey, key):
         rlist = []
@@ -210,10 +253,12 @@ class TelegramUploader:
         for i in range(0, len(inputs), 10):
             batch = inputs[i : i + 10]
             self._sent_msg = (
-                await self._sent_msg.reply_media_group(
+                await self._reply(
+                    self._sent_msg.reply_media_group,
                     media=batch,
                     quote=True,
                     disable_notification=True,
+                    cost=len(batch),
                 )
             )[-1]
 
@@ -229,114 +274,225 @@ class TelegramUploader:
                     chat_id=msg[0],
                     message_ids=msg[1],
                 )
-        msgs_list = await msgs[0].reply_to_message.reply_media_group(
+        reply_to = msgs[0].reply_to_message
+        msgs_list = await RateLimiter.run(
+            reply_to._client,
+            reply_to.chat.id,
+            UPLOAD,
+            reply_to.reply_media_group,
             media=self._get_input_media(subkey, key),
             quote=True,
             disable_notification=True,
+            cost=len(msgs),
         )
+        self._fan_out.replace(msgs, msgs_list)
         for msg in msgs:
             if msg.link in self._msgs_dict:
                 del self._msgs_dict[msg.link]
-            await delete_message(msg)
+        task = create_task(self._delete_grouped(msgs))
+        self._deleting.add(task)
+        task.add_done_callback(self._deleting.discard)
         del self._media_dict[key][subkey]
         if self._listener.is_super_chat or self._listener.up_dest:
             for m in msgs_list:
                 self._msgs_dict[m.link] = m.caption
         self._sent_msg = msgs_list[-1]
 
-    async def upload(self):
-        await self._user_settings()
-        res = await self._msg_to_reply()
-        if not res:
-            return
-        for dirpath, _, files in natsorted(await sync_to_async(walk, self._path)):
+    async def _delete_grouped(self, msgs):
+        """Deletes messages regrouped into an album once no copy of them is
+        in flight.
+        """
+        await self._fan_out.wait_sent(msgs)
+        for msg in msgs:
+            await delete_message(msg)
+
+    async def _leech_file(self, dirpath, file_, prepared=None):
+        """Uploads a single file and removes it afterwards.
+
+        Args:
+            prepared: Result of `_prepare_ahead` for this file, None to prepare
+                it here.
+
+        Returns:
+            False if the task got cancelled.
+        """
+        self._error = ""
+        self._up_path = f_path = ospath.join(dirpath, file_)
+        if prepared and "path" in prepared:
+            self._up_path = prepared["path"]
+        if not await aiopath.exists(self._up_path):
+            LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+            return True
+        try:
+            f_size = await aiopath.getsize(self._up_path)
+            self._total_files += 1
+            if f_size == 0:
+                LOGGER.error(
+                    f"{self._up_path} size is zero, telegram don't upload zero size files",
+                )
+                self._corrupted += 1
+                return True
+            if self._listener.is_cancelled:
+                return False
+            if prepared is None:
+                cap_mono, self._up_path = await self._prepare_file(
+                    file_,
+                    dirpath,
+                    self._up_path,
+                )
+            elif "error" in prepared:
+                raise prepared["error"]
+            else:
+                cap_mono = prepared["caption"]
+                self._prepared[self._up_path] = prepared["media"]
+            if self._last_msg_in_group:
+                group_lists = [x for v in self._media_dict.values() for x in v]
+                match = re_match(
+                    r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)",
+                    f_path,
+                )
+                if not match or (match and match.group(0) not in group_lists):
+                    for key, value in list(self._media_dict.items()):
+                        for subkey, msgs in list(value.items()):
+                            if len(msgs) > 1:
+                                await self._send_media_group(
+                                    subkey,
+                                    key,
+                                    msgs,
+                                )
+            if self._listener.hybrid_leech and self._listener.user_transmission:
+                self._user_session = f_size > 2097152000
+                if self._user_session:
+                    self._sent_msg = await TgClient.user.get_messages(
+                        chat_id=self._sent_msg.chat.id,
+                        message_ids=self._sent_msg.id,
+                    )
+                else:
+                    self._sent_msg = await self._listener.client.get_messages(
+                        chat_id=self._sent_msg.chat.id,
+                        message_ids=self._sent_msg.id,
+                    )
+            self._last_msg_in_group = False
+            self._last_uploaded = 0
+            await self._upload_file(cap_mono, file_, f_path)
+            if self._listener.is_cancelled:
+                return False
+            if (
+                not self._is_corrupted
+                and (self._listener.is_super_chat or self._listener.up_dest)
+                and not self._is_private
+            ):
+                self._msgs_dict[self._sent_msg.link] = file_
+        except Exception as err:
+            if isinstance(err, RetryError):
+                LOGGER.info(
+                    f"Total Attempts: {err.last_attempt.attempt_number}",
+                )
+                err = err.last_attempt.exception()
+            LOGGER.error(f"{err}. Path: {self._up_path}")
+            self._error = str(err)
+            self._corrupted += 1
+            if self._listener.is_cancelled:
+                return False
+        if not self._listener.is_cancelled and await aiopath.exists(
+            self._up_path,
+        ):
+            await remove(self._up_path)
+        return True
+
+    async def _prepare_ahead(self, queue, walk_list):
+        """Producer of the pipelined mode.
+
+        Renames, captions, probes and thumbnails files in upload order and
+        hands them over through `queue`, whose size bounds the lookahead.
+        Screenshot folders are passed through untouched since sending them is
+        part of the message chain.
+        """
+        for dirpath, _, files in walk_list:
             if dirpath.strip().endswith("/yt-dlp-thumb"):
                 continue
             if dirpath.strip().endswith("_ss"):
-                await self._send_screenshots(dirpath, files)
-                await rmtree(dirpath, ignore_errors=True)
+                await queue.put((dirpath, files, None))
                 continue
             for file_ in natsorted(files):
-                self._error = ""
-                self._up_path = f_path = ospath.join(dirpath, file_)
-                if not await aiopath.exists(self._up_path):
-                    LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
-                    continue
+                if self._listener.is_cancelled:
+                    return
+                up_path = ospath.join(dirpath, file_)
+                prepared = {}
                 try:
-                    f_size = await aiopath.getsize(self._up_path)
-                    self._total_files += 1
-                    if f_size == 0:
-                        LOGGER.error(
-                            f"{self._up_path} size is zero, telegram don't upload zero size files",
-                        )
-                        self._corrupted += 1
-                        continue
-                    if self._listener.is_cancelled:
-                        return
-                    cap_mono = await self._prepare_file(file_, dirpath)
-                    if self._last_msg_in_group:
-                        group_lists = [
-                            x for v in self._media_dict.values() for x in v
-                        ]
-                        match = re_match(
-                            r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)",
-                            f_path,
-                        )
-                        if not match or (
-                            match and match.group(0) not in group_lists
-                        ):
-                            for key, value in list(self._media_dict.items()):
-                                for subkey, msgs in list(value.items()):
-                                    if len(msgs) > 1:
-                                        await self._send_media_group(
-                                            subkey,
-                                            key,
-                                            msgs,
-                                        )
-                    if (
-                        self._listener.hybrid_leech
-                        and self._listener.user_transmission
-                    ):
-                        self._user_session = f_size > 2097152000
-                        if self._user_session:
-                            self._sent_msg = await TgClient.user.get_messages(
-                                chat_id=self._sent_msg.chat.id,
-                                message_ids=self._sent_msg.id,
-                            )
-                        else:
-                            self._sent_msg = (
-                                await self._listener.client.get_messages(
-                                    chat_id=self._sent_msg.chat.id,
-                                    message_ids=self._sent_msg.id,
-                                )
-                            )
-                    self._last_msg_in_group = False
-                    self._last_uploaded = 0
-                    await self._upload_file(cap_mono, file_, f_path)
-                    if self._listener.is_cancelled:
-                        return
                     if (
-                        not self._is_corrupted
-                        and (self._listener.is_super_chat or self._listener.up_dest)
-                        and not self._is_private
+                        await aiopath.exists(up_path)
+                        and await aiopath.getsize(up_path) > 0
                     ):
-                        self._msgs_dict[self._sent_msg.link] = file_
-                    await sleep(1)
-                except Exception as err:
-                    if isinstance(err, RetryError):
-                        LOGGER.info(
-                            f"Total Attempts: {err.last_attempt.attempt_number}",
+                        cap_mono, up_path = await self._prepare_file(
+                            file_,
+                            dirpath,
+                            up_path,
                         )
-                        err = err.last_attempt.exception()
-                    LOGGER.error(f"{err}. Path: {self._up_path}")
-                    self._error = str(err)
-                    self._corrupted += 1
-                    if self._listener.is_cancelled:
+                        prepared = {
+                            "caption": cap_mono,
+                            "path": up_path,
+                            "media": await self._prepare_media(up_path, file_),
+                        }
+                except Exception as e:
+                    prepared = {"error": e}
+                await queue.put((dirpath, file_, prepared))
+        await queue.put(None)
+
+    async def _remove_prepared_thumb(self, media):
+        if (
+            self._thumb is None
+            and media
+            and media["thumb"] is not None
+            and media["thumb"] != "none"
+            and await aiopath.exists(media["thumb"])
+        ):
+            await remove(media["thumb"])
+
+    async def _upload_pipelined(self, walk_list):
+        queue = Queue(self._lookahead)
+        producer = create_task(self._prepare_ahead(queue, walk_list))
+        try:
+            while (item := await queue.get()) is not None:
+                dirpath, files, prepared = item
+                if prepared is None:
+                    await self._send_screenshots(dirpath, files)
+                    await rmtree(dirpath, ignore_errors=True)
+                elif not await self._leech_file(dirpath, files, prepared):
+                    return
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                if (item := queue.get_nowait()) and item[2]:
+                    await self._remove_prepared_thumb(item[2].get("media"))
+            for media in self._prepared.values():
+                await self._remove_prepared_thumb(media)
+            self._prepared.clear()
+
+    async def upload(self):
+        await self._user_settings()
+        res = await self._msg_to_reply()
+        if not res:
+            return
+        if self._listener.manifest:
+            walk_list = natsorted(self._listener.manifest.walk(self._path))
+        else:
+            walk_list = natsorted(await sync_to_async(walk, self._path))
+        if self._lookahead > 0:
+            await self._upload_pipelined(walk_list)
+        else:
+            for dirpath, _, files in walk_list:
+                if dirpath.strip().endswith("/yt-dlp-thumb"):
+                    continue
+                if dirpath.strip().endswith("_ss"):
+                    await self._send_screenshots(dirpath, files)
+                    await rmtree(dirpath, ignore_errors=True)
+                    continue
+                for file_ in natsorted(files):
+                    if not await self._leech_file(dirpath, file_):
                         return
-                if not self._listener.is_cancelled and await aiopath.exists(
-                    self._up_path,
-                ):
-                    await remove(self._up_path)
+        if self._listener.is_cancelled:
+            return
         for key, value in list(self._media_dict.items()):
             for subkey, msgs in list(value.items()):
                 if len(msgs) > 1:
@@ -349,15 +505,18 @@ class TelegramUploader:
         if self._listener.is_cancelled:
             return
         if self._total_files == 0:
+            self._fan_out.cancel()
             await self._listener.on_upload_error(
                 "No files to upload. In case you have filled EXCLUDED_EXTENSIONS, then check if all files have those extensions or not.",
             )
             return
         if self._total_files <= self._corrupted:
+            self._fan_out.cancel()
             await self._listener.on_upload_error(
                 f"Files Corrupted or unable to upload. {self._error or 'Check logs!'}",
             )
             return
+        await self._fan_out.join()
         LOGGER.info(f"Leech Completed: {self._listener.name}")
         await self._listener.on_upload_complete(
             None,
@@ -367,6 +526,62 @@ class TelegramUploader:
         )
         return
 
+    async def _prepare_media(self, up_path, file, force_document=False):
+        """Probes a file and builds its thumbnail.
+
+        Returns:
+            A dict with the upload key, thumbnail and the media attributes
+            passed to the send call.
+        """
+        thumb = self._thumb
+        media = {"duration": 0, "artist": None, "title": None}
+        is_video, is_audio, is_image = await get_document_type(up_path)
+
+        if not is_image and thumb is None:
+            file_name = ospath.splitext(file)[0]
+            thumb_path = f"{self._path}/yt-dlp-thumb/{file_name}.jpg"
+            if await aiopath.isfile(thumb_path):
+                thumb = thumb_path
+            elif is_audio and not is_video:
+                thumb = await get_audio_thumbnail(up_path)
+
+        if (
+            self._listener.as_doc
+            or force_document
+            or (not is_video and not is_audio and not is_image)
+        ):
+            media["key"] = "documents"
+            if is_video and thumb is None:
+                thumb = await get_video_thumbnail(up_path, None)
+        elif is_video:
+            media["key"] = "videos"
+            media["duration"] = (await get_media_info(up_path))[0]
+            if thumb is None and self._listener.thumbnail_layout:
+                thumb = await get_multiple_frames_thumbnail(
+                    up_path,
+                    self._listener.thumbnail_layout,
+                    self._listener.screen_shots,
+                )
+            if thumb is None:
+                thumb = await get_video_thumbnail(up_path, media["duration"])
+            if thumb is not None and thumb != "none":
+                with Image.open(thumb) as img:
+                    media["width"], media["height"] = img.size
+            else:
+                media["width"] = 480
+                media["height"] = 320
+        elif is_audio:
+            media["key"] = "audios"
+            (
+                media["duration"],
+                media["artist"],
+                media["title"],
+            ) = await get_media_info(up_path)
+        else:
+            media["key"] = "photos"
+        media["thumb"] = thumb
+        return media
+
     @retry(
         wait=wait_exponential(multiplier=2, min=4, max=8),
         stop=stop_after_attempt(3),
@@ -380,102 +595,75 @@ class TelegramUploader:
         ):
             self._thumb = None
         thumb = self._thumb
+        key = ""
         self._is_corrupted = False
         try:
-            is_video, is_audio, is_image = await get_document_type(self._up_path)
-
-            if not is_image and thumb is None:
-                file_name = ospath.splitext(file)[0]
-                thumb_path = f"{self._path}/yt-dlp-thumb/{file_name}.jpg"
-                if await aiopath.isfile(thumb_path):
-                    thumb = thumb_path
-                elif is_audio and not is_video:
-                    thumb = await get_audio_thumbnail(self._up_path)
-
-            if (
-                self._listener.as_doc
-                or force_document
-                or (not is_video and not is_audio and not is_image)
-            ):
-                key = "documents"
-                if is_video and thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, None)
+            if not await self._send_cached(cap_mono, force_document):
+                media = self._prepared.pop(self._up_path, None)
+                if media is None or force_document:
+                    media = await self._prepare_media(
+                        self._up_path,
+                        file,
+                        force_document,
+                    )
+                key = media["key"]
+                thumb = media["thumb"]
 
                 if self._listener.is_cancelled:
                     return None
-                if thumb == "none":
-                    thumb = None
-                self._sent_msg = await self._sent_msg.reply_document(
-                    document=self._up_path,
-                    quote=True,
-                    thumb=thumb,
-                    caption=cap_mono,
-                    force_document=True,
-                    disable_notification=True,
-                    progress=self._upload_progress,
-                )
-            elif is_video:
-                key = "videos"
-                duration = (await get_media_info(self._up_path))[0]
-                if thumb is None and self._listener.thumbnail_layout:
-                    thumb = await get_multiple_frames_thumbnail(
-                        self._up_path,
-                        self._listener.thumbnail_layout,
-                        self._listener.screen_shots,
+                if key == "documents":
+                    if thumb == "none":
+                        thumb = None
+                    self._sent_msg = await self._reply(
+                        self._sent_msg.reply_document,
+                        document=self._up_path,
+                        quote=True,
+                        thumb=thumb,
+                        caption=cap_mono,
+                        force_document=True,
+                        disable_notification=True,
+                        progress=self._upload_progress,
+                    )
+                elif key == "videos":
+                    if thumb == "none":
+                        thumb = None
+                    self._sent_msg = await self._reply(
+                        self._sent_msg.reply_video,
+                        video=self._up_path,
+                        quote=True,
+                        caption=cap_mono,
+                        duration=media["duration"],
+                        width=media["width"],
+                        height=media["height"],
+                        thumb=thumb,
+                        supports_streaming=True,
+                        disable_notification=True,
+                        progress=self._upload_progress,
+                    )
+                elif key == "audios":
+                    self._sent_msg = await self._reply(
+                        self._sent_msg.reply_audio,
+                        audio=self._up_path,
+                        quote=True,
+                        caption=cap_mono,
+                        duration=media["duration"],
+                        performer=media["artist"],
+                        title=media["title"],
+                        thumb=thumb,
+                        disable_notification=True,
+                        progress=self._upload_progress,
                     )
-                if thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, duration)
-                if thumb is not None and thumb != "none":
-                    with Image.open(thumb) as img:
-                        width, height = img.size
                 else:
-                    width = 480
-                    height = 320
-                if self._listener.is_cancelled:
-                    return None
-                if thumb == "none":
-                    thumb = None
-                self._sent_msg = await self._sent_msg.reply_video(
-                    video=self._up_path,
-                    quote=True,
-                    caption=cap_mono,
-                    duration=duration,
-                    width=width,
-                    height=height,
-                    thumb=thumb,
-                    supports_streaming=True,
-                    disable_notification=True,
-                    progress=self._upload_progress,
-                )
-            elif is_audio:
-                key = "audios"
-                duration, artist, title = await get_media_info(self._up_path)
-                if self._listener.is_cancelled:
-                    return None
-                self._sent_msg = await self._sent_msg.reply_audio(
-                    audio=self._up_path,
-                    quote=True,
-                    caption=cap_mono,
-                    duration=duration,
-                    performer=artist,
-                    title=title,
-                    thumb=thumb,
-                    disable_notification=True,
-                    progress=self._upload_progress,
-                )
-            else:
-                key = "photos"
-                if self._listener.is_cancelled:
-                    return None
-                self._sent_msg = await self._sent_msg.reply_photo(
-                    photo=self._up_path,
-                    quote=True,
-                    caption=cap_mono,
-                    disable_notification=True,
-                    progress=self._upload_progress,
-                )
-
-            await self._copy_message()
+                    self._sent_msg = await self._reply(
+                        self._sent_msg.reply_photo,
+                        photo=self._up_path,
+                        quote=True,
+                        caption=cap_mono,
+                        disable_notification=True,
+                        progress=self._upload_progress,
+                    )
+                await self._cache_upload()
+            self._fan_out.add(self._sent_msg)
 
             if (
                 not self._listener.is_cancelled
@@ -505,16 +693,6 @@ class TelegramUploader:
                 and await aiopath.exists(thumb)
             ):
                 await remove(thumb)
-        except (FloodWait, FloodPremiumWait) as f:
-            LOGGER.warning(str(f))
-            await sleep(f.value * 1.3)
-            if (
-                self._thumb is None
-                and thumb is not None
-                and await aiopath.exists(thumb)
-            ):
-                await remove(thumb)
-            return await self._upload_file(cap_mono, file, o_path)
         except Exception as err:
             if (
                 self._thumb is None
@@ -529,38 +707,89 @@ class TelegramUploader:
                 return await self._upload_file(cap_mono, file, o_path, True)
             raise err
 
-    async def _copy_message(self):
-        await sleep(0.5)
-
-        async def _copy(target, retries=2):
-            for attempt in range(retries):
-                try:
-                    msg = await TgClient.bot.get_messages(
-                        self._sent_msg.chat.id,
-                        self._sent_msg.id,
-                    )
-                    await msg.copy(target)
-                    return
-                except Exception as e:
-                    LOGGER.error(f"Attempt {attempt + 1} failed: {e} {msg.id}")
-                    if attempt < retries - 1:
-                        await sleep(0.5)
-            LOGGER.error(f"Failed to copy message after {retries} attempts")
+    async def _send_cached(self, cap_mono, force_document=False):
+        """Sends the current file again from the leech cache.
 
-        # TODO if self.dm_mode:
-        if self._sent_msg.chat.id != self._user_id:
-            await _copy(self._user_id)
+        The cached file_id is used when it belongs to the client uploading
+        this file, otherwise the cached message is copied. Files with a
+        custom thumbnail are never served from the cache.
 
-        if self._user_dump:
-            with contextlib.suppress(Exception):
-                await _copy(int(self._user_dump))
+        Returns:
+            True if the file was sent without uploading it.
+        """
+        self._cache_key = None
         if (
-            isinstance(Config.LEECH_DUMP_CHAT, list)
-            and len(Config.LEECH_DUMP_CHAT) > 1
+            not LeechCache.enabled()
+            or force_document
+            or self._thumb is not None
+            or self._listener.thumbnail_layout
         ):
-            for i in Config.LEECH_DUMP_CHAT[1:]:
-                with contextlib.suppress(Exception):
-                    await _copy(i)
+            return False
+        variant = "documents" if self._listener.as_doc else "media"
+        try:
+            self._cache_key = await LeechCache.key(self._up_path, variant)
+            entry = await LeechCache.get(self._cache_key)
+        except Exception as e:
+            LOGGER.error(f"{e}: while reading the leech cache")
+            self._cache_key = None
+            return False
+        if entry is None:
+            return False
+        session = "user" if self._user_session else "bot"
+        client = TgClient.user if self._user_session else self._listener.client
+        try:
+            if entry["session"] == session:
+                sent_msg = await self._reply(
+                    self._sent_msg.reply_cached_media,
+                    file_id=entry["file_id"],
+                    caption=cap_mono,
+                    disable_notification=True,
+                )
+            else:
+                sent_msg = await RateLimiter.run(
+                    client,
+                    self._sent_msg.chat.id,
+                    UPLOAD,
+                    client.copy_message,
+                    chat_id=self._sent_msg.chat.id,
+                    from_chat_id=entry["chat_id"],
+                    message_id=entry["message_id"],
+                    caption=cap_mono,
+                    disable_notification=True,
+                    message_thread_id=self._sent_msg.message_thread_id,
+                    reply_to_message_id=self._sent_msg.id,
+                )
+        except Exception as e:
+            LOGGER.warning(f"Unusable leech cache entry: {e}. Path: {self._up_path}")
+            await LeechCache.drop(self._cache_key)
+            return False
+        if sent_msg is None:
+            return False
+        self._sent_msg = sent_msg
+        self._cache_key = None
+        self._processed_bytes += entry["size"]
+        LeechCache.saved(entry["size"])
+        await self._remove_prepared_thumb(self._prepared.pop(self._up_path, None))
+        LOGGER.info(f"Sent from leech cache: {self._up_path}")
+        return True
+
+    async def _cache_upload(self):
+        if not self._cache_key or self._listener.is_cancelled:
+            return
+        msg = self._sent_msg
+        media = msg.document or msg.video or msg.audio or msg.photo
+        if media is None:
+            return
+        try:
+            await LeechCache.put(
+                self._cache_key,
+                media.file_size or await aiopath.getsize(self._up_path),
+                media.file_id,
+                "user" if self._user_session else "bot",
+                msg,
+            )
+        except Exception as e:
+            LOGGER.error(f"{e}: while caching {self._up_path}")
 
     @property
     def speed(self):
@@ -575,5 +804,7 @@ class TelegramUploader:
 
     async def cancel_task(self):
         self._listener.is_cancelled = True
+        if self._fan_out:
+            self._fan_out.cancel()
         LOGGER.info(f"Cancelling Upload: {self._listener.name}")
         await self._listener.on_upload_error("your upload has been stopped!")
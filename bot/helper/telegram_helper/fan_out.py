@@ -0,0 +1,165 @@
+from asyncio import Event, gather, sleep
+from logging import getLogger
+
+from bot import bot_loop
+from bot.core.metrics import Metrics
+from bot.helper.telegram_helper.rate_limiter import UPLOAD, RateLimiter, chat_burst
+
+LOGGER = getLogger(__name__)
+
+# Messages forwarded with one request, the most Telegram accepts.
+BATCH_SIZE = 100
+
+
+class _Target:
+    """The messages waiting to be copied to one chat."""
+
+    __slots__ = ("chat_id", "idle", "pending", "sending", "task")
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.pending = []
+        self.sending = set()
+        self.idle = Event()
+        self.idle.set()
+        self.task = None
+
+
+class FanOut:
+    """Copies uploaded messages to other chats in the background.
+
+    Each target chat has its own worker that forwards everything queued for
+    it since its last request in batches, without the sender name so they
+    show up like copies. Every message counts against the chat's rate, so a
+    batch holds at most `CHAT_BURST` messages, what the chat may get at once. Targets are served concurrently and every batch
+    waits for its turn in the rate limiter, so a slow dump chat neither
+    delays the upload nor the other targets.
+
+    Forwarding the ids together needs no `get_messages` round trip per
+    file. Messages regrouped into an album after being queued are swapped
+    for the album with `replace`, so targets that didn't get them yet get
+    the album instead.
+    """
+
+    def __init__(self, client, targets, retries=2):
+        """
+        Args:
+            client: The client forwarding the messages, it must be able to
+                read the chat they were sent to.
+            targets: Chat ids to copy to. Duplicates are dropped.
+            retries: Attempts per batch before its messages are given up.
+        """
+        self._client = client
+        self._retries = retries
+        self._targets = [_Target(chat_id) for chat_id in dict.fromkeys(targets)]
+
+    def __bool__(self):
+        return bool(self._targets)
+
+    def add(self, message):
+        """Queues a message for every target but the chat it was sent to."""
+        for target in self._targets:
+            if target.chat_id == message.chat.id:
+                continue
+            target.pending.append((message.chat.id, message.id))
+            if target.task is None:
+                target.task = bot_loop.create_task(self._worker(target))
+
+    def replace(self, old, new):
+        """Swaps queued messages for the album they were regrouped into.
+
+        Args:
+            old: The messages that were sent again as an album.
+            new: The album, in the same order as `old`.
+        """
+        keys = [(message.chat.id, message.id) for message in old]
+        old_keys = set(keys)
+        for target in self._targets:
+            if target.chat_id == new[0].chat.id:
+                continue
+            pending = set(target.pending) & old_keys
+            if not pending:
+                continue
+            target.pending = [key for key in target.pending if key not in old_keys]
+            # Messages the target already got aren't sent again in the album
+            target.pending.extend(
+                (message.chat.id, message.id)
+                for key, message in zip(keys, new, strict=True)
+                if key in pending
+            )
+            if target.task is None:
+                target.task = bot_loop.create_task(self._worker(target))
+
+    async def wait_sent(self, messages):
+        """Waits until none of `messages` is being forwarded, so they can be
+        deleted. Messages still queued should be swapped out with `replace`
+        first.
+        """
+        keys = {(message.chat.id, message.id) for message in messages}
+        for target in self._targets:
+            if target.sending & keys:
+                await target.idle.wait()
+
+    def cancel(self):
+        """Drops everything queued and stops the batches in flight."""
+        for target in self._targets:
+            target.pending.clear()
+            if target.task is not None:
+                target.task.cancel()
+
+    async def join(self):
+        """Waits until everything queued so far was copied or given up."""
+        while tasks := [t.task for t in self._targets if t.task is not None]:
+            await gather(*tasks, return_exceptions=True)
+
+    async def _worker(self, target):
+        try:
+            while target.pending:
+                from_chat_id = target.pending[0][0]
+                size = min(BATCH_SIZE, chat_burst())
+                batch = []
+                while (
+                    target.pending
+                    and len(batch) < size
+                    and target.pending[0][0] == from_chat_id
+                ):
+                    batch.append(target.pending.pop(0)[1])
+                target.sending = {(from_chat_id, message_id) for message_id in batch}
+                target.idle.clear()
+                await self._forward(target.chat_id, from_chat_id, batch)
+                target.sending = set()
+                target.idle.set()
+        finally:
+            target.sending = set()
+            target.idle.set()
+            target.task = None
+
+    async def _forward(self, chat_id, from_chat_id, message_ids):
+        for attempt in range(self._retries):
+            try:
+                await RateLimiter.run(
+                    self._client,
+                    chat_id,
+                    UPLOAD,
+                    self._client.forward_messages,
+                    chat_id=chat_id,
+                    from_chat_id=from_chat_id,
+                    message_ids=message_ids,
+                    disable_notification=True,
+                    hide_sender_name=True,
+                    cost=len(message_ids),
+                )
+                Metrics.inc("leech_copies_total", len(message_ids))
+                return
+            except Exception as e:
+                LOGGER.error(
+                    f"Attempt {attempt + 1} to copy {len(message_ids)} messages "
+                    f"to {chat_id} failed: {e}",
+                )
+                if attempt < self._retries - 1:
+                    await sleep(0.5)
+        Metrics.inc("leech_copy_failures_total", len(message_ids))
+        LOGGER.error(
+            f"Failed to copy {len(message_ids)} messages to {chat_id} "
+            f"after {self._retries} attempts",
+        )
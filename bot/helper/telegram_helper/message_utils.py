@@ -1,6 +1,7 @@
 from asyncio import gather, sleep
 from re import match as re_match
 from time import time
+from typing import ClassVar
 
 from cachetools import TTLCache
 from pyrogram import Client, enums
@@ -15,6 +16,7 @@ from pyrogram.types import InputMediaPhoto
 from bot import (
     DOWNLOAD_DIR,
     LOGGER,
+    bot_loop,
     intervals,
     status_dict,
     task_dict_lock,
@@ -22,12 +24,22 @@ from bot import (
 )
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
-from bot.helper.ext_utils.bot_utils import SetInterval
-from bot.helper.ext_utils.exceptions import TgLinkException
-from bot.helper.ext_utils.status_utils import get_readable_message
+from bot.helper.ext_utils.exceptions import TgLinkException, TgRateLimited
+from bot.helper.ext_utils.status_utils import render_status
+from bot.helper.telegram_helper.rate_limiter import (
+    BOT_RATE,
+    RSS,
+    STATUS,
+    UPLOAD,
+    RateLimiter,
+)
 
 session_cache = TTLCache(maxsize=1000, ttl=36000)
 
+# Seconds after which a status message is refreshed even if it barely changed,
+# and the longest interval of the status loop.
+STATUS_MAX_AGE = 30
+
 
 async def send_message(
     message,
@@ -36,41 +48,53 @@ async def send_message(
     photo=None,
     markdown=False,
     block=True,
+    priority=UPLOAD,
 ):
     parse_mode = enums.ParseMode.MARKDOWN if markdown else enums.ParseMode.HTML
     try:
         if isinstance(message, int):
-            return await TgClient.bot.send_message(
+            return await RateLimiter.run(
+                TgClient.bot,
+                message,
+                priority,
+                TgClient.bot.send_message,
                 chat_id=message,
                 text=text,
                 disable_web_page_preview=True,
                 disable_notification=True,
                 reply_markup=buttons,
                 parse_mode=parse_mode,
+                block=block,
             )
         if photo:
-            return await message.reply_photo(
+            return await RateLimiter.run(
+                message._client,
+                message.chat.id,
+                priority,
+                message.reply_photo,
                 photo=photo,
                 reply_to_message_id=message.id,
                 caption=text,
                 reply_markup=buttons,
                 disable_notification=True,
                 parse_mode=parse_mode,
+                block=block,
             )
-        return await message.reply(
+        return await RateLimiter.run(
+            message._client,
+            message.chat.id,
+            priority,
+            message.reply,
             text=text,
             quote=True,
             disable_web_page_preview=True,
             disable_notification=True,
             reply_markup=buttons,
             parse_mode=parse_mode,
+            block=block,
         )
-    except FloodWait as f:
-        LOGGER.warning(str(f))
-        if not block:
-            return message
-        await sleep(f.value * 1.2)
-        return await send_message(message, text, buttons, photo, markdown)
+    except (FloodWait, FloodPremiumWait, TgRateLimited):
+        return message
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -83,33 +107,47 @@ async def edit_message(
     photo=None,
     markdown=False,
     block=True,
+    priority=UPLOAD,
 ):
     # parse_mode = enums.ParseMode.MARKDOWN if markdown else enums.ParseMode.HTML
     try:
+        client = message._client
+        chat_id = message.chat.id
         if message.media:
             if photo:
-                return await message.edit_media(
+                return await RateLimiter.run(
+                    client,
+                    chat_id,
+                    priority,
+                    message.edit_media,
                     InputMediaPhoto(photo, text),
                     reply_markup=buttons,
                     # parse_mode=parse_mode,
+                    block=block,
                 )
-            return await message.edit_caption(
+            return await RateLimiter.run(
+                client,
+                chat_id,
+                priority,
+                message.edit_caption,
                 caption=text,
                 reply_markup=buttons,
                 # parse_mode=parse_mode,
+                block=block,
             )
-        await message.edit(
+        await RateLimiter.run(
+            client,
+            chat_id,
+            priority,
+            message.edit,
             text=text,
             disable_web_page_preview=True,
             reply_markup=buttons,
             # parse_mode=parse_mode,
+            block=block,
         )
-    except FloodWait as f:
-        LOGGER.warning(str(f))
-        if not block:
-            return message
-        await sleep(f.value * 1.2)
-        return await edit_message(message, text, buttons, photo)
+    except (FloodWait, FloodPremiumWait, TgRateLimited):
+        return message
     except (MessageNotModified, MessageEmpty):
         pass
     except Exception as e:
@@ -119,17 +157,17 @@ async def edit_message(
 
 async def send_file(message, file, caption="", buttons=None):
     try:
-        return await message.reply_document(
+        return await RateLimiter.run(
+            message._client,
+            message.chat.id,
+            UPLOAD,
+            message.reply_document,
             document=file,
             quote=True,
             caption=caption,
             disable_notification=True,
             reply_markup=buttons,
         )
-    except FloodWait as f:
-        LOGGER.warning(str(f))
-        await sleep(f.value * 1.2)
-        return await send_file(message, file, caption, buttons)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -138,17 +176,17 @@ async def send_file(message, file, caption="", buttons=None):
 async def send_rss(text, chat_id, thread_id):
     try:
         app = TgClient.user or TgClient.bot
-        return await app.send_message(
+        return await RateLimiter.run(
+            app,
+            chat_id,
+            RSS,
+            app.send_message,
             chat_id=chat_id,
             text=text,
             disable_web_page_preview=True,
             message_thread_id=thread_id,
             disable_notification=True,
         )
-    except (FloodWait, FloodPremiumWait) as f:
-        LOGGER.warning(str(f))
-        await sleep(f.value * 1.2)
-        return await send_rss(text)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -168,7 +206,9 @@ async def delete_links(message):
         return
     if reply_to := message.reply_to_message:
         await delete_message(reply_to)
-    await delete_message(message)
+    # Bulk items share the progress message of their BulkQueue.
+    if not hasattr(message, "task_id"):
+        await delete_message(message)
 
 
 async def auto_delete_message(*args, time=60):
@@ -187,6 +227,18 @@ async def delete_status():
                 LOGGER.error(str(e))
 
 
+def _parse_tg_link(link):
+    if link.startswith("https://t.me/"):
+        return re_match(
+            r"https:\/\/t\.me\/(?:c\/)?([^\/]+)(?:\/[^\/]+)?\/([0-9-]+)",
+            link,
+        ), False
+    return re_match(
+        r"tg:\/\/openmessage\?user_id=([0-9]+)&message_id=([0-9-]+)",
+        link,
+    ), True
+
+
 async def get_tg_link_message(link, user_id=""):
     message = None
     links = []
@@ -211,22 +263,11 @@ async def get_tg_link_message(link, user_id=""):
             else:
                 user_session = TgClient.user
 
-    if link.startswith("https://t.me/"):
-        private = False
-        msg = re_match(
-            r"https:\/\/t\.me\/(?:c\/)?([^\/]+)(?:\/[^\/]+)?\/([0-9-]+)",
-            link,
+    msg, private = _parse_tg_link(link)
+    if private and not user_session:
+        raise TgLinkException(
+            "USER_SESSION_STRING required for this private link!",
         )
-    else:
-        private = True
-        msg = re_match(
-            r"tg:\/\/openmessage\?user_id=([0-9]+)&message_id=([0-9-]+)",
-            link,
-        )
-        if not user_session:
-            raise TgLinkException(
-                "USER_SESSION_STRING required for this private link!",
-            )
 
     chat = msg[1]
     msg_id = msg[2]
@@ -281,12 +322,61 @@ async def get_tg_link_message(link, user_id=""):
     raise TgLinkException("Private: Please report!")
 
 
+async def get_tg_link_messages(links, session):
+    """Fetches the messages of the links returned for a message range.
+
+    Messages are requested in batches of 200 ids, the most `get_messages`
+    accepts in one call.
+    """
+    msg, private = _parse_tg_link(links[0])
+    chat = msg[1]
+    if chat.isdigit():
+        chat = int(chat) if private else int(f"-100{chat}")
+    ids = [int(_parse_tg_link(link)[0][2]) for link in links]
+    messages = []
+    for i in range(0, len(ids), 200):
+        messages.extend(
+            await session.get_messages(chat_id=chat, message_ids=ids[i : i + 200]),
+        )
+    return [message for message in messages if not message.empty]
+
+
 async def temp_download(msg):
     path = f"{DOWNLOAD_DIR}temp"
     return await msg.download(file_name=f"{path}/")
 
 
-async def update_status_message(sid, force=False):
+def _page_changed(entry, page):
+    """Checks whether a status page moved enough since it was last sent."""
+    old = entry.get("page")
+    if old is None or time() - entry["time"] >= STATUS_MAX_AGE:
+        return True
+    if old[:2] != page[:2] or len(old[2]) != len(page[2]):
+        return True
+    for (gid, status, progress), (old_gid, old_status, old_progress) in zip(
+        page[2],
+        old[2],
+        strict=True,
+    ):
+        if gid != old_gid or status != old_status:
+            return True
+        if abs(progress - old_progress) >= Config.STATUS_PROGRESS_DELTA:
+            return True
+    return False
+
+
+async def update_status_message(sid, force=False, cache=None):
+    """Refreshes a status message.
+
+    Args:
+        force: Edit it even if it was refreshed recently or barely changed.
+        cache: Render cache of the current tick of `StatusLoop`. Without it
+            the call comes from a task event and is rate limited by
+            `STATUS_UPDATE_INTERVAL`.
+
+    The page is rendered under `task_dict_lock`, the edit is sent after
+    releasing it and only its result is stored under the lock again.
+    """
     if intervals["stopAll"]:
         return
     async with task_dict_lock:
@@ -295,19 +385,20 @@ async def update_status_message(sid, force=False):
                 obj.cancel()
                 del intervals["status"][sid]
             return
-        if not force and time() - status_dict[sid]["time"] < 3:
+        entry = status_dict[sid]
+        if (
+            not force
+            and cache is None
+            and time() - entry["time"] < Config.STATUS_UPDATE_INTERVAL
+        ):
             return
-        status_dict[sid]["time"] = time()
-        page_no = status_dict[sid]["page_no"]
-        status = status_dict[sid]["status"]
-        is_user = status_dict[sid]["is_user"]
-        page_step = status_dict[sid]["page_step"]
-        text, buttons = await get_readable_message(
+        text, buttons, page = await render_status(
             sid,
-            is_user,
-            page_no,
-            status,
-            page_step,
+            entry["is_user"],
+            entry["page_no"],
+            entry["status"],
+            entry["page_step"],
+            cache,
         )
         if text is None:
             del status_dict[sid]
@@ -315,44 +406,142 @@ async def update_status_message(sid, force=False):
                 obj.cancel()
                 del intervals["status"][sid]
             return
-        if text != status_dict[sid]["message"].text:
-            message = await edit_message(
-                status_dict[sid]["message"],
-                text,
-                buttons,
-                block=False,
+        if text == entry["message"].text or not (
+            force or _page_changed(entry, page)
+        ):
+            return
+        status_message = entry["message"]
+    message = await edit_message(
+        status_message,
+        text,
+        buttons,
+        block=False,
+        priority=STATUS,
+    )
+    async with task_dict_lock:
+        # Deleted or sent again while it was being edited
+        if (
+            status_dict.get(sid) is not entry
+            or entry["message"] is not status_message
+        ):
+            return
+        if isinstance(message, str):
+            if message.startswith("Telegram says: [40"):
+                del status_dict[sid]
+                if obj := intervals["status"].get(sid):
+                    obj.cancel()
+                    del intervals["status"][sid]
+            else:
+                LOGGER.error(
+                    f"Status with id: {sid} haven't been updated. Error: {message}",
+                )
+            return
+        if message is status_message:
+            # Skipped by the rate limiter, the next tick tries again
+            return
+        entry["message"].text = text
+        entry["time"] = time()
+        entry["page"] = page
+
+
+class _Watch:
+    __slots__ = ("sid",)
+
+    def __init__(self, sid):
+        self.sid = sid
+
+    def cancel(self):
+        StatusLoop.unwatch(self.sid)
+
+
+class StatusLoop:
+    """Refreshes all status messages from one loop.
+
+    Every tick renders the pages of all watched chats with a shared cache, so
+    the status and lines of a task are built once however many chats show
+    it. A page is only edited when its tasks changed or their progress moved
+    by `STATUS_PROGRESS_DELTA` percent, and at least every `STATUS_MAX_AGE`
+    seconds to keep speed and ETA fresh.
+
+    The tick interval starts at `STATUS_UPDATE_INTERVAL` and grows with the
+    number of status messages, so their edits fit in a third of the bot
+    rate. It doubles whenever the rate limiter skipped status edits and
+    shrinks back once they go through again.
+    """
+
+    _sids: ClassVar[set] = set()
+    _task = None
+    interval = 0.0
+
+    @classmethod
+    def watch(cls, sid):
+        """Adds a chat to the loop.
+
+        Returns:
+            A handle to keep in `intervals["status"]`, cancelling it removes
+            the chat again.
+        """
+        cls._sids.add(sid)
+        if cls._task is None or cls._task.done():
+            cls.interval = Config.STATUS_UPDATE_INTERVAL
+            cls._task = bot_loop.create_task(cls._run())
+        return _Watch(sid)
+
+    @classmethod
+    def unwatch(cls, sid):
+        cls._sids.discard(sid)
+
+    @classmethod
+    def _floor(cls):
+        return max(
+            Config.STATUS_UPDATE_INTERVAL,
+            len(cls._sids) * 3 / BOT_RATE,
+        )
+
+    @classmethod
+    def _adapt(cls, skipped):
+        floor = cls._floor()
+        if skipped:
+            cls.interval = min(max(cls.interval, floor) * 2, STATUS_MAX_AGE)
+        else:
+            cls.interval = max(cls.interval * 0.75, floor)
+
+    @classmethod
+    async def _run(cls):
+        while cls._sids:
+            await sleep(cls.interval)
+            skipped = RateLimiter.skipped
+            cache = {}
+            sids = list(cls._sids)
+            results = await gather(
+                *(update_status_message(sid, cache=cache) for sid in sids),
+                return_exceptions=True,
             )
-            if isinstance(message, str):
-                if message.startswith("Telegram says: [40"):
-                    del status_dict[sid]
-                    if obj := intervals["status"].get(sid):
-                        obj.cancel()
-                        del intervals["status"][sid]
-                else:
-                    LOGGER.error(
-                        f"Status with id: {sid} haven't been updated. Error: {message}",
-                    )
-                return
-            status_dict[sid]["message"].text = text
-            status_dict[sid]["time"] = time()
+            for sid, result in zip(sids, results, strict=True):
+                if isinstance(result, Exception):
+                    LOGGER.error(f"Status with id: {sid} failed to render: {result}")
+            cls._adapt(RateLimiter.skipped - skipped)
+        cls._task = None
 
 
 async def send_status_message(msg, user_id=0):
+    """Sends a new status message, replacing the previous one of the chat.
+
+    The page is rendered under `task_dict_lock` but sent after releasing it,
+    so waiting for the rate limiter doesn't hold back task updates.
+    """
     if intervals["stopAll"]:
         return
     sid = user_id or msg.chat.id
     is_user = bool(user_id)
     async with task_dict_lock:
-        if sid in status_dict:
-            page_no = status_dict[sid]["page_no"]
-            status = status_dict[sid]["status"]
-            page_step = status_dict[sid]["page_step"]
-            text, buttons = await get_readable_message(
+        if entry := status_dict.get(sid):
+            text, buttons, page = await render_status(
                 sid,
                 is_user,
-                page_no,
-                status,
-                page_step,
+                entry["page_no"],
+                entry["status"],
+                entry["page_step"],
             )
             if text is None:
                 del status_dict[sid]
@@ -360,27 +549,25 @@ async def send_status_message(msg, user_id=0):
                     obj.cancel()
                     del intervals["status"][sid]
                 return
-            old_message = status_dict[sid]["message"]
-            message = await send_message(msg, text, buttons, block=False)
-            if isinstance(message, str):
-                LOGGER.error(
-                    f"Status with id: {sid} haven't been sent. Error: {message}",
-                )
-                return
-            await delete_message(old_message)
-            message.text = text
-            status_dict[sid].update({"message": message, "time": time()})
         else:
-            text, buttons = await get_readable_message(sid, is_user)
+            text, buttons, page = await render_status(sid, is_user)
             if text is None:
                 return
-            message = await send_message(msg, text, buttons, block=False)
-            if isinstance(message, str):
-                LOGGER.error(
-                    f"Status with id: {sid} haven't been sent. Error: {message}",
-                )
-                return
-            message.text = text
+    message = await send_message(msg, text, buttons, priority=STATUS)
+    if isinstance(message, str):
+        LOGGER.error(
+            f"Status with id: {sid} haven't been sent. Error: {message}",
+        )
+        return
+    message.text = text
+    old_message = None
+    async with task_dict_lock:
+        if sid in status_dict:
+            old_message = status_dict[sid]["message"]
+            status_dict[sid].update(
+                {"message": message, "time": time(), "page": page},
+            )
+        else:
             status_dict[sid] = {
                 "message": message,
                 "time": time(),
@@ -388,10 +575,9 @@ async def send_status_message(msg, user_id=0):
                 "page_step": 1,
                 "status": "All",
                 "is_user": is_user,
+                "page": page,
             }
         if not intervals["status"].get(sid) and not is_user:
-            intervals["status"][sid] = SetInterval(
-                1,
-                update_status_message,
-                sid,
-            )
+            intervals["status"][sid] = StatusLoop.watch(sid)
+    if old_message is not None:
+        await delete_message(old_message)
@@ -0,0 +1,257 @@
+from asyncio import Event, wait_for
+from contextlib import suppress
+from itertools import count
+from time import monotonic
+from typing import ClassVar
+
+from cachetools import LRUCache
+from pyrogram.errors import FloodPremiumWait, FloodWait
+
+from bot import LOGGER, bot_loop
+from bot.core.aeon_client import TgClient
+from bot.core.config_manager import Config
+from bot.core.metrics import Metrics, labels
+from bot.helper.ext_utils.exceptions import TgRateLimited
+
+# Priorities, lower is served first. Replies to commands share the upload
+# priority, broadcasts share the RSS one.
+UPLOAD = 0
+STATUS = 1
+RSS = 2
+
+# Requests per second of a whole client. Bots may send about 30 messages a
+# second, user sessions are kept lower to stay clear of spam checks.
+BOT_RATE = 30
+USER_RATE = 20
+
+# Requests per second of one private chat. Groups and channels get
+# GROUP_RATE requests a minute, every chat may burst CHAT_BURST requests.
+PRIVATE_RATE = 1
+
+# FloodWaits are slept a bit longer than asked for.
+FLOOD_MARGIN = 1.2
+
+
+def chat_burst():
+    """Returns the requests a chat may send at once."""
+    return max(Config.CHAT_BURST, 1)
+
+
+class _Bucket:
+    """Token bucket refilled at `rate` tokens a second up to `burst`, plus
+    the FloodWait back-off of what it limits.
+    """
+
+    __slots__ = ("blocked_until", "burst", "rate", "stamp", "tokens")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self, now, cost=1):
+        """Returns the seconds until `cost` tokens can be taken."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        need = min(cost, self.burst)
+        return max(self.blocked_until - now, (need - self.tokens) / self.rate, 0)
+
+    def take(self, cost=1):
+        self.tokens -= cost
+
+
+class _Lane:
+    """The requests of one client waiting for their turn."""
+
+    def __init__(self, rate):
+        self.bucket = _Bucket(rate, rate)
+        self.chats = LRUCache(maxsize=1024)
+        self.waiters = []
+        self.wakeup = Event()
+        self.task = None
+
+    def chat(self, chat_id):
+        if (bucket := self.chats.get(chat_id)) is None:
+            private = isinstance(chat_id, int) and chat_id > 0
+            rate = PRIVATE_RATE if private else max(Config.GROUP_RATE, 1) / 60
+            bucket = self.chats[chat_id] = _Bucket(rate, chat_burst())
+        return bucket
+
+
+class RateLimiter:
+    """Schedules the Telegram requests of all clients.
+
+    Every send, edit and copy waits for a token of its client and of its
+    chat, so the bot stays under the Telegram limits instead of running into
+    FloodWaits. Waiting requests are served by priority: uploads first, then
+    status edits, then RSS. A request held back by its chat doesn't hold
+    back requests of other chats.
+
+    A FloodWait blocks the client and the chat it happened in until it is
+    over. Every request of that client waits for it instead of extending the
+    ban. Non blocking requests like status edits are skipped whenever they
+    would have to wait, the next refresh sends them again.
+    """
+
+    _lanes: ClassVar[dict[str, _Lane]] = {}
+    _seq = count()
+    requests = 0
+    skipped = 0
+    waited = 0.0
+    flood_waits = 0
+    flood_seconds = 0.0
+
+    @classmethod
+    def _lane(cls, client):
+        key = getattr(client, "name", "bot")
+        if (lane := cls._lanes.get(key)) is None:
+            rate = BOT_RATE if client is TgClient.bot else USER_RATE
+            lane = cls._lanes[key] = _Lane(rate)
+        return lane
+
+    @classmethod
+    async def _dispatch(cls, lane):
+        while True:
+            lane.waiters = sorted(w for w in lane.waiters if not w[3].done())
+            if not lane.waiters:
+                lane.task = None
+                return
+            now = monotonic()
+            delay = lane.bucket.delay(now)
+            if delay <= 0:
+                delay = None
+                for waiter in lane.waiters:
+                    _, _, chat_id, future, cost = waiter
+                    chat = lane.chat(chat_id)
+                    if (wait := chat.delay(now, cost)) > 0:
+                        delay = wait if delay is None else min(delay, wait)
+                        continue
+                    chat.take(cost)
+                    lane.bucket.take(cost)
+                    lane.waiters.remove(waiter)
+                    future.set_result(None)
+                    delay = 0
+                    break
+                if delay == 0:
+                    continue
+            lane.wakeup.clear()
+            with suppress(TimeoutError):
+                await wait_for(lane.wakeup.wait(), delay)
+
+    @classmethod
+    async def acquire(cls, client, chat_id, priority=UPLOAD, block=True, cost=1):
+        """Waits for the turn of a request.
+
+        Args:
+            block: If False, the request is refused instead of waiting when
+                the client or the chat have no token left or are blocked by
+                a FloodWait.
+            cost: Messages the request sends, e.g. the size of a media group.
+
+        Raises:
+            TgRateLimited: If the request isn't blocking and would have to
+                wait.
+        """
+        lane = cls._lane(client)
+        if not block:
+            now = monotonic()
+            delay = max(
+                lane.bucket.delay(now),
+                lane.chat(chat_id).delay(now, cost),
+            )
+            if delay > 0:
+                cls.skipped += 1
+                Metrics.inc("tg_requests_skipped_total")
+                raise TgRateLimited(delay)
+        future = bot_loop.create_future()
+        lane.waiters.append((priority, next(cls._seq), chat_id, future, cost))
+        lane.wakeup.set()
+        if lane.task is None:
+            lane.task = bot_loop.create_task(cls._dispatch(lane))
+        start = monotonic()
+        await future
+        waited = monotonic() - start
+        cls.requests += 1
+        cls.waited += waited
+        Metrics.inc("tg_requests_total")
+        Metrics.inc("tg_request_wait_seconds_total", waited)
+
+    @classmethod
+    def flood_wait(cls, client, chat_id, seconds):
+        """Blocks a client and one of its chats for a FloodWait."""
+        seconds *= FLOOD_MARGIN
+        lane = cls._lane(client)
+        until = monotonic() + seconds
+        lane.bucket.blocked_until = max(lane.bucket.blocked_until, until)
+        chat = lane.chat(chat_id)
+        chat.blocked_until = max(chat.blocked_until, until)
+        cls.flood_waits += 1
+        cls.flood_seconds += seconds
+        Metrics.flood_wait(seconds)
+        lane.wakeup.set()
+
+    @classmethod
+    async def run(
+        cls,
+        client,
+        chat_id,
+        priority,
+        func,
+        /,
+        *args,
+        block=True,
+        cost=1,
+        **kwargs,
+    ):
+        """Calls a Telegram method once it is its turn.
+
+        FloodWaits back off every request of the client. Blocking requests
+        are retried once the wait is over, the others raise it.
+        """
+        while True:
+            await cls.acquire(client, chat_id, priority, block, cost)
+            try:
+                return await func(*args, **kwargs)
+            except (FloodWait, FloodPremiumWait) as f:
+                LOGGER.warning(f"{f} on {getattr(client, 'name', 'bot')}")
+                cls.flood_wait(client, chat_id, f.value)
+                if not block:
+                    raise
+
+    @classmethod
+    def stats(cls):
+        """Returns the counters and the seconds each client stays blocked."""
+        now = monotonic()
+        return {
+            "requests": cls.requests,
+            "skipped": cls.skipped,
+            "waited": cls.waited,
+            "flood_waits": cls.flood_waits,
+            "flood_seconds": cls.flood_seconds,
+            "queued": {key: len(lane.waiters) for key, lane in cls._lanes.items()},
+            "blocked": {
+                key: max(lane.bucket.blocked_until - now, 0)
+                for key, lane in cls._lanes.items()
+            },
+        }
+
+    @classmethod
+    def metric_lines(cls):
+        """Returns the queue and FloodWait gauges of every client."""
+        stats = cls.stats()
+        lines = ["# TYPE aeon_tg_queued_requests gauge"]
+        lines.extend(
+            f"aeon_tg_queued_requests{labels(client=client)} {queued}"
+            for client, queued in stats["queued"].items()
+        )
+        lines.append("# TYPE aeon_tg_floodwait_remaining_seconds gauge")
+        lines.extend(
+            f"aeon_tg_floodwait_remaining_seconds{labels(client=client)} {left}"
+            for client, left in stats["blocked"].items()
+        )
+        return lines
+
+
+Metrics.add_gauges(RateLimiter.metric_lines)
@@ -23,19 +23,17 @@ from bot import (
     drives_names,
     excluded_extensions,
     index_urls,
-    intervals,
     jd_listener_lock,
     nzb_options,
     sabnzbd_client,
     sudo_users,
-    task_dict,
 )
 from bot.core.aeon_client import TgClient
 from bot.core.config_manager import Config
 from bot.core.jdownloader_booter import jdownloader
 from bot.core.startup import update_nzb_options, update_variables
 from bot.core.torrent_manager import TorrentManager
-from bot.helper.ext_utils.bot_utils import SetInterval, new_task
+from bot.helper.ext_utils.bot_utils import new_task
 from bot.helper.ext_utils.db_handler import database
 from bot.helper.ext_utils.task_manager import start_from_queued
 from bot.helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
@@ -45,7 +43,6 @@ from bot.helper.telegram_helper.message_utils import (
     edit_message,
     send_file,
     send_message,
-    update_status_message,
 )
 
 from .rss import add_job
@@ -671,15 +668,6 @@ async def load_config():
     if not await aiopath.exists("accounts"):
         Config.USE_SERVICE_ACCOUNTS = False
 
-    if len(task_dict) != 0 and (st := intervals["status"]):
-        for key, intvl in list(st.items()):
-            intvl.cancel()
-            intervals["status"][key] = SetInterval(
-                1,
-                update_status_message,
-                key,
-            )
-
     if Config.TORRENT_TIMEOUT:
         await TorrentManager.change_aria2_option(
             "bt-stop-timeout",
@@ -1,16 +1,16 @@
-import asyncio
 from time import time
 
-from pyrogram.errors import FloodWait, InputUserDeactivated, UserIsBlocked
+from pyrogram.errors import InputUserDeactivated, UserIsBlocked
 
 from bot.helper.ext_utils.bot_utils import new_task
 from bot.helper.ext_utils.db_handler import database
 from bot.helper.ext_utils.status_utils import get_readable_time
 from bot.helper.telegram_helper.message_utils import edit_message, send_message
+from bot.helper.telegram_helper.rate_limiter import RSS, RateLimiter
 
 
 @new_task
-async def broadcast(_, message):
+async def broadcast(client, message):
     if not message.reply_to_message:
         await send_message(
             message,
@@ -25,11 +25,13 @@ async def broadcast(_, message):
 
     for uid in await database.get_pm_uids():
         try:
-            await message.reply_to_message.copy(uid)
-            successful += 1
-        except FloodWait as e:
-            await asyncio.sleep(e.value)
-            await message.reply_to_message.copy(uid)
+            await RateLimiter.run(
+                client,
+                uid,
+                RSS,
+                message.reply_to_message.copy,
+                uid,
+            )
             successful += 1
         except (UserIsBlocked, InputUserDeactivated):
             await database.rm_pm_user(uid)
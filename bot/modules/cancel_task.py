@@ -8,6 +8,7 @@ from bot.helper.ext_utils.status_utils import (
     get_all_tasks,
     get_task_by_gid,
 )
+from bot.helper.ext_utils.task_manager import BulkQueue
 from bot.helper.telegram_helper import button_build
 from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.message_utils import (
@@ -37,6 +38,8 @@ async def cancel(_, message):
         async with task_dict_lock:
             task = task_dict.get(reply_to_id)
         if task is None:
+            if tag := BulkQueue.tag_of(reply_to_id):
+                multi_tags.discard(tag)
             return
     elif len(msg) == 1:
         return
@@ -299,7 +299,7 @@ class Clone(TaskListener):
                     files,
                     folders,
                     mime_type,
-                    destination,
+                    rclone_path=destination,
                 )
         else:
             await send_message(
@@ -22,6 +22,7 @@ from bot.helper.telegram_helper.message_utils import (
     edit_message,
     send_message,
 )
+from bot.helper.telegram_helper.rate_limiter import UPLOAD, RateLimiter
 
 section_dict = {"General", "Video", "Audio", "Text", "Image"}
 
@@ -95,7 +96,11 @@ async def gen_mediainfo(message, link=None, media=None, msg=None):
         await aioremove(des_path)
 
     link_id = (await telegraph.create_page(title="MediaInfo", content=tc))["path"]
-    await temp_send.edit(
+    await RateLimiter.run(
+        temp_send._client,
+        temp_send.chat.id,
+        UPLOAD,
+        temp_send.edit,
         f"<blockquote>MediaInfo generated successfully<a href='https://graph.org/{link_id}'>.</a></blockquote>",
         disable_web_page_preview=False,
     )
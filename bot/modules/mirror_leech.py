@@ -10,6 +10,7 @@ from truelink.types import FolderResult, LinkResult
 
 from bot import DOWNLOAD_DIR, LOGGER, bot_loop, task_dict_lock
 from bot.core.aeon_client import TgClient
+from bot.core.config_manager import Config
 from bot.helper.aeon_utils.access_check import error_check
 from bot.helper.ext_utils.bot_utils import (
     COMMAND_USAGE,
@@ -45,6 +46,7 @@ from bot.helper.telegram_helper.message_utils import (
     auto_delete_message,
     delete_links,
     get_tg_link_message,
+    get_tg_link_messages,
     send_message,
 )
 
@@ -232,7 +234,7 @@ class Mirror(TaskListener):
                             for fd_name in self.same_dir:
                                 if fd_name != self.folder_name:
                                     self.same_dir[fd_name]["total"] -= 1
-                        elif self.same_dir:
+                        else:
                             self.same_dir[self.folder_name] = {
                                 "total": self.multi,
                                 "tasks": {self.mid},
@@ -240,13 +242,6 @@ class Mirror(TaskListener):
                             for fd_name in self.same_dir:
                                 if fd_name != self.folder_name:
                                     self.same_dir[fd_name]["total"] -= 1
-                        else:
-                            self.same_dir = {
-                                self.folder_name: {
-                                    "total": self.multi,
-                                    "tasks": {self.mid},
-                                },
-                            }
                 elif self.same_dir:
                     async with task_dict_lock:
                         for fd_name in self.same_dir:
@@ -258,10 +253,10 @@ class Mirror(TaskListener):
         if len(self.bulk) != 0:
             del self.bulk[0]
 
-        await self.run_multi(input_list, Mirror)
-
         await self.get_tag(text)
 
+        await self.run_multi(input_list, Mirror)
+
         path = f"{DOWNLOAD_DIR}{self.mid}{self.folder_name}"
 
         if (
@@ -279,32 +274,32 @@ class Mirror(TaskListener):
                 await delete_links(self.message)
                 return await auto_delete_message(x, time=300)
 
+        if (
+            isinstance(reply_to, list)
+            and self.folder_name
+            and Config.TG_DOWNLOAD_WORKERS > 1
+        ):
+            try:
+                messages = await get_tg_link_messages(reply_to, session)
+                await self.before_start()
+            except Exception as e:
+                x = await send_message(self.message, f"ERROR: {e}")
+                await self.remove_from_same_dir()
+                await delete_links(self.message)
+                return await auto_delete_message(x, time=300)
+            LOGGER.info(self.link)
+            create_task(
+                TelegramDownloadHelper(self).add_download_range(
+                    messages,
+                    f"{path}/",
+                    session,
+                ),
+            )
+            return await delete_links(self.message)
+
         if isinstance(reply_to, list):
-            self.bulk = reply_to
-            b_msg = input_list[:1]
             self.options = " ".join(input_list[1:])
-            b_msg.append(f"{self.bulk[0]} -i {len(self.bulk)} {self.options}")
-            nextmsg = await send_message(self.message, " ".join(b_msg))
-            nextmsg = await self.client.get_messages(
-                chat_id=self.message.chat.id,
-                message_ids=nextmsg.id,
-            )
-            if self.message.from_user:
-                nextmsg.from_user = self.user
-            else:
-                nextmsg.sender_chat = self.user
-            await Mirror(
-                self.client,
-                nextmsg,
-                self.is_qbit,
-                self.is_leech,
-                self.is_jd,
-                self.is_nzb,
-                self.same_dir,
-                self.bulk,
-                self.multi_tag,
-                self.options,
-            ).new_event()
+            await self.run_bulk(input_list[0], reply_to, Mirror)
             return await delete_links(self.message)
 
         if reply_to:
@@ -376,6 +371,9 @@ class Mirror(TaskListener):
             await delete_links(self.message)
             return await auto_delete_message(x, time=300)
 
+        if await self.use_mirror_cache(file_):
+            return await delete_links(self.message)
+
         if (
             not self.is_jd
             and not self.is_qbit
@@ -17,6 +17,7 @@ from bot.helper.ext_utils.db_handler import database
 from bot.helper.ext_utils.files_utils import clean_all
 from bot.helper.telegram_helper import button_build
 from bot.helper.telegram_helper.message_utils import delete_message, send_message
+from bot.helper.telegram_helper.rate_limiter import UPLOAD, RateLimiter
 
 
 @new_task
@@ -35,7 +36,11 @@ async def restart_bot(_, message):
 async def send_incomplete_task_message(cid, msg_id, msg):
     try:
         if msg.startswith("Restarted Successfully!"):
-            await TgClient.bot.edit_message_text(
+            await RateLimiter.run(
+                TgClient.bot,
+                cid,
+                UPLOAD,
+                TgClient.bot.edit_message_text,
                 chat_id=cid,
                 message_id=msg_id,
                 text=msg,
@@ -43,7 +48,11 @@ async def send_incomplete_task_message(cid, msg_id, msg):
             )
             await remove(".restartmsg")
         else:
-            await TgClient.bot.send_message(
+            await RateLimiter.run(
+                TgClient.bot,
+                cid,
+                UPLOAD,
+                TgClient.bot.send_message,
                 chat_id=cid,
                 text=msg,
                 disable_web_page_preview=True,
@@ -1,4 +1,4 @@
-from asyncio import Lock, sleep
+from asyncio import Lock, Queue, Semaphore, gather, sleep
 from datetime import datetime, timedelta
 from functools import partial
 from io import BytesIO
@@ -7,16 +7,21 @@ from time import time
 
 from apscheduler.triggers.interval import IntervalTrigger
 from feedparser import parse as feed_parse
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 from pyrogram.filters import create
 from pyrogram.handlers import MessageHandler
 
-from bot import LOGGER, rss_dict, scheduler
+from bot import LOGGER, bot_loop, rss_dict, scheduler
 from bot.core.config_manager import Config
-from bot.helper.ext_utils.bot_utils import arg_parser, get_size_bytes, new_task
+from bot.helper.ext_utils.bot_utils import (
+    arg_parser,
+    get_size_bytes,
+    new_task,
+    sync_to_async,
+)
 from bot.helper.ext_utils.db_handler import database
-from bot.helper.ext_utils.exceptions import RssShutdownException
 from bot.helper.ext_utils.help_messages import RSS_HELP_MESSAGE
+from bot.helper.ext_utils.rss_filter import FeedMatcher, RssFilter
 from bot.helper.ext_utils.status_utils import get_readable_file_size
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.telegram_helper.filters import CustomFilters
@@ -38,6 +43,30 @@ headers = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
+# One pooled client for every feed request, so polling reuses connections
+# instead of doing a TLS handshake per feed.
+rss_client = AsyncClient(
+    headers=headers,
+    follow_redirects=True,
+    timeout=60,
+    verify=False,
+    limits=Limits(
+        max_connections=max(Config.RSS_CONCURRENCY, 1),
+        max_keepalive_connections=max(Config.RSS_CONCURRENCY, 1),
+    ),
+)
+# ETag/Last-Modified of each feed link as of the last fully checked poll.
+feed_validators = {}
+# Compiled filters by (user_id, title) and keyword matchers by feed link.
+rss_filters = {}
+feed_matchers = {}
+# Outgoing feed messages, sent one by one by rss_sender.
+rss_queue = Queue()
+# Last item queued per (user_id, title), saved as its last seen item only
+# once rss_sender has sent it.
+rss_pending = {}
+RSS_SEND_INTERVAL = 10
+
 
 async def rss_menu(event):
     user_id = event.from_user.id
@@ -135,15 +164,7 @@ async def rss_sub(_, message, pre_event):
             cmd = None
             stv = False
         try:
-            async with AsyncClient(
-                headers=headers,
-                follow_redirects=True,
-                timeout=60,
-                verify=False,
-            ) as client:
-                res = await client.get(feed_link)
-            html = res.text
-            rss_d = feed_parse(html)
+            rss_d, _ = await fetch_feed(feed_link)
             last_title = rss_d.entries[0]["title"]
             if rss_d.entries[0].get("size"):
                 size = int(rss_d.entries[0]["size"])
@@ -196,6 +217,8 @@ async def rss_sub(_, message, pre_event):
                             "tag": tag,
                         },
                     }
+                compile_filter(user_id, title, rss_dict[user_id][title])
+            feed_validators.pop(feed_link, None)
             LOGGER.info(
                 f"Rss Feed Added: id: {user_id} - title: {title} - link: {feed_link} - c: {cmd} - inf: {inf} - exf: {exf} - stv: {stv}",
             )
@@ -252,10 +275,12 @@ async def rss_update(_, message, pre_event, state):
             updated.append(title)
             if state == "unsubscribe":
                 del rss_dict[user_id][title]
+                rss_filters.pop((user_id, title), None)
             elif state == "pause":
                 rss_dict[user_id][title]["paused"] = True
             elif state == "resume":
                 rss_dict[user_id][title]["paused"] = False
+                feed_validators.pop(rss_dict[user_id][title]["link"], None)
         if state == "resume":
             if scheduler.state == 2:
                 scheduler.resume()
@@ -352,15 +377,7 @@ async def rss_get(_, message, pre_event):
                     message,
                     f"Getting the last <b>{count}</b> item(s) from {title}",
                 )
-                async with AsyncClient(
-                    headers=headers,
-                    follow_redirects=True,
-                    timeout=60,
-                    verify=False,
-                ) as client:
-                    res = await client.get(data["link"])
-                html = res.text
-                rss_d = feed_parse(html)
+                rss_d, _ = await fetch_feed(data["link"])
                 item_info = ""
                 for item_num in range(count):
                     try:
@@ -422,6 +439,7 @@ async def rss_edit(_, message, pre_event):
         exf = arg_base["-exf"]
         stv = arg_base["-stv"]
         async with rss_dict_lock:
+            feed_validators.pop(rss_dict[user_id][title]["link"], None)
             if stv is not None:
                 stv = stv.lower() == "true"
                 rss_dict[user_id][title]["sensitive"] = stv
@@ -443,6 +461,7 @@ async def rss_edit(_, message, pre_event):
                         y = x.split(" or ")
                         exf_lists.append(y)
                 rss_dict[user_id][title]["exf"] = exf_lists
+            compile_filter(user_id, title, rss_dict[user_id][title])
     if updated:
         await database.rss_update(user_id)
     await update_rss_menu(pre_event)
@@ -674,6 +693,257 @@ Timeout: 60 sec. Argument -c for command and arguments
             await query.answer(text="Already Running!", show_alert=True)
 
 
+def compile_filter(user_id, title, data):
+    rss_filters[(user_id, title)] = rss_filter = RssFilter(
+        data["inf"],
+        data["exf"],
+        data.get("sensitive", False),
+    )
+    return rss_filter
+
+
+def get_matcher(link, filters):
+    """Returns the keyword matcher of a feed, rebuilt only when the filters
+    of its subscribers changed.
+    """
+    filters = tuple(filters)
+    if (matcher := feed_matchers.get(link)) is None or matcher.filters != filters:
+        matcher = feed_matchers[link] = FeedMatcher(filters)
+    return matcher
+
+
+class FeedItems:
+    """Entries of a fetched feed, each parsed and matched at most once no
+    matter how many subscriptions read it.
+
+    Items are tuples of (title, url, size, found keywords).
+    """
+
+    __slots__ = ("_entries", "_items", "_matcher")
+
+    def __init__(self, entries, matcher):
+        self._entries = entries
+        self._matcher = matcher
+        self._items = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if (item := self._items.get(index)) is None:
+            entry = self._entries[index]
+            title = entry["title"]
+            item = self._items[index] = (
+                title,
+                entry_link(entry),
+                entry_size(entry),
+                self._matcher.search(title),
+            )
+        return item
+
+
+def entry_link(entry):
+    try:
+        return entry["links"][1]["href"]
+    except IndexError:
+        return entry["link"]
+
+
+def entry_size(entry):
+    if entry.get("size"):
+        return int(entry["size"])
+    if (summary := entry.get("summary")) and (
+        matches := size_regex.findall(summary)
+    ):
+        return get_size_bytes(matches[0][0])
+    return 0
+
+
+async def fetch_feed(link, validators=None):
+    """Fetches and parses a feed through the shared client.
+
+    Args:
+        link: The feed url.
+        validators: Headers of a conditional GET (If-None-Match and/or
+            If-Modified-Since), if any.
+
+    Returns:
+        A tuple of the parsed feed, or None when the server answered
+        304 Not Modified, and the validators of the response.
+    """
+    tries = 0
+    while True:
+        try:
+            res = await rss_client.get(link, headers=validators)
+            break
+        except Exception:
+            tries += 1
+            if tries > 3:
+                raise
+    if res.status_code == 304:
+        return None, validators
+    new_validators = {}
+    if etag := res.headers.get("ETag"):
+        new_validators["If-None-Match"] = etag
+    if modified := res.headers.get("Last-Modified"):
+        new_validators["If-Modified-Since"] = modified
+    return await sync_to_async(feed_parse, res.text), new_validators
+
+
+async def check_subscription(
+    user,
+    title,
+    data,
+    rss_filter,
+    items,
+    chat_id,
+    topic_id,
+):
+    """Queues the items of a feed newer than the last one seen by a
+    subscription, oldest first.
+
+    The last seen item is only saved by `rss_sender` once the item is sent,
+    so items still queued at a restart are found again by the next check.
+    Until then, later checks start from the last queued item.
+
+    Returns:
+        True if the last seen item of the subscription was updated.
+    """
+    last_title, last_link = items[0][:2]
+    seen_link, seen_title = rss_pending.get(
+        (user, title),
+        (data["last_feed"], data["last_title"]),
+    )
+    if seen_link == last_link or seen_title == last_title:
+        return False
+    messages = []
+    for item_title, url, size, found in items:
+        if seen_link == url or seen_title == item_title:
+            break
+        if not FeedMatcher.check(rss_filter, found):
+            continue
+        if command := data["command"]:
+            if size and Config.RSS_SIZE_LIMIT and size > Config.RSS_SIZE_LIMIT:
+                continue
+            cmd = command.split(maxsplit=1)
+            cmd.insert(1, url)
+            feed_msg = " ".join(cmd)
+            if not feed_msg.startswith("/"):
+                feed_msg = f"/{feed_msg}"
+        else:
+            feed_msg = f"<b>Name: </b><code>{item_title.replace('>', '').replace('<', '')}</code>"
+            feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
+            if size:
+                feed_msg += f"\n<b>Size: </b>{get_readable_file_size(size)}"
+        feed_msg += f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
+        messages.append((feed_msg, (url, item_title)))
+    else:
+        LOGGER.warning(
+            f"Reached Max index no. {len(items)} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents",
+        )
+    LOGGER.info(f"Feed Name: {title}")
+    LOGGER.info(f"Last item: {last_link}")
+    if messages:
+        # The newest item is seen once the last message is sent, even if it
+        # didn't match the filters itself.
+        messages[0] = (messages[0][0], (last_link, last_title))
+        rss_pending[(user, title)] = (last_link, last_title)
+        for feed_msg, seen in reversed(messages):
+            await rss_queue.put((feed_msg, chat_id, topic_id, user, title, seen))
+        return False
+    async with rss_dict_lock:
+        if user not in rss_dict or not rss_dict[user].get(title, False):
+            return False
+        rss_dict[user][title].update(
+            {"last_feed": last_link, "last_title": last_title},
+        )
+    return True
+
+
+async def check_feed(link, subscriptions, semaphore, chat_id, topic_id):
+    """Fetches a feed once and checks it for every subscription to it.
+
+    The filters of all subscribers are matched together, so each entry title
+    is searched once per feed rather than once per subscriber. The
+    validators of the response are kept only when all subscriptions were
+    checked, so a feed that failed for someone is fetched in full next time.
+
+    Returns:
+        The set of users whose subscriptions were updated.
+    """
+    async with semaphore:
+        try:
+            rss_d, validators = await fetch_feed(
+                link,
+                feed_validators.get(link),
+            )
+        except Exception as e:
+            LOGGER.error(f"{e} - Feed Link: {link}")
+            return set()
+    if rss_d is None:
+        return set()
+    filters = [
+        rss_filters.get((user, title)) or compile_filter(user, title, data)
+        for user, title, data in subscriptions
+    ]
+    items = FeedItems(rss_d.entries, get_matcher(link, filters))
+    updated = set()
+    failed = False
+    for (user, title, data), rss_filter in zip(subscriptions, filters, strict=True):
+        try:
+            if await check_subscription(
+                user,
+                title,
+                data,
+                rss_filter,
+                items,
+                chat_id,
+                topic_id,
+            ):
+                updated.add(user)
+        except Exception as e:
+            failed = True
+            LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {link}")
+    if validators and not failed:
+        feed_validators[link] = validators
+    else:
+        feed_validators.pop(link, None)
+    return updated
+
+
+async def _mark_seen(user, title, seen):
+    """Saves a sent item as the last seen item of its subscription."""
+    if rss_pending.get((user, title)) == seen:
+        del rss_pending[(user, title)]
+    async with rss_dict_lock:
+        if user not in rss_dict or not rss_dict[user].get(title, False):
+            return
+        link, item_title = seen
+        rss_dict[user][title].update(
+            {"last_feed": link, "last_title": item_title},
+        )
+    await database.rss_update(user)
+
+
+async def rss_sender():
+    """Sends queued feed messages one at a time, RSS_SEND_INTERVAL seconds
+    apart, so a burst of new items doesn't flood the chat, and saves each
+    sent item as the last seen one of its subscription. Items queued before
+    the scheduler was shut down are dropped and checked again once it runs.
+    """
+    while True:
+        text, chat_id, topic_id, user, title, seen = await rss_queue.get()
+        if not scheduler.running:
+            rss_pending.pop((user, title), None)
+            continue
+        await send_rss(text, chat_id, topic_id)
+        try:
+            await _mark_seen(user, title, seen)
+        except Exception as e:
+            LOGGER.error(f"{e} - while saving the last item of: {title}")
+        await sleep(RSS_SEND_INTERVAL)
+
+
 async def rss_monitor():
     chat = Config.RSS_CHAT
     if not chat:
@@ -683,7 +953,6 @@ async def rss_monitor():
     if len(rss_dict) == 0:
         scheduler.pause()
         return
-    all_paused = True
     rss_topic_id = rss_chat_id = None
     if isinstance(chat, int):
         rss_chat_id = chat
@@ -693,141 +962,25 @@ async def rss_monitor():
         ]
     elif chat.lstrip("-").isdigit():
         rss_chat_id = int(chat)
-    for user, items in list(rss_dict.items()):
-        for title, data in items.items():
-            try:
-                if data["paused"]:
-                    continue
-                tries = 0
-                while True:
-                    try:
-                        async with AsyncClient(
-                            headers=headers,
-                            follow_redirects=True,
-                            timeout=60,
-                            verify=False,
-                        ) as client:
-                            res = await client.get(data["link"])
-                        html = res.text
-                        break
-                    except Exception:
-                        tries += 1
-                        if tries > 3:
-                            raise
-                        continue
-                rss_d = feed_parse(html)
-                try:
-                    last_link = rss_d.entries[0]["links"][1]["href"]
-                except IndexError:
-                    last_link = rss_d.entries[0]["link"]
-                finally:
-                    all_paused = False
-                last_title = rss_d.entries[0]["title"]
-                if (
-                    data["last_feed"] == last_link
-                    or data["last_title"] == last_title
-                ):
-                    continue
-                feed_count = 0
-                while True:
-                    try:
-                        await sleep(10)
-                    except Exception:
-                        raise RssShutdownException("Rss Monitor Stopped!") from None
-                    try:
-                        item_title = rss_d.entries[feed_count]["title"]
-                        try:
-                            url = rss_d.entries[feed_count]["links"][1]["href"]
-                        except IndexError:
-                            url = rss_d.entries[feed_count]["link"]
-                        if (
-                            data["last_feed"] == url
-                            or data["last_title"] == item_title
-                        ):
-                            break
-                        if rss_d.entries[feed_count].get("size"):
-                            size = int(rss_d.entries[feed_count]["size"])
-                        elif rss_d.entries[feed_count].get("summary"):
-                            summary = rss_d.entries[feed_count]["summary"]
-                            matches = size_regex.findall(summary)
-                            sizes = [match[0] for match in matches]
-                            size = get_size_bytes(sizes[0])
-                        else:
-                            size = 0
-                    except IndexError:
-                        LOGGER.warning(
-                            f"Reached Max index no. {feed_count} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents",
-                        )
-                        break
-                    parse = True
-                    for flist in data["inf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and all(
-                                x.lower() not in item_title.lower() for x in flist
-                            )
-                        ) or (
-                            not data.get("sensitive", False)
-                            and all(x not in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    for flist in data["exf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and any(x.lower() in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and any(x in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    if command := data["command"]:
-                        if (
-                            size
-                            and Config.RSS_SIZE_LIMIT
-                            and size > Config.RSS_SIZE_LIMIT
-                        ):
-                            feed_count += 1
-                            continue
-                        cmd = command.split(maxsplit=1)
-                        cmd.insert(1, url)
-                        feed_msg = " ".join(cmd)
-                        if not feed_msg.startswith("/"):
-                            feed_msg = f"/{feed_msg}"
-                    else:
-                        feed_msg = f"<b>Name: </b><code>{item_title.replace('>', '').replace('<', '')}</code>"
-                        feed_msg += f"\n\n<b>Link: </b><code>{url}</code>"
-                        if size:
-                            feed_msg += (
-                                f"\n<b>Size: </b>{get_readable_file_size(size)}"
-                            )
-                    feed_msg += f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
-                    await send_rss(feed_msg, rss_chat_id, rss_topic_id)
-                    feed_count += 1
-                async with rss_dict_lock:
-                    if user not in rss_dict or not rss_dict[user].get(title, False):
-                        continue
-                    rss_dict[user][title].update(
-                        {"last_feed": last_link, "last_title": last_title},
-                    )
-                await database.rss_update(user)
-                LOGGER.info(f"Feed Name: {title}")
-                LOGGER.info(f"Last item: {last_link}")
-            except RssShutdownException as ex:
-                LOGGER.info(ex)
-                break
-            except Exception as e:
-                LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
-                continue
-    if all_paused:
+    feeds = {}
+    async with rss_dict_lock:
+        for user, items in rss_dict.items():
+            for title, data in items.items():
+                if not data["paused"]:
+                    feeds.setdefault(data["link"], []).append((user, title, data))
+    if not feeds:
         scheduler.pause()
+        return
+    semaphore = Semaphore(max(Config.RSS_CONCURRENCY, 1))
+    results = await gather(
+        *(
+            check_feed(link, subs, semaphore, rss_chat_id, rss_topic_id)
+            for link, subs in feeds.items()
+        ),
+    )
+    for user in set().union(*results):
+        if rss_dict.get(user):
+            await database.rss_update(user)
 
 
 def add_job():
@@ -845,3 +998,4 @@ def add_job():
 
 add_job()
 scheduler.start()
+bot_loop.create_task(rss_sender())
@@ -88,7 +88,7 @@ async def spectrum_handler(_, message):
             )
             return
 
-        await message.reply_photo(output_path)
+        await send_message(message, "", photo=output_path)
         await delete_message(progress_message)
 
     except Exception as e:
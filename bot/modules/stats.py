@@ -14,7 +14,9 @@ from psutil import (
 )
 
 from bot import bot_start_time
+from bot.core.cpu_scheduler import CpuScheduler
 from bot.helper.ext_utils.bot_utils import cmd_exec, new_task
+from bot.helper.ext_utils.media_utils import MediaProbe
 from bot.helper.ext_utils.status_utils import (
     get_readable_file_size,
     get_readable_time,
@@ -42,6 +44,8 @@ async def bot_stats(_, message):
     total, used, free, disk = disk_usage("/")
     swap = swap_memory()
     memory = virtual_memory()
+    probe = MediaProbe.stats()
+    cpu_jobs = CpuScheduler.stats()
     stats = f"""
 <b>Commit Date:</b> {commands["commit"]}
 
@@ -58,6 +62,7 @@ async def bot_stats(_, message):
 <b>RAM:</b> {memory.percent}%
 <b>DISK:</b> {disk}%
 
+<b>CPU Slots:</b> {cpu_jobs["used"]}/{cpu_jobs["capacity"]} | <b>Jobs:</b> {cpu_jobs["running"]} | <b>Queued:</b> {cpu_jobs["queued"]}
 <b>Physical Cores:</b> {cpu_count(logical=False)}
 <b>Total Cores:</b> {cpu_count()}
 <b>SWAP:</b> {get_readable_file_size(swap.total)} | <b>Used:</b> {swap.percent}%
@@ -66,6 +71,9 @@ async def bot_stats(_, message):
 <b>Memory Free:</b> {get_readable_file_size(memory.available)}
 <b>Memory Used:</b> {get_readable_file_size(memory.used)}
 
+<b>Media Probe Cache:</b> {probe["size"]} files
+<b>Hits:</b> {probe["hits"]} | <b>Misses:</b> {probe["misses"]}
+
 <b>python:</b> {commands["python"]}
 <b>aria2:</b> {commands["aria2"]}
 <b>qBittorrent:</b> {commands["qBittorrent"]}
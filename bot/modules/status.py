@@ -12,6 +12,7 @@ from bot import (
     task_dict,
     task_dict_lock,
 )
+from bot.core.engine_snapshot import EngineSnapshot
 from bot.core.jdownloader_booter import jdownloader
 from bot.core.torrent_manager import TorrentManager
 from bot.helper.ext_utils.bot_utils import new_task
@@ -19,7 +20,6 @@ from bot.helper.ext_utils.status_utils import (
     MirrorStatus,
     get_readable_file_size,
     get_readable_time,
-    speed_string_to_bytes,
 )
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.telegram_helper.message_utils import (
@@ -33,14 +33,10 @@ from bot.helper.telegram_helper.message_utils import (
 
 
 async def get_download_status(download):
-    tool = download.tool
-    if tool in [
-        "telegram",
-        "yt-dlp",
-        "rclone",
-        "gDriveApi",
-    ]:
-        speed = download.speed()
+    # aria2, qBittorrent, SABnzbd and JDownloader speeds are already in the
+    # engine totals of the overview.
+    if download.tool in ["telegram", "yt-dlp", "rclone", "gdriveAPI"]:
+        speed = download.speed_raw()
     else:
         speed = 0
     return (
@@ -108,9 +104,7 @@ async def status_pages(_, query):
     elif data[2] == "ov":
         ds, ss = await TorrentManager.overall_speed()
         if sabnzbd_client.LOGGED_IN:
-            sds = await sabnzbd_client.get_downloads()
-            sds = int(float(sds["queue"].get("kbpersec", "0"))) * 1024
-            ds += sds
+            ds += await EngineSnapshot.get_sabnzbd_speed()
         if jdownloader.is_connected:
             jdres = await jdownloader.device.downloadcontroller.get_speed_in_bytes()
             ds += jdres
@@ -146,11 +140,10 @@ async def status_pages(_, query):
                 match status:
                     case MirrorStatus.STATUS_DOWNLOAD:
                         tasks["Download"] += 1
-                        if speed:
-                            dl_speed += speed_string_to_bytes(speed)
+                        dl_speed += speed
                     case MirrorStatus.STATUS_UPLOAD:
                         tasks["Upload"] += 1
-                        up_speed += speed_string_to_bytes(speed)
+                        up_speed += speed
                     case MirrorStatus.STATUS_SEED:
                         tasks["Seed"] += 1
                     case MirrorStatus.STATUS_ARCHIVE:
@@ -434,7 +434,7 @@ class YtDlp(TaskListener):
                             for fd_name in self.same_dir:
                                 if fd_name != self.folder_name:
                                     self.same_dir[fd_name]["total"] -= 1
-                        elif self.same_dir:
+                        else:
                             self.same_dir[self.folder_name] = {
                                 "total": self.multi,
                                 "tasks": {self.mid},
@@ -442,13 +442,6 @@ class YtDlp(TaskListener):
                             for fd_name in self.same_dir:
                                 if fd_name != self.folder_name:
                                     self.same_dir[fd_name]["total"] -= 1
-                        else:
-                            self.same_dir = {
-                                self.folder_name: {
-                                    "total": self.multi,
-                                    "tasks": {self.mid},
-                                },
-                            }
                 elif self.same_dir:
                     async with task_dict_lock:
                         for fd_name in self.same_dir:
@@ -25,6 +25,14 @@ INCOMPLETE_TASK_NOTIFIER = (
 YT_DLP_OPTIONS = {}  # Dictionary of yt-dlp options, e.g., {"format": "bestvideo+bestaudio/best"}
 USE_SERVICE_ACCOUNTS = False
 NAME_SUBSTITUTE = ""  # Replace/remove words: "source1/target1|source2/target2"
+STATUS_CACHE_TTL = 2  # Seconds to reuse the bulk qBittorrent/Aria2c/Sabnzbd snapshot for status pages
+STATUS_UPDATE_INTERVAL = 3  # Minimum seconds between refreshes of a status message
+STATUS_PROGRESS_DELTA = 1  # Progress percent needed before a status edit
+GROUP_RATE = 20  # Messages a minute sent to one group or channel
+CHAT_BURST = 3  # Messages one chat may get at once before GROUP_RATE applies
+TASK_TRACE_FILE = ""  # JSONL file to append the stage timings of finished tasks to
+LOOP_LAG_THRESHOLD = 500  # Milliseconds the event loop may be blocked before its stack is logged. 0 to disable
+ASYNCIO_DEBUG = False  # Enable asyncio debug mode and report callbacks slower than LOOP_LAG_THRESHOLD
 FFMPEG_CMDS = {}  # Predefined FFmpeg commands, e.g., {"preset_name": ["-vf", "scale=1280:-1"]}
 UPLOAD_PATHS = {}  # Named upload paths, e.g., {"movies": "remote:movies/", "tv": "gdrive_id_tv_folder"}
 
@@ -46,7 +54,10 @@ INSTADL_API = ""  # URL/endpoint for InstaDL API
 # GDrive Tools
 GDRIVE_ID = ""  # Default Google Drive Folder/TeamDrive ID or "root"
 IS_TEAM_DRIVE = False  # Set True if GDRIVE_ID is a TeamDrive
+GDRIVE_WORKERS = 1  # Parallel Drive API workers for folder clones and uploads, each with its own service account. 1 for serial
 STOP_DUPLICATE = False  # Check for duplicate file/folder names before uploading
+MIRROR_CACHE = False  # Answer or clone mirrors of sources mirrored before instead of downloading them (requires DATABASE_URL)
+MIRROR_CACHE_URL_TTL = 24  # Hours a cached URL mirror is reused. 0 to keep them
 INDEX_URL = ""  # Index URL for the GDrive_ID
 
 # Rclone
@@ -90,28 +101,40 @@ LEECH_SPLIT_SIZE = 2097152000  # Split size for leeched files in bytes. Default:
 AS_DOCUMENT = False  # Upload leeched files as documents instead of media
 MEDIA_GROUP = False  # Send leeched files as a media group
 USER_TRANSMISSION = False  # Use user session for uploads/downloads (Premium only)
+TG_DOWNLOAD_WORKERS = 1  # Parallel chunk requests per Telegram download. Above 1 also downloads a message range with -m as one task. 1 for serial
 HYBRID_LEECH = (
     False  # Switch between bot/user session based on file size (Premium only)
 )
 LEECH_FILENAME_PREFIX = ""  # Prefix for leeched filenames
+LEECH_LOOKAHEAD = 0  # Files captioned, probed and thumbnailed ahead of the running upload. 0 to prepare each file right before its upload
+LEECH_CACHE = False  # Send files leeched before again by file_id instead of uploading them (requires DATABASE_URL)
+LEECH_CACHE_DAYS = 30  # Drop entries unused for this many days. 0 to keep them
+LEECH_CACHE_SIZE = 0  # Max GB of files referenced by the leech cache, least recently used dropped first. 0 for unlimited
 LEECH_DUMP_CHAT = []  # List of chat_ids or channel_ids to dump leeched files, e.g., [-100123456789, "channel_username"]
 THUMBNAIL_LAYOUT = ""  # Thumbnail layout for uploads (e.g., 2x2, 3x3)
 
 # qBittorrent/Aria2c
 TORRENT_TIMEOUT = 0  # Timeout in seconds for dead torrents. 0 for no timeout.
+QB_SYNC_LISTENER = False  # Track qBittorrent torrents through the incremental sync/maindata API instead of listing all torrents every tick
+DIRECT_DOWNLOAD_WORKERS = 1  # Files of a direct link folder downloaded by Aria2c at the same time. 1 for serial
 BASE_URL = ""  # Base URL of the bot, for web file selection (e.g., http://myip or http://myip:port)
 BASE_URL_PORT = 80  # Port for the BASE_URL (Default: 80)
+METRICS_TOKEN = ""  # Bearer token to read /metrics, empty keeps it private
 WEB_PINCODE = False  # Require a PIN code for web file selection
 
 # Queueing system
 QUEUE_ALL = 0  # Max concurrent tasks (upload + download)
 QUEUE_DOWNLOAD = 0  # Max concurrent download tasks
 QUEUE_UPLOAD = 0  # Max concurrent upload tasks
+BULK_CONCURRENCY = 5  # Max running items of one bulk/multi command. 0 for no limit
+CPU_SLOTS = 0  # CPU slots shared by ffmpeg jobs, each job holds one slot per thread. 0 for one slot per core
+FFMPEG_THREADS = 0  # Threads (and CPU slots) per ffmpeg job. 0 for half the cores
 
 # RSS
 RSS_DELAY = 600  # RSS feed check interval in seconds (Default: 600)
 RSS_CHAT = ""  # Chat ID or username where RSS messages will be sent
 RSS_SIZE_LIMIT = 0  # Max size for RSS items in bytes (0 for no limit)
+RSS_CONCURRENCY = 10  # Max feeds fetched at the same time on each check
 
 # Heroku config for get BASE_URL automatically
 HEROKU_APP_NAME = ""  # Name of your Heroku app, used to get BASE_URL automatically
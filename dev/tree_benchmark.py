@@ -0,0 +1,79 @@
+"""Benchmark for the web file-selector tree builder.
+
+Builds synthetic qBittorrent and aria2 file listings and times a cold build
+of the tree and a cached refresh of selection/progress.
+
+Usage: python3 dev/tree_benchmark.py [files] [folders]
+"""
+
+import sys
+from pathlib import Path
+from random import random
+from time import perf_counter
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from web.nodes import get_tree, make_tree, tree_cache
+
+
+def qb_listing(files, folders):
+    return [
+        SimpleNamespace(
+            name=(
+                f"Torrent/file_{i}.bin"
+                if i % 2
+                else f"Torrent/Folder {i % folders}/file_{i}.bin"
+            ),
+            index=i,
+            size=1048576 + i,
+            priority=1,
+            progress=random(),
+        )
+        for i in range(files)
+    ]
+
+
+def aria2_listing(files, folders, root_path):
+    return [
+        {
+            "path": (
+                f"{root_path}Torrent/file_{i}.bin"
+                if i % 2
+                else f"{root_path}Torrent/Folder {i % folders}/file_{i}.bin"
+            ),
+            "index": str(i + 1),
+            "length": str(1048576 + i),
+            "completedLength": str(i),
+            "selected": "true",
+        }
+        for i in range(files)
+    ]
+
+
+def timed(label, func, *args):
+    start = perf_counter()
+    func(*args)
+    print(f"{label:<28}{perf_counter() - start:>10.3f}s")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    folders = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    root_path = "/usr/src/app/downloads/1/"
+    print(f"{files} files in {folders} top-level folders")
+
+    qb = qb_listing(files, folders)
+    timed("qbittorrent build", make_tree, qb, "qbittorrent")
+    timed("qbittorrent cached build", get_tree, "qb", qb, "qbittorrent")
+    timed("qbittorrent cached refresh", get_tree, "qb", qb, "qbittorrent")
+
+    aria2 = aria2_listing(files, folders, root_path)
+    timed("aria2 build", make_tree, aria2, "aria2", root_path)
+    timed("aria2 cached build", get_tree, "a2", aria2, "aria2", root_path)
+    timed("aria2 cached refresh", get_tree, "a2", aria2, "aria2", root_path)
+    tree_cache.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -393,6 +393,28 @@ class JobFunctions(SubFunctions):
             },
         )
 
+    async def get_history_update(
+        self,
+        nzo_ids: str | list[str] | None = None,
+        last_history_update: int = 0,
+    ):
+        """Fetches the history only if it changed since `last_history_update`.
+
+        SABnzbd answers with an empty result when its history change marker
+        still equals the one sent, so an unchanged history is never
+        downloaded again.
+
+        return (slots, last_history_update), slots is None when unchanged
+        """
+        res = await self.get_history(
+            nzo_ids=nzo_ids,
+            last_history_update=last_history_update or None,
+        )
+        history = res.get("history") if isinstance(res, dict) else None
+        if not isinstance(history, dict):
+            return None, last_history_update
+        return history["slots"], history.get("last_history_update", 0)
+
     async def retry_item(self, nzo_id: str, password: str = ""):
         """return {"status": True}"""
         return await self.call(
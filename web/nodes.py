@@ -1,33 +1,6 @@
-from anytree import NodeMixin
-
-
-class TorNode(NodeMixin):
-    def __init__(
-        self,
-        name,
-        is_folder=False,
-        is_file=False,
-        parent=None,
-        size=None,
-        priority=None,
-        file_id=None,
-        progress=None,
-    ):
-        super().__init__()
-        self.name = name
-        self.is_folder = is_folder
-        self.is_file = is_file
-
-        if parent is not None:
-            self.parent = parent
-        if size is not None:
-            self.fsize = size
-        if priority is not None:
-            self.priority = priority
-        if file_id is not None:
-            self.file_id = file_id
-        if progress is not None:
-            self.progress = progress
+from cachetools import TTLCache
+
+tree_cache = TTLCache(maxsize=100, ttl=3600)
 
 
 def qb_get_folders(path):
@@ -39,162 +12,131 @@ def get_folders(path, root_path):
     return fs.split("/")
 
 
-def make_tree(res, tool, root_path=""):
+def _progress(done, total):
+    try:
+        return round((done / total) * 100, 5)
+    except Exception:
+        return 0
+
+
+def _qb_files(res):
+    for i in res:
+        yield (
+            qb_get_folders(i.name),
+            i.index,
+            i.size,
+            i.priority,
+            round(i.progress * 100, 5),
+        )
+
+
+def _aria2_files(res, root_path):
+    for i in res:
+        yield (
+            get_folders(i["path"], root_path),
+            i["index"],
+            int(i["length"]),
+            0 if i["selected"] == "false" else 1,
+            _progress(int(i["completedLength"]), int(i["length"])),
+        )
+
+
+def _sabnzbd_files(res):
+    for i in res["files"]:
+        yield (
+            [i["filename"]],
+            i["nzf_id"],
+            float(i["mb"]) * 1048576,
+            1,
+            _progress(float(i["mb"]) - float(i["mbleft"]), float(i["mb"])),
+        )
+
+
+def _iter_files(res, tool, root_path):
     if tool == "qbittorrent":
-        parent = TorNode("QBITTORRENT")
-        folder_id = 0
-        for i in res:
-            folders = qb_get_folders(i.name)
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders) - 1):
-                    current_node = next(
-                        (k for k in previous_node.children if k.name == folders[j]),
-                        None,
-                    )
-                    if current_node is None:
-                        previous_node = TorNode(
-                            folders[j],
-                            is_folder=True,
-                            parent=previous_node,
-                            file_id=folder_id,
-                        )
-                        folder_id += 1
-                    else:
-                        previous_node = current_node
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=previous_node,
-                    size=i.size,
-                    priority=i.priority,
-                    file_id=i.index,
-                    progress=round(i.progress * 100, 5),
-                )
-            else:
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=parent,
-                    size=i.size,
-                    priority=i.priority,
-                    file_id=i.index,
-                    progress=round(i.progress * 100, 5),
-                )
-    elif tool == "aria2":
-        parent = TorNode("ARIA2")
-        folder_id = 0
-        for i in res:
-            folders = get_folders(i["path"], root_path)
-            priority = 1
-            if i["selected"] == "false":
-                priority = 0
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders) - 1):
-                    current_node = next(
-                        (k for k in previous_node.children if k.name == folders[j]),
-                        None,
-                    )
-                    if current_node is None:
-                        previous_node = TorNode(
-                            folders[j],
-                            is_folder=True,
-                            parent=previous_node,
-                            file_id=folder_id,
-                        )
-                        folder_id += 1
-                    else:
-                        previous_node = current_node
-                try:
-                    progress = round(
-                        (int(i["completedLength"]) / int(i["length"])) * 100,
-                        5,
-                    )
-                except Exception:
-                    progress = 0
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=previous_node,
-                    size=int(i["length"]),
-                    priority=priority,
-                    file_id=i["index"],
-                    progress=progress,
-                )
-            else:
-                try:
-                    progress = round(
-                        (int(i["completedLength"]) / int(i["length"])) * 100,
-                        5,
-                    )
-                except Exception:
-                    progress = 0
-                TorNode(
-                    folders[-1],
-                    is_file=True,
-                    parent=parent,
-                    size=int(i["length"]),
-                    priority=priority,
-                    file_id=i["index"],
-                    progress=progress,
+        return _qb_files(res)
+    if tool == "aria2":
+        return _aria2_files(res, root_path)
+    return _sabnzbd_files(res)
+
+
+def _build(files):
+    """Builds the file-selector list in a single pass.
+
+    Every folder keeps a dict of its sub-folders keyed by name, so locating
+    the parent of a file costs one dict lookup per path component.
+
+    Returns:
+        A tuple of the nested list and a dict mapping file id to its entry.
+    """
+    contents = []
+    root = {"list": contents, "sub": {}}
+    index = {}
+    folder_id = 0
+    for folders, file_id, size, priority, progress in files:
+        node = root
+        for name in folders[:-1]:
+            child = node["sub"].get(name)
+            if child is None:
+                children = []
+                node["list"].append(
+                    {
+                        "id": f"folderNode_{folder_id}",
+                        "name": name,
+                        "type": "folder",
+                        "children": children,
+                    },
                 )
-    else:
-        parent = TorNode("SABNZBD+")
-        priority = 1
-        for i in res["files"]:
-            TorNode(
-                i["filename"],
-                is_file=True,
-                parent=parent,
-                size=float(i["mb"]) * 1048576,
-                priority=priority,
-                file_id=i["nzf_id"],
-                progress=round(
-                    ((float(i["mb"]) - float(i["mbleft"])) / float(i["mb"])) * 100,
-                    5,
-                ),
-            )
-
-    result = create_list(parent)
+                child = node["sub"][name] = {"list": children, "sub": {}}
+                folder_id += 1
+            node = child
+        entry = {
+            "id": file_id,
+            "name": folders[-1],
+            "size": size,
+            "type": "file",
+            "selected": bool(priority),
+            "progress": progress,
+        }
+        node["list"].append(entry)
+        index[file_id] = entry
+    return contents, index
+
+
+def _patch(index, files):
+    """Updates selection and progress of a cached tree in place.
+
+    Returns:
+        False if the file list no longer matches the cached tree.
+    """
+    count = 0
+    for _, file_id, _, priority, progress in files:
+        if (entry := index.get(file_id)) is None:
+            return False
+        entry["selected"] = bool(priority)
+        entry["progress"] = progress
+        count += 1
+    return count == len(index)
+
+
+def make_tree(res, tool, root_path=""):
+    result, _ = _build(_iter_files(res, tool, root_path))
     return {"files": result, "engine": tool}
 
 
-"""
-def print_tree(parent):
-    for pre, _, node in RenderTree(parent):
-        treestr = u"%s%s" % (pre, node.name)
-        print(treestr.ljust(8), node.is_folder, node.is_file)
-"""
-
-
-def create_list(parent, contents=None):
-    if contents is None:
-        contents = []
-    for i in parent.children:
-        if i.is_folder:
-            children = []
-            create_list(i, children)
-            contents.append(
-                {
-                    "id": f"folderNode_{i.file_id}",
-                    "name": i.name,
-                    "type": "folder",
-                    "children": children,
-                },
-            )
-        else:
-            contents.append(
-                {
-                    "id": i.file_id,
-                    "name": i.name,
-                    "size": i.fsize,
-                    "type": "file",
-                    "selected": bool(i.priority),
-                    "progress": i.progress,
-                },
-            )
-    return contents
+def get_tree(gid, res, tool, root_path=""):
+    """Same as make_tree, but reuses the tree built for this gid on earlier
+    requests and only refreshes selection and progress of its files.
+    """
+    if (cached := tree_cache.get(gid)) and _patch(
+        cached[1],
+        _iter_files(res, tool, root_path),
+    ):
+        return cached[0]
+    result, index = _build(_iter_files(res, tool, root_path))
+    content = {"files": result, "engine": tool}
+    tree_cache[gid] = (content, index)
+    return content
 
 
 def extract_file_ids(data):
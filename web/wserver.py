@@ -5,23 +5,30 @@ install()
 from asyncio import sleep
 from contextlib import asynccontextmanager
 from logging import INFO, WARNING, FileHandler, StreamHandler, basicConfig, getLogger
+from os import environ
+from secrets import compare_digest
 
 from aioaria2 import Aria2HttpClient
+from aiohttp import ClientSession, ClientTimeout
 from aiohttp.client_exceptions import ClientError
 from aioqbt.client import create_client
 from aioqbt.exc import AQError
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 
 from sabnzbdapi import SabnzbdClient
-from web.nodes import extract_file_ids, make_tree
+from web.nodes import extract_file_ids, get_tree, tree_cache
 
 getLogger("httpx").setLevel(WARNING)
 getLogger("aiohttp").setLevel(WARNING)
 
 aria2 = None
 qbittorrent = None
+# Exporter of the bot process, see bot/core/metrics.py
+METRICS_URL = "http://127.0.0.1:8060/metrics"
+# Token scrapers send as a bearer token, /metrics isn't published without it.
+METRICS_TOKEN = environ.get("METRICS_TOKEN", "")
 sabnzbd_client = SabnzbdClient(
     host="http://localhost",
     api_key="mltb",
@@ -152,6 +159,7 @@ async def handle_torrent(request: Request):
         if mode == "rename":
             if len(gid) > 20:
                 await handle_rename(gid, data)
+                tree_cache.pop(gid, None)
                 content = {
                     "files": [],
                     "engine": "",
@@ -184,15 +192,15 @@ async def handle_torrent(request: Request):
         try:
             if gid.startswith("SABnzbd_nzo"):
                 res = await sabnzbd_client.get_files(gid)
-                content = make_tree(res, "sabnzbd")
+                content = get_tree(gid, res, "sabnzbd")
             elif len(gid) > 20:
                 res = await qbittorrent.torrents.files(gid)
-                content = make_tree(res, "qbittorrent")
+                content = get_tree(gid, res, "qbittorrent")
             else:
                 res = await aria2.getFiles(gid)
                 op = await aria2.getOption(gid)
                 fpath = f"{op['dir']}/"
-                content = make_tree(res, "aria2", fpath)
+                content = get_tree(gid, res, "aria2", fpath)
         except (ClientError, TimeoutError, Exception, AQError) as e:
             LOGGER.error(str(e))
             content = {
@@ -253,6 +261,25 @@ async def set_aria2(gid, selected_files):
         LOGGER.info(f"Verification Failed! Report! gid: {gid}")
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    if not METRICS_TOKEN or not compare_digest(token, METRICS_TOKEN):
+        return PlainTextResponse("Not Found\n", status_code=404)
+    try:
+        async with (
+            ClientSession(timeout=ClientTimeout(total=20)) as session,
+            session.get(METRICS_URL) as res,
+        ):
+            return PlainTextResponse(
+                await res.text(),
+                media_type="text/plain; version=0.0.4",
+            )
+    except (ClientError, TimeoutError) as e:
+        LOGGER.error(f"{e} while reading bot metrics")
+        return PlainTextResponse("bot metrics unavailable\n", status_code=503)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def homepage():
     return (